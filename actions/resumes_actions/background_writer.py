@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Mapping, MutableSet, Optional, Set, Tuple
+
+from helpers.metrics import metrics
+from helpers.selenium_helpers import logger
+
+_STOP = object()
+FSYNC_POLICIES = {"never", "batch", "always"}
+
+
+class BackgroundWriter:
+    """Moves storage writes off the crawl loop onto a single writer thread.
+
+    The caller gets the deduplication answer immediately: ids are checked
+    against the stored ids plus the ids still waiting in the queue, exactly as
+    ``append_record`` would answer once the earlier writes land. Records are
+    written in groups of up to ``batch_size`` or after ``max_delay`` seconds,
+    followed by one flush (and fsync, depending on ``fsync``) per group.
+    A record that fails to write is logged and counted as ``writer_dropped``;
+    the rest of its group is still written and the error is raised by the next
+    call from the crawl loop.
+    """
+
+    def __init__(
+        self,
+        storage: Any,
+        *,
+        queue_size: int = 1000,
+        batch_size: int = 50,
+        max_delay: float = 1.0,
+        fsync: str = "never",
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.storage = storage
+        self.backend = storage.backend
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max(0.0, max_delay)
+        self.fsync = fsync
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(1, queue_size))
+        self._lock = threading.RLock()
+        self._pending: Dict[int, Set[str]] = defaultdict(set)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="resume-writer", daemon=True)
+        self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Storage interface used by the crawl loop
+    # ------------------------------------------------------------------
+    def general_ids(self, **kwargs: Any) -> MutableSet[str]:
+        with self._lock:
+            return self.storage.general_ids(**kwargs)
+
+    def query_ids(self, query: str) -> MutableSet[str]:
+        with self._lock:
+            return self.storage.query_ids(query)
+
+    def count(self, query: str) -> int:
+        self.flush()
+        with self._lock:
+            return self.storage.count(query)
+
+    def stored_updated(self, query: str, resume_id: str) -> Optional[int]:
+        with self._lock:
+            return self.storage.stored_updated(query, resume_id)
+
+    def is_known(self, known_ids: MutableSet[str], resume_id: str) -> bool:
+        """Membership check on a set the writer thread may be updating or compacting."""
+        with self._lock:
+            return self.storage.is_known(known_ids, resume_id)
+
+    def _reserve(
+        self, record: Mapping[str, Any], known_ids: MutableSet[str], *, replace: bool = False
+    ) -> bool:
+        resume_id = str(record.get("resume_id", "")).strip()
+        if not resume_id:
+            # Both storage backends reject records without an id.
+            return False
+        with self._lock:
+            pending = self._pending[id(known_ids)]
+            if resume_id in pending or (resume_id in known_ids and not replace):
+                return False
+            pending.add(resume_id)
+        return True
+
+    def _submit(self, item: Tuple[Any, ...]) -> None:
+        self._raise_error()
+        self._queue.put(item)
+
+    def add_to_query(
+        self,
+        record: Mapping[str, Any],
+        query: str,
+        known_ids: MutableSet[str],
+        *,
+        replace: bool = False,
+    ) -> bool:
+        if not self._reserve(record, known_ids, replace=replace):
+            return False
+        self._submit(("query", dict(record), query, known_ids, replace))
+        return True
+
+    def add_to_general(
+        self, record: Mapping[str, Any], known_ids: MutableSet[str], *, replace: bool = False
+    ) -> bool:
+        if not self._reserve(record, known_ids, replace=replace):
+            return False
+        self._submit(("general", dict(record), None, known_ids, replace))
+        return True
+
+    def add_membership(self, query: str, resume_id: str) -> None:
+        self._submit(("membership", query, resume_id))
+
+    def after_write(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` on the writer thread once the records queued so far are written.
+
+        The crawl loop does not wait: the callback is queued behind the records
+        and runs after the flush (and fsync) of the group it lands in.
+        """
+        self._submit(("callback", callback))
+
+    def flush(self) -> None:
+        """Block until every queued record is written and flushed."""
+        self._queue.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        with self._lock:
+            self.storage.close()
+        self._raise_error()
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise RuntimeError("Background writer failed") from error
+
+    def _collect_batch(self) -> list:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size and batch[-1] is not _STOP:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, item: Tuple[Any, ...]) -> None:
+        kind, record, query, known_ids, replace = item
+        try:
+            if kind == "query":
+                self.storage.add_to_query(record, query, known_ids, replace=replace)
+            else:
+                self.storage.add_to_general(record, known_ids, replace=replace)
+        finally:
+            resume_id = str(record.get("resume_id", "")).strip()
+            self._pending[id(known_ids)].discard(resume_id)
+        if self.fsync == "always":
+            self.storage.sync()
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch = self._collect_batch()
+            callbacks: List[Callable[[], None]] = []
+            failed: Optional[BaseException] = None
+            try:
+                with self._lock, metrics.timer("persistence_batch", query=""):
+                    for item in batch:
+                        if item is _STOP:
+                            stopping = True
+                            continue
+                        if item[0] == "callback":
+                            callbacks.append(item[1])
+                            continue
+                        try:
+                            if item[0] == "membership":
+                                self.storage.add_membership(item[1], item[2])
+                            else:
+                                self._write(item)
+                        except Exception as error:
+                            # The rest of the batch is still written; only this item is lost.
+                            metrics.increment("writer_dropped", query="")
+                            logger.exception("Запись не сохранена (%s): %s", item[0], error)
+                            failed = failed or error
+                    self.storage.flush()
+                    if self.fsync == "batch":
+                        self.storage.sync()
+                if failed is not None:
+                    self._error = failed
+                if self._error is not None:
+                    # Callbacks (checkpoints) must not get ahead of a lost record
+                    # until the crawl loop has seen the error.
+                    continue
+                for callback in callbacks:
+                    callback()
+            except Exception as error:  # pragma: no cover - disk failures
+                logger.exception("Ошибка фоновой записи: %s", error)
+                self._error = error
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
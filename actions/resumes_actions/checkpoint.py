@@ -0,0 +1,157 @@
+"""Per-query crawl checkpoints, so an interrupted run continues where it stopped.
+
+Every query gets a small JSON file in ``config.checkpoint_dir`` with the SERP
+page being worked on, the cards of that page that still had to be processed
+and the number of resumes saved for the query so far. Files are replaced
+atomically (temporary file, fsync, ``os.replace``): after a crash a file holds
+either the previous or the new state, never a torn one.
+
+With a worker pool the parent writes the general output, so a worker hands its
+states to the parent (``publish``) and the parent stores them with
+``store_checkpoint`` once the records sent before them are on its disk.
+"""
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from actions.resumes_actions.dataframe import query_output_path
+from actions.resumes_actions.storage import get_storage
+from configs.config import config
+
+_VERSION = 1
+
+
+def _checkpoint_path(directory: str | Path, query: str) -> Path:
+    return query_output_path(str(Path(directory) / "query.json"), query)
+
+
+def _write_atomic(path: Path, payload: Dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_name(f"{path.name}.tmp")
+    with temporary.open("w", encoding="utf-8") as handle:
+        json.dump(payload, handle, ensure_ascii=False)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, path)
+
+
+class QueryCheckpoint:
+    """Progress of one query: ``page`` is the last SERP page taken into work.
+
+    ``pending`` holds the cards of that page that were not processed when the
+    state was written; an empty list means the page is complete. Cards that
+    turn out to be stored already are skipped by the usual deduplication, so
+    the state only has to be written at page boundaries.
+
+    A new state is written only after the records saved before it reach the
+    disk (see ``after_write`` of the storage), so a crash never leaves a
+    checkpoint ahead of the data, and the crawl loop does not wait for it.
+    With ``publish`` the state goes to the parent process instead of the file.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        query: str,
+        publish: Optional[Callable[..., None]] = None,
+    ) -> None:
+        self.query = query
+        self.path = _checkpoint_path(directory, query)
+        self._publish = publish
+        self.page = -1
+        self.pending: List[Dict[str, str]] = []
+        self.saved = 0
+        self.done = False
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError):
+            # A file from an older format or damaged by hand: start the query over.
+            return
+        if data.get("version") != _VERSION or data.get("query") != self.query:
+            return
+        self.page = int(data.get("page", -1))
+        self.pending = list(data.get("pending") or [])
+        self.saved = int(data.get("saved", 0))
+        self.done = bool(data.get("done", False))
+
+    @property
+    def exists(self) -> bool:
+        return self.page >= 0 or self.done
+
+    @property
+    def next_page(self) -> int:
+        """First SERP page that has not been taken into work yet."""
+        return self.page + 1
+
+    def _save(self) -> None:
+        payload = {
+            "version": _VERSION,
+            "query": self.query,
+            "page": self.page,
+            "pending": self.pending,
+            "saved": self.saved,
+            "done": self.done,
+            "updated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        }
+        if self._publish is None:
+            get_storage().after_write(partial(_write_atomic, self.path, payload))
+        else:
+            get_storage().after_write(partial(self._publish, payload, kind="checkpoint"))
+
+    def begin_page(self, page: int, cards: List[Dict[str, str]], saved: int) -> None:
+        self.page, self.pending, self.saved = page, [dict(card) for card in cards], saved
+        self._save()
+
+    def finish_page(self, page: int, saved: int) -> None:
+        self.page, self.pending, self.saved = page, [], saved
+        self._save()
+
+    def finish(self, saved: int) -> None:
+        self.pending, self.saved, self.done = [], saved, True
+        self._save()
+
+
+def open_checkpoint(
+    query: str, publish: Optional[Callable[..., None]] = None
+) -> Optional[QueryCheckpoint]:
+    """Checkpoint for ``query``, or ``None`` when ``CHECKPOINT_DIR`` is empty."""
+    if not config.checkpoint_dir:
+        return None
+    return QueryCheckpoint(config.checkpoint_dir, query, publish)
+
+
+def store_checkpoint(query: str, payload: Dict[str, Any]) -> None:
+    """Write a state published by a worker once this process's records are on disk."""
+    if not config.checkpoint_dir:
+        return
+    path = _checkpoint_path(config.checkpoint_dir, query)
+    get_storage().after_write(partial(_write_atomic, path, dict(payload)))
+
+
+def clear_checkpoints(queries: Iterable[str]) -> bool:
+    """Remove the checkpoints of ``queries`` unless one of them is unfinished.
+
+    Returns ``False`` (and keeps the files) when some query was interrupted, so
+    the next run picks it up and skips the finished ones.
+    """
+    if not config.checkpoint_dir:
+        return True
+    checkpoints = [QueryCheckpoint(config.checkpoint_dir, query) for query in queries]
+    if not all(checkpoint.done for checkpoint in checkpoints if checkpoint.exists):
+        return False
+    for checkpoint in checkpoints:
+        checkpoint.path.unlink(missing_ok=True)
+    return True
+
+
+__all__ = ["QueryCheckpoint", "clear_checkpoints", "open_checkpoint", "store_checkpoint"]
@@ -1,19 +1,18 @@
 from __future__ import annotations
 
 from collections import defaultdict
-from typing import Dict, List, MutableSet
-
-from actions.resumes_actions.dataframe import (
-    append_record,
-    count_records,
-    load_existing_ids,
-    query_output_path,
-)
-from actions.resumes_actions.find_resumes import find_resumes
-from actions.resumes_actions.parse_resume import parse_resume
-from actions.resumes_actions.setup_search import setup_search
+from typing import Any, Callable, Dict, Iterator, List, Mapping, MutableSet, Optional, Set, Tuple
+
+from actions.resumes_actions.checkpoint import QueryCheckpoint, clear_checkpoints, open_checkpoint
+from actions.resumes_actions.fetch_resumes import FetchResult, fetch_resumes
+from actions.resumes_actions.page_guard import recover
+from actions.resumes_actions.result_pages import ResultPage, iter_result_pages
+from actions.resumes_actions.storage import get_storage
 from configs.config import config
+from helpers.metrics import metrics
+from helpers.ru_dates import updated_stamp
 from helpers.selenium_helpers import logger
+from pages.resumes.page_state import SKIP, PageStateError
 
 
 def _ensure_queries() -> List[str]:
@@ -26,17 +25,215 @@ def _ensure_queries() -> List[str]:
     raise ValueError("SEARCH_QUERY environment variable is required")
 
 
-def _collect_for_query(query: str, known_general_ids: MutableSet[str]) -> int:
+def _save_record(
+    record: Mapping[str, Any],
+    *,
+    query: str,
+    per_query_ids: MutableSet[str],
+    known_general_ids: MutableSet[str],
+    publish: Optional[Callable[..., None]] = None,
+    replace: bool = False,
+) -> bool:
+    resume_id = str(record.get("resume_id", "")).strip()
+    if not resume_id:
+        # Neither storage backend keeps records it cannot deduplicate.
+        metrics.increment("failures")
+        logger.warning(
+            "Запись без идентификатора резюме пропущена: %s", record.get("url") or record.get("title")
+        )
+        return False
+
+    storage = get_storage()
+    if replace:
+        # A newer version of a stored resume: rewrite it, but it is not a new one.
+        with metrics.timer("persistence"):
+            storage.add_to_query(record, query, per_query_ids, replace=True)
+            if publish is None:
+                storage.add_to_general(record, known_general_ids, replace=True)
+            else:
+                publish(record, kind="replace")
+        metrics.increment("resumes_updated")
+        logger.info("Обновлено резюме: %s", record.get("resume_id") or record.get("url"))
+        return False
+
+    with metrics.timer("persistence"):
+        if storage.add_to_query(record, query, per_query_ids) and publish is not None:
+            # Workers open no secondary indexes; the parent records the membership.
+            publish({"resume_id": record.get("resume_id", "")}, kind="membership")
+        if publish is None:
+            was_added = storage.add_to_general(record, known_general_ids)
+        else:
+            # A worker process only reserves the id; the parent owns the general file.
+            was_added = not storage.is_known(known_general_ids, resume_id)
+            if was_added:
+                known_general_ids.add(resume_id)
+                publish(record)
+    metrics.increment("resumes_saved" if was_added else "duplicates")
+    if was_added:
+        logger.info(
+            "Добавлено резюме (%s) в общий файл",
+            record.get("full_name") or record.get("title") or "Неизвестно",
+        )
+    else:
+        logger.info(
+            "Резюме уже было сохранено ранее: %s",
+            record.get("resume_id") or record.get("url"),
+        )
+    return was_added
+
+
+def _triage_cards(
+    cards: List[Dict[str, str]], *, query: str, per_query_ids: MutableSet[str]
+) -> Tuple[List[Dict[str, str]], Set[str]]:
+    """Split SERP cards into those worth opening and ids of stored resumes to refresh.
+
+    A card already stored for the query is skipped unless the "updated" date on
+    the card is newer than the stored ``updated_at``.
+    """
+    if not config.incremental:
+        return cards, set()
+
+    storage = get_storage()
+    pending: List[Dict[str, str]] = []
+    refresh: Set[str] = set()
+    for card in cards:
+        resume_id = card.get("resume_id") or ""
+        # Through the storage: the writer thread may be compacting this index.
+        if not resume_id or not storage.is_known(per_query_ids, resume_id):
+            pending.append(card)
+            continue
+        seen = updated_stamp(card.get("updated_at") or "")
+        stored = storage.stored_updated(query, resume_id)
+        if seen is not None and stored is not None and seen > stored:
+            pending.append(card)
+            refresh.add(resume_id)
+    metrics.increment("cards_known", len(cards) - len(pending))
+    return pending, refresh
+
+
+def _iter_resumes(links: List[str]) -> Iterator[FetchResult]:
+    if config.fetch_backend == "http":
+        from actions.resumes_actions.http_fetch import fetch_resumes_http
+
+        return fetch_resumes_http(links)
+    return fetch_resumes(links, pool_size=config.tab_pool_size)
+
+
+def close_fetchers() -> None:
+    if config.fetch_backend == "http":
+        from actions.resumes_actions.http_fetch import close_http_fetcher
+
+        close_http_fetcher()
+
+
+def _resumed_pages(query: str, checkpoint: Optional[QueryCheckpoint]) -> Iterator[ResultPage]:
+    """SERP pages of ``query``, starting where ``checkpoint`` left off.
+
+    The unfinished cards of the interrupted page come first, then pages
+    continue from the next one.
+    """
+    start_page = config.start_page
+    if checkpoint is not None and checkpoint.exists:
+        if checkpoint.pending:
+            yield checkpoint.page, checkpoint.pending
+        start_page = checkpoint.next_page
+
+    pages = iter_result_pages(query, start_page=start_page)
+    try:
+        for page_index, cards in pages:
+            # PAGINATION=click always walks from the first page.
+            if page_index < start_page:
+                continue
+            yield page_index, cards
+    finally:
+        pages.close()
+
+
+def _collect_resumes(
+    links: List[str],
+    *,
+    query: str,
+    per_query_ids: MutableSet[str],
+    known_general_ids: MutableSet[str],
+    publish: Optional[Callable[..., None]],
+    refresh: Set[str],
+    saved: int,
+) -> int:
+    """Open and save the resumes behind ``links``; return the updated saved count.
+
+    Pages the classifier stopped are handled right away: removed resumes are
+    skipped, a captcha or login wall is recovered from (see ``page_guard``)
+    and the link retried once. If that fails, the :class:`PageStateError` is
+    raised and the query stops with its checkpoint in place.
+    """
+    resume_limit = getattr(config, "resume_limit", 0)
+    batch, retried = links, False
+    while batch:
+        retry: List[str] = []
+        resumes = _iter_resumes(batch)
+        try:
+            for link, resume_data, error in resumes:
+                if isinstance(error, PageStateError):
+                    if error.state == SKIP:
+                        logger.info("Резюме недоступно (%s), пропускаем: %s", error.reason, link)
+                        continue
+                    if retried or not recover(error, link):
+                        raise error
+                    retry.append(link)
+                    continue
+                if error is not None:
+                    metrics.increment("failures")
+                    logger.error("Не удалось распарсить резюме %s: %s", link, error, exc_info=error)
+                    continue
+
+                if _save_record(
+                    resume_data,
+                    query=query,
+                    per_query_ids=per_query_ids,
+                    known_general_ids=known_general_ids,
+                    publish=publish,
+                    replace=resume_data.get("resume_id") in refresh,
+                ):
+                    saved += 1
+
+                if resume_limit and saved >= resume_limit:
+                    logger.info("Достигнут лимит сбора резюме: %s", resume_limit)
+                    return saved
+        finally:
+            resumes.close()
+        batch, retried = retry, True
+    return saved
+
+
+def _collect_for_query(
+    query: str,
+    known_general_ids: MutableSet[str],
+    publish: Optional[Callable[..., None]] = None,
+) -> int:
+    with metrics.query_scope(query):
+        return _collect_query_pages(query, known_general_ids, publish)
+
+
+def _collect_query_pages(
+    query: str,
+    known_general_ids: MutableSet[str],
+    publish: Optional[Callable[..., None]],
+) -> int:
     logger.info("Начинаем сбор резюме по запросу: %s", query)
-    search_page = setup_search(query)
     resume_limit = getattr(config, "resume_limit", 0)
-    saved_for_query = 0
 
-    per_query_path = query_output_path(config.output_path, query)
-    per_query_path_str = str(per_query_path)
-    per_query_ids = load_existing_ids(per_query_path_str)
+    storage = get_storage()
+    per_query_ids = storage.query_ids(query)
+
+    checkpoint = open_checkpoint(query, publish)
+    saved_for_query = 0
+    if checkpoint is not None and checkpoint.done:
+        logger.info(
+            "Запрос '%s' уже завершён до перезапуска, сохранено резюме: %s", query, checkpoint.saved
+        )
+        return checkpoint.saved
 
-    existing_records = count_records(per_query_path_str)
+    existing_records = storage.count(query)
     threshold = getattr(config, "existing_record_threshold", 1500)
     if existing_records >= threshold:
         logger.info(
@@ -45,58 +242,85 @@ def _collect_for_query(query: str, known_general_ids: MutableSet[str]) -> int:
             existing_records,
             threshold,
         )
+        # An interrupted state would otherwise keep clear_checkpoints from ever succeeding.
+        if checkpoint is not None and checkpoint.exists:
+            checkpoint.finish(checkpoint.saved)
         return 0
+    if checkpoint is not None and checkpoint.exists:
+        saved_for_query = checkpoint.saved
+        logger.info(
+            "Продолжаем запрос '%s' со страницы %s (необработанных карточек: %s, сохранено резюме: %s)",
+            query,
+            checkpoint.page if checkpoint.pending else checkpoint.next_page,
+            len(checkpoint.pending),
+            saved_for_query,
+        )
 
-    while not resume_limit or saved_for_query < resume_limit:
-        resumes_list = list(find_resumes(search_page))
-        if not resumes_list:
-            logger.info("Подходящих резюме не найдено для запроса '%s'", query)
-            break
-
-        resume_links = search_page.extract_resume_links(resumes_list)
-        if not resume_links:
-            logger.info("На странице не найдено ссылок на резюме")
-            break
-
-        for link in resume_links:
-            if resume_limit and saved_for_query >= resume_limit:
-                logger.info("Достигнут лимит сбора резюме: %s", resume_limit)
+    known_pages = 0
+    pages = _resumed_pages(query, checkpoint)
+    try:
+        for page_index, cards in pages:
+            if not cards:
+                logger.info("Подходящих резюме не найдено для запроса '%s'", query)
                 break
 
-            logger.info("Открываем резюме в новой вкладке: %s", link)
-            config.driver.execute_script("window.open(arguments[0], '_blank');", link)
-            config.driver.switch_to.window(config.driver.window_handles[-1])
-
-            try:
-                resume_data = parse_resume()
-            except Exception as error:  # pragma: no cover - depends on remote site
-                logger.exception("Не удалось распарсить резюме: %s", error)
-            else:
-                append_record(resume_data, path=per_query_path_str, known_ids=per_query_ids)
-                was_added = append_record(
-                    resume_data,
-                    path=config.output_path,
-                    known_ids=known_general_ids,
-                )
-                if was_added:
-                    saved_for_query += 1
-                    logger.info(
-                        "Добавлено резюме (%s) в общий файл", resume_data.get("full_name", "Неизвестно")
-                    )
-                else:
+            cards, refresh = _triage_cards(cards, query=query, per_query_ids=per_query_ids)
+            if not cards:
+                if checkpoint is not None:
+                    checkpoint.finish_page(page_index, saved_for_query)
+                known_pages += 1
+                logger.info("Все резюме на странице %s уже сохранены", page_index)
+                if config.known_pages_limit and known_pages >= config.known_pages_limit:
                     logger.info(
-                        "Резюме уже было сохранено ранее: %s",
-                        resume_data.get("resume_id") or resume_data.get("url"),
+                        "Останавливаем запрос '%s' — %s страниц подряд без новых резюме",
+                        query,
+                        known_pages,
                     )
-            finally:
-                config.driver.close()
-                config.driver.switch_to.window(config.driver.window_handles[0])
-        if resume_limit and saved_for_query >= resume_limit:
-            logger.info("Достигнут лимит резюме для запроса '%s'", query)
-            break
+                    break
+                continue
+            known_pages = 0
+            if checkpoint is not None:
+                checkpoint.begin_page(page_index, cards, saved_for_query)
 
-        if not search_page.go_to_next_page():
-            break
+            if config.mode == "serp":
+                # Cards go to the separate SERP files (see ``SERP_OUTPUT_PATH`` in the config).
+                for card in cards:
+                    if resume_limit and saved_for_query >= resume_limit:
+                        logger.info("Достигнут лимит сбора резюме: %s", resume_limit)
+                        break
+                    if _save_record(
+                        card,
+                        query=query,
+                        per_query_ids=per_query_ids,
+                        known_general_ids=known_general_ids,
+                        publish=publish,
+                        replace=card["resume_id"] in refresh,
+                    ):
+                        saved_for_query += 1
+            else:
+                resume_links = [card["url"] for card in cards if card["url"]]
+                if not resume_links:
+                    logger.info("На странице не найдено ссылок на резюме")
+                    break
+
+                saved_for_query = _collect_resumes(
+                    resume_links,
+                    query=query,
+                    per_query_ids=per_query_ids,
+                    known_general_ids=known_general_ids,
+                    publish=publish,
+                    refresh=refresh,
+                    saved=saved_for_query,
+                )
+            if checkpoint is not None:
+                checkpoint.finish_page(page_index, saved_for_query)
+            if resume_limit and saved_for_query >= resume_limit:
+                logger.info("Достигнут лимит резюме для запроса '%s'", query)
+                break
+    finally:
+        pages.close()
+    if checkpoint is not None:
+        checkpoint.finish(saved_for_query)
 
     logger.info("Итого новых резюме по '%s': %s", query, saved_for_query)
     return saved_for_query
@@ -104,14 +328,36 @@ def _collect_for_query(query: str, known_general_ids: MutableSet[str]) -> int:
 
 def click_resumes():
     queries = _ensure_queries()
-    known_general_ids = load_existing_ids(config.output_path)
+    known_general_ids = get_storage().general_ids()
     saved_summary: Dict[str, int] = defaultdict(int)
 
-    for query in queries:
-        try:
-            saved_summary[query] = _collect_for_query(query, known_general_ids)
-        except Exception as error:
-            logger.exception("Ошибка при обработке запроса '%s': %s", query, error)
+    metrics.start_dumping(config.metrics_path, interval=config.metrics_interval)
+    try:
+        if config.workers > 1 and len(queries) > 1:
+            from actions.resumes_actions.worker_pool import run_worker_pool
+
+            saved_summary.update(run_worker_pool(queries, known_general_ids))
+        else:
+            try:
+                for query in queries:
+                    try:
+                        saved_summary[query] = _collect_for_query(query, known_general_ids)
+                    except PageStateError as error:
+                        # Остальные запросы упрутся в ту же капчу или вход.
+                        metrics.increment("failures", query=query)
+                        logger.error("Сбор остановлен на запросе '%s': %s", query, error)
+                        break
+                    except Exception as error:
+                        metrics.increment("failures", query=query)
+                        logger.exception("Ошибка при обработке запроса '%s': %s", query, error)
+            finally:
+                close_fetchers()
+        # Pending checkpoint writes land together with the records.
+        get_storage().flush()
+        if not clear_checkpoints(queries):
+            print(f"Сбор прерван: следующий запуск продолжит с контрольных точек в {config.checkpoint_dir}")
+    finally:
+        metrics.stop_dumping(config.metrics_path)
 
     total_new = sum(saved_summary.values())
     print("Результат сбора по запросам:")
@@ -119,3 +365,8 @@ def click_resumes():
         print(f"  - {query}: {count} новых резюме")
     print(f"Итого новых резюме добавлено: {total_new}")
     print(f"Общий файл с результатами: {config.output_path}")
+    print("Время по этапам и запросам:")
+    for line in metrics.query_breakdown():
+        print(line)
+    if config.metrics_path:
+        print(f"Метрики: {config.metrics_path}")
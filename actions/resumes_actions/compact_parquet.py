@@ -0,0 +1,249 @@
+"""Incrementally convert the per-query CSV files into a typed Parquet dataset."""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+from actions.resumes_actions.dataframe import (
+    build_dataframe,
+    latest_rows,
+    read_columns,
+    save_dataframe,
+)
+from configs.config import _serp_path
+
+_STATE_FILE = "_compaction_state.json"
+_CHUNK_ROWS = 50_000
+
+_LANGUAGE = pa.struct([("name", pa.string()), ("level", pa.string())])
+# Columns stored in the CSVs as JSON strings and their Parquet types.
+NESTED_COLUMNS: Dict[str, pa.DataType] = {
+    "languages_detailed": pa.list_(_LANGUAGE),
+    "key_skills_raw": pa.list_(pa.string()),
+    "driver_license_raw": pa.list_(pa.string()),
+    "personal_details": pa.map_(pa.string(), pa.string()),
+}
+# Typed columns added by ``helpers.normalize``; stored in the CSVs as text.
+SCALAR_COLUMNS: Dict[str, pa.DataType] = {
+    "salary_amount": pa.int64(),
+    "age_years": pa.int64(),
+    "experience_months": pa.int64(),
+    "updated_at_iso": pa.timestamp("s"),
+}
+
+
+def _decode(column: str, value: Any) -> Any:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        decoded = json.loads(value)
+    except ValueError:
+        return None
+    if column == "personal_details":
+        return list(decoded.items()) if isinstance(decoded, dict) else None
+    return decoded if isinstance(decoded, list) else None
+
+
+def _scalar(column: str, value: Any) -> Any:
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        if column == "updated_at_iso":
+            return datetime.fromisoformat(value)
+        return int(value)
+    except ValueError:
+        return None
+
+
+def _typed_records(rows: pd.DataFrame) -> List[Dict[str, Any]]:
+    records = []
+    for row in rows.to_dict("records"):
+        record = {key: (None if pd.isna(value) else value) for key, value in row.items()}
+        for column in NESTED_COLUMNS:
+            if column in record:
+                record[column] = _decode(column, record[column])
+        for column in SCALAR_COLUMNS:
+            if column in record:
+                record[column] = _scalar(column, record[column])
+        records.append(record)
+    return records
+
+
+def arrow_schema(columns: List[str]) -> pa.Schema:
+    types = {**NESTED_COLUMNS, **SCALAR_COLUMNS}
+    return pa.schema([(column, types.get(column, pa.string())) for column in columns])
+
+
+class _BoundedReader(io.RawIOBase):
+    """Binary reader that stops at a fixed byte count."""
+
+    def __init__(self, handle: BinaryIO, remaining: int) -> None:
+        self._handle = handle
+        self._remaining = remaining
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        if self._remaining <= 0:
+            return 0
+        read = self._handle.readinto(memoryview(buffer)[: self._remaining])
+        self._remaining -= read or 0
+        return read or 0
+
+
+def _read_new_rows(path: Path, start: int, end: int) -> Iterator[pd.DataFrame]:
+    """Yield chunks of rows stored between byte ``start`` and ``end``.
+
+    ``start`` of 0 means the beginning of the file, whose header line is skipped.
+    Rows appended while the compaction runs are left for the next run.
+    """
+    columns = read_columns(path)
+    with path.open("rb") as handle:
+        if start:
+            handle.seek(start)
+        else:
+            start = len(handle.readline())
+        text = io.TextIOWrapper(
+            io.BufferedReader(_BoundedReader(handle, end - start)), encoding="utf-8", newline=""
+        )
+        yield from pd.read_csv(
+            text,
+            header=None,
+            names=columns,
+            dtype=str,
+            keep_default_na=False,
+            chunksize=_CHUNK_ROWS,
+        )
+
+
+def query_files(source: Path) -> Iterator[Tuple[str, Path]]:
+    """Yield ``(slug, path)`` for every per-query CSV next to the general file.
+
+    The ``MODE=serp`` outputs share the prefix (``<stem>_serp`` and its
+    per-query files) but hold SERP cards, not resumes, so they are skipped.
+    """
+    prefix = f"{source.stem}_"
+    serp = Path(_serp_path(str(source)))
+    for path in sorted(source.parent.glob(f"{prefix}*{source.suffix}")):
+        if path == serp or path.stem.startswith(f"{serp.stem}_"):
+            continue
+        yield path.stem[len(prefix):], path
+
+
+def _drop_replaced(directory: Path, resume_ids: Iterable[str], *, keep: Path) -> int:
+    """Remove rows of ``resume_ids`` from the parts in ``directory`` other than ``keep``.
+
+    A refreshed resume is appended to the CSV again, so the increment that
+    carries the new version drops the old one from earlier parts. Only the
+    ``resume_id`` column is read to find them. Returns the number of rows removed.
+    """
+    ids = pa.array(sorted({resume_id for resume_id in resume_ids if resume_id}), pa.string())
+    if not len(ids):
+        return 0
+    removed = 0
+    for part in sorted(directory.glob("part-*.parquet")):
+        if part == keep or "resume_id" not in pq.ParquetFile(part).schema_arrow.names:
+            continue
+        stale = pc.is_in(pq.read_table(part, columns=["resume_id"])["resume_id"], value_set=ids)
+        count = pc.sum(stale).as_py() or 0
+        if not count:
+            continue
+        table = pq.read_table(part)
+        kept = table.filter(pc.invert(pc.fill_null(stale, False)))
+        if kept.num_rows:
+            temporary = part.with_name(f"{part.name}.tmp")
+            pq.write_table(kept, temporary)
+            os.replace(temporary, part)
+        else:
+            part.unlink()
+        removed += count
+    return removed
+
+
+def _load_state(output_dir: Path) -> Dict[str, Dict[str, int]]:
+    try:
+        return json.loads((output_dir / _STATE_FILE).read_text(encoding="utf-8"))
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _save_state(output_dir: Path, state: Mapping[str, Any]) -> None:
+    target = output_dir / _STATE_FILE
+    temporary = target.with_name(f"{target.name}.tmp")
+    temporary.write_text(json.dumps(state, ensure_ascii=False, indent=2), encoding="utf-8")
+    os.replace(temporary, target)
+
+
+def compact(source: str, output_dir: str) -> Dict[str, int]:
+    """Append rows added since the previous run to ``<output_dir>/query=<slug>/``.
+
+    Progress is stored per CSV as a byte offset, so every run only parses the
+    rows written since the last one. Only the newest version of each resume
+    is kept: older rows of a resume refreshed in this increment are removed
+    from the earlier parts. Returns the number of new rows per query.
+    """
+    source_path = Path(source)
+    output = Path(output_dir)
+    output.mkdir(parents=True, exist_ok=True)
+    state = _load_state(output)
+    converted: Dict[str, int] = {}
+
+    for slug, path in query_files(source_path):
+        entry = state.get(path.name, {"offset": 0, "rows": 0})
+        size = path.stat().st_size
+        if size < entry["offset"]:
+            # The CSV was replaced; start over for this query.
+            entry = {"offset": 0, "rows": 0}
+        if size == entry["offset"]:
+            continue
+
+        rows = 0
+        removed = 0
+        for part, chunk in enumerate(_read_new_rows(path, entry["offset"], size)):
+            chunk = latest_rows(chunk)
+            dataframe = build_dataframe(_typed_records(chunk), keep_nested=True)
+            # Named after the byte offset the increment starts at, so reruns
+            # of a failed increment overwrite their own parts.
+            target = output / f"query={slug}" / f"part-{entry['offset']:012d}-{part:05d}.parquet"
+            if "resume_id" in chunk.columns:
+                removed += _drop_replaced(target.parent, chunk["resume_id"].str.strip(), keep=target)
+            save_dataframe(dataframe, str(target), schema=arrow_schema(list(dataframe.columns)))
+            rows += len(dataframe.index)
+
+        state[path.name] = {"offset": size, "rows": entry["rows"] + rows - removed}
+        _save_state(output, state)
+        converted[slug] = rows
+
+    return converted
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Compact per-query resume CSVs into Parquet.")
+    parser.add_argument(
+        "--source",
+        default=os.getenv("OUTPUT_PATH", "data/resumes.csv"),
+        help="General CSV file; per-query files are looked up next to it",
+    )
+    parser.add_argument("--output-dir", default="data/parquet", help="Parquet dataset directory")
+    args = parser.parse_args(argv)
+
+    converted = compact(args.source, args.output_dir)
+    if not converted:
+        print("Новых строк нет")
+    for slug, rows in converted.items():
+        print(f"  - {slug}: {rows} новых строк")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,64 @@
 from __future__ import annotations
 
+import csv
 import json
+import os
 import re
 from pathlib import Path
-from typing import Any, Iterable, Mapping, MutableSet
+from typing import IO, TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Mapping, MutableSet, Optional
 
-import pandas as pd
+from helpers.selenium_helpers import logger
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# pandas is imported inside the functions that need it: the crawl loop only
+# appends rows and should not pay for importing it at startup.
+
+
+def schema_path(path: str | Path) -> Path:
+    output = Path(path)
+    return output.with_name(f"{output.name}.schema.json")
+
+
+def _read_header(path: Path) -> List[str]:
+    try:
+        with path.open("r", encoding="utf-8", newline="") as handle:
+            return next(csv.reader(handle), [])
+    except FileNotFoundError:
+        return []
+
+
+def read_columns(path: str | Path) -> List[str]:
+    """Return the full column list: the sidecar schema if any, else the CSV header."""
+    sidecar = schema_path(path)
+    if sidecar.exists():
+        return list(json.loads(sidecar.read_text(encoding="utf-8"))["columns"])
+    return _read_header(Path(path))
 
 
 def _read_csv_with_fallback(path: Path, **kwargs: Any) -> pd.DataFrame:
+    # The header row is stale once the schema has grown, so the columns are
+    # always named from :func:`read_columns`; rows written before a column was
+    # added simply have fewer fields.
+    import pandas as pd
+
+    columns = read_columns(path)
+    kwargs = {"header": None, "skiprows": 1, "names": columns, **kwargs}
     try:
-        return pd.read_csv(path, **kwargs)
+        dataframe = pd.read_csv(path, **kwargs)
+        # pandas turns the leading fields of rows wider than ``names`` into an
+        # index instead of failing, so a non-default index means the same thing.
+        if isinstance(dataframe.index, pd.RangeIndex):
+            return dataframe
     except pd.errors.ParserError:
-        return pd.read_csv(path, engine="python", on_bad_lines="skip", **kwargs)
+        pass
+    # Rows wider than the known schema (its sidecar was lost): keep the extra
+    # fields under positional names rather than skipping those rows.
+    width = max((len(row) for row in _iter_rows(path)), default=0)
+    extra = [f"column_{position}" for position in range(len(columns), width)]
+    logger.warning("В %s есть строки шире схемы, лишние поля: %s", path, ", ".join(extra))
+    return pd.read_csv(path, **{**kwargs, "names": columns + extra})
 
 
 def _normalize_value(value: Any) -> Any:
@@ -25,18 +71,28 @@ def _normalize_record(record: Mapping[str, Any]) -> dict:
     return {key: _normalize_value(value) for key, value in record.items()}
 
 
-def build_dataframe(records: Iterable[Mapping[str, Any]] | None) -> pd.DataFrame:
+def build_dataframe(
+    records: Iterable[Mapping[str, Any]] | None, *, keep_nested: bool = False
+) -> pd.DataFrame:
+    import pandas as pd
+
     if not records:
         return pd.DataFrame()
 
+    if keep_nested:
+        return pd.DataFrame([dict(record) for record in records])
+
     normalized = [_normalize_record(record) for record in records]
     return pd.DataFrame(normalized)
 
 
-def save_dataframe(dataframe: pd.DataFrame, output_path: str) -> None:
+def save_dataframe(dataframe: pd.DataFrame, output_path: str, **kwargs: Any) -> None:
     output = Path(output_path)
     output.parent.mkdir(parents=True, exist_ok=True)
-    dataframe.to_csv(output, index=False)
+    if output.suffix == ".parquet":
+        dataframe.to_parquet(output, index=False, engine="pyarrow", **kwargs)
+    else:
+        dataframe.to_csv(output, index=False, **kwargs)
 
 
 def _slugify(value: str) -> str:
@@ -52,6 +108,8 @@ def query_output_path(base_path: str, query: str) -> Path:
 
 
 def load_existing_ids(path: str) -> MutableSet[str]:
+    import pandas as pd
+
     output = Path(path)
     if not output.exists():
         return set()
@@ -68,6 +126,94 @@ def load_existing_ids(path: str) -> MutableSet[str]:
     return set(ids)
 
 
+class CsvSink:
+    """Append-only CSV writer with an open handle and a cached header.
+
+    The header row is written once. Columns that appear later are appended to
+    the row width and recorded in the sidecar ``<file>.schema.json``, so the
+    existing data is never rewritten and each row costs the same to write.
+
+    The header row is therefore stale once the schema has grown. Every reader
+    in the project takes the column names from :func:`read_columns`
+    (:func:`read_dataframe`, :func:`load_existing_ids`, :func:`iter_records`,
+    the id index and the Parquet compaction), so no row is skipped or
+    misaligned; a bare ``pandas.read_csv`` or ``csv.DictReader`` would be.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.columns: List[str] = read_columns(self.path)
+        self._column_set = set(self.columns)
+        self._handle: Optional[IO[str]] = None
+        self._writer: Any = None
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.path.open("a", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._handle, lineterminator=os.linesep)
+
+    def _extend_schema(self, new_columns: List[str]) -> None:
+        self.columns.extend(new_columns)
+        self._column_set.update(new_columns)
+        sidecar = schema_path(self.path)
+        temporary = sidecar.with_name(f"{sidecar.name}.tmp")
+        temporary.write_text(
+            json.dumps({"columns": self.columns}, ensure_ascii=False), encoding="utf-8"
+        )
+        os.replace(temporary, sidecar)
+
+    def write(self, record: Mapping[str, Any]) -> None:
+        normalized = _normalize_record(record)
+        if self._handle is None:
+            self._open()
+
+        if not self.columns:
+            self.columns = list(normalized)
+            self._column_set = set(self.columns)
+            self._writer.writerow(self.columns)
+        else:
+            new_columns = [column for column in normalized if column not in self._column_set]
+            if new_columns:
+                self._extend_schema(new_columns)
+
+        values = (normalized.get(column) for column in self.columns)
+        self._writer.writerow(["" if value is None else value for value in values])
+        self._handle.flush()
+
+    def sync(self) -> None:
+        if self._handle is not None:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+            self._writer = None
+
+
+_SINKS: Dict[str, CsvSink] = {}
+
+
+def get_sink(path: str) -> CsvSink:
+    key = str(Path(path).resolve())
+    sink = _SINKS.get(key)
+    if sink is None:
+        sink = _SINKS[key] = CsvSink(path)
+    return sink
+
+
+def sync_sinks() -> None:
+    for sink in _SINKS.values():
+        sink.sync()
+
+
+def close_sinks() -> None:
+    while _SINKS:
+        _, sink = _SINKS.popitem()
+        sink.close()
+
+
 def append_record(
     record: Mapping[str, Any], *, path: str, known_ids: MutableSet[str]
 ) -> bool:
@@ -75,40 +221,7 @@ def append_record(
     if resume_id and resume_id in known_ids:
         return False
 
-    output = Path(path)
-    output.parent.mkdir(parents=True, exist_ok=True)
-
-    normalized = _normalize_record(record)
-
-    existing_columns: list[str] = []
-    if output.exists():
-        try:
-            header = _read_csv_with_fallback(output, nrows=0)
-        except pd.errors.EmptyDataError:
-            header = pd.DataFrame()
-        existing_columns = list(header.columns)
-
-    normalized_keys = list(normalized.keys())
-    if existing_columns:
-        new_columns = [column for column in normalized_keys if column not in existing_columns]
-        columns = [*existing_columns, *new_columns]
-
-        if new_columns:
-            try:
-                existing_dataframe = _read_csv_with_fallback(output)
-            except pd.errors.EmptyDataError:
-                existing_dataframe = pd.DataFrame(columns=existing_columns)
-
-            existing_dataframe = existing_dataframe.reindex(columns=columns)
-            existing_dataframe = existing_dataframe.fillna("")
-            existing_dataframe.to_csv(output, index=False)
-    else:
-        columns = normalized_keys
-
-    dataframe = pd.DataFrame([normalized]).reindex(columns=columns)
-    dataframe = dataframe.fillna("")
-    write_header = not output.exists() or not existing_columns
-    dataframe.to_csv(output, mode="a", header=write_header, index=False)
+    get_sink(path).write(record)
 
     if resume_id:
         known_ids.add(resume_id)
@@ -116,14 +229,66 @@ def append_record(
     return True
 
 
-def count_records(path: str) -> int:
+def latest_rows(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """Drop older versions of refreshed resumes: the last row per ``resume_id`` wins.
+
+    A refreshed resume is appended as a new row instead of rewriting the file,
+    so every reader of the CSVs goes through this (or :func:`iter_records`).
+    """
+    if "resume_id" not in dataframe.columns:
+        return dataframe
+    ids = dataframe["resume_id"].fillna("").astype(str).str.strip()
+    return dataframe[(ids == "") | ~ids.duplicated(keep="last")]
+
+
+def _iter_rows(path: Path) -> Iterator[List[str]]:
+    with path.open("r", encoding="utf-8", newline="") as handle:
+        reader = csv.reader(handle)
+        next(reader, None)
+        yield from reader
+
+
+def iter_records(path: str | Path) -> Iterator[Dict[str, str]]:
+    """Stream the rows of a CSV file as dicts without loading it into memory.
+
+    Like :func:`latest_rows`, only the last row of each ``resume_id`` is
+    yielded; a first pass over the file finds it, keeping just the ids.
+    """
+    path = Path(path)
+    columns = read_columns(path)
+    position = columns.index("resume_id") if "resume_id" in columns else None
+    last: Dict[str, int] = {}
+    if position is not None:
+        for number, row in enumerate(_iter_rows(path)):
+            if position < len(row) and row[position].strip():
+                last[row[position].strip()] = number
+    for number, row in enumerate(_iter_rows(path)):
+        resume_id = row[position].strip() if position is not None and position < len(row) else ""
+        if resume_id and last.get(resume_id) != number:
+            continue
+        yield dict(zip(columns, row))
+
+
+def read_dataframe(path: str | Path) -> pd.DataFrame:
+    """Load a CSV written by :class:`CsvSink` with all its columns.
+
+    Columns from the sidecar schema are applied and only the newest row of
+    each resume is kept (see :func:`latest_rows`). A missing or empty file
+    gives an empty frame.
+    """
+    import pandas as pd
+
     output = Path(path)
     if not output.exists():
-        return 0
+        return pd.DataFrame()
 
     try:
         dataframe = _read_csv_with_fallback(output)
     except pd.errors.EmptyDataError:
-        return 0
+        return pd.DataFrame()
 
-    return len(dataframe.index)
+    return latest_rows(dataframe)
+
+
+def count_records(path: str) -> int:
+    return len(read_dataframe(path).index)
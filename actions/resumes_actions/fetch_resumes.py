@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import time
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from selenium.common.exceptions import WebDriverException
+
+from actions.resumes_actions.parse_resume import parse_resume
+from configs.config import config
+from drivers.use_chrome_driver import block_resources
+from helpers.metrics import metrics
+from helpers.pacer import pacer
+from helpers.selenium_helpers import logger
+from pages.resumes.page_state import MARKERS_JS, PAUSE, PROBED_MARKERS, REFRESH, page_error
+
+FetchResult = Tuple[str, Optional[dict], Optional[Exception]]
+
+_POLL_INTERVAL = 0.05
+
+
+def _open_tab(link: str) -> str:
+    before = set(config.driver.window_handles)
+    logger.info("Открываем резюме в новой вкладке: %s", link)
+    lean = config.browser_mode == "lean"
+    # Блокировка ресурсов действует на одну вкладку, поэтому в lean-режиме
+    # вкладка открывается пустой и получает блокировку до перехода на резюме.
+    config.driver.execute_script(
+        "window.open(arguments[0], '_blank');", "about:blank" if lean else link
+    )
+    opened = [handle for handle in config.driver.window_handles if handle not in before]
+    if not opened:
+        raise WebDriverException(f"Вкладка для {link} не открылась")
+    if lean:
+        config.driver.switch_to.window(opened[-1])
+        block_resources(config.driver)
+        config.driver.execute_script("window.location.href = arguments[0];", link)
+    return opened[-1]
+
+
+# Тот же опрос возвращает адрес и маркеры капчи, входа и удалённого резюме,
+# чтобы классифицировать вкладку без отдельного вызова.
+_READY_SCRIPT = f"""
+const ready = location.href !== 'about:blank' && arguments[1].includes(document.readyState);
+return [location.href, ready, ready ? {MARKERS_JS} : []];
+"""
+
+
+def _is_ready(handle: str) -> Tuple[str, bool, List[str]]:
+    config.driver.switch_to.window(handle)
+    # С pageLoadStrategy=eager достаточно готового DOM, картинки не ждём.
+    states = ["interactive", "complete"] if config.browser_mode == "lean" else ["complete"]
+    url, ready, markers = config.driver.execute_script(_READY_SCRIPT, list(PROBED_MARKERS), states)
+    return url, bool(ready), markers or []
+
+
+def _wait_for_ready_tab(
+    open_tabs: Dict[str, Tuple[str, float]]
+) -> Tuple[str, str, List[str], bool]:
+    """Return ``(handle, url, markers, timed_out)`` of the first tab that is ready or out of time."""
+    timeout = config.wait_time
+    while True:
+        for handle, (_, opened_at) in open_tabs.items():
+            url, ready, markers = _is_ready(handle)
+            if ready or time.monotonic() - opened_at >= timeout:
+                return handle, url, markers, not ready
+        time.sleep(_POLL_INTERVAL)
+
+
+def _close_tab(handle: str, main_handle: str) -> None:
+    try:
+        config.driver.switch_to.window(handle)
+        config.driver.close()
+    except WebDriverException as error:
+        logger.warning("Не удалось закрыть вкладку %s: %s", handle, error)
+    finally:
+        config.driver.switch_to.window(main_handle)
+
+
+def fetch_resumes(links: Iterable[str], *, pool_size: int = 1) -> Iterator[FetchResult]:
+    """Keep up to ``pool_size`` resume tabs loading and parse whichever is ready first.
+
+    Yields ``(link, record, error)`` for every link. Closing the generator early
+    (for example after reaching the resume limit) closes the tabs that are
+    still loading without parsing them.
+    """
+    main_handle = config.driver.current_window_handle
+    pending = deque(links)
+    open_tabs: Dict[str, Tuple[str, float]] = {}
+    pool_size = max(1, pool_size)
+
+    try:
+        while pending or open_tabs:
+            while pending and len(open_tabs) < pool_size:
+                # Tabs that are already loading are harvested instead of
+                # waiting for the pacer with nothing to do.
+                if open_tabs and pacer.ready_in() > 0:
+                    break
+                config.driver.switch_to.window(main_handle)
+                link = pending.popleft()
+                pacer.acquire()
+                try:
+                    with metrics.timer("tab_open"):
+                        handle = _open_tab(link)
+                except WebDriverException as error:
+                    yield link, None, error
+                    continue
+                open_tabs[handle] = (link, time.monotonic())
+
+            if not open_tabs:
+                continue
+
+            with metrics.timer("tab_wait"):
+                handle, url, markers, timed_out = _wait_for_ready_tab(open_tabs)
+            link, _ = open_tabs.pop(handle)
+            state_error = page_error(url, markers)
+            if state_error is None or state_error.state not in {PAUSE, REFRESH}:
+                pacer.observe_url(url, timed_out=timed_out)
+            else:
+                pacer.penalize("captcha" if state_error.state == PAUSE else "throttle")
+            if state_error is not None:
+                # Капча, вход или заглушка: поля не ищем, решение за вызывающим.
+                metrics.increment(f"page_{state_error.reason}")
+                _close_tab(handle, main_handle)
+                yield link, None, state_error
+                continue
+            try:
+                with metrics.timer("resume_parse"):
+                    resume_data = parse_resume()
+            except Exception as error:  # pragma: no cover - depends on remote site
+                result: FetchResult = (link, None, error)
+            else:
+                result = (link, resume_data, None)
+            finally:
+                _close_tab(handle, main_handle)
+            yield result
+    finally:
+        for handle in list(open_tabs):
+            _close_tab(handle, main_handle)
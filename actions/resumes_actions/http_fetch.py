@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from typing import Iterable, Iterator, List, Optional
+
+import aiohttp
+
+from actions.resumes_actions.fetch_resumes import FetchResult, fetch_resumes
+from configs.config import config
+from helpers.browser_session import BrowserSession, export_session
+from helpers.metrics import metrics
+from helpers.pacer import THROTTLE_STATUSES, http_pacer
+from helpers.selenium_helpers import logger
+from pages.resumes.html_parser import parse_resume_html
+from pages.resumes.page_state import PAUSE, SKIP, PageStateError, html_markers, page_error
+
+_GONE_STATUSES = {404, 410}
+
+
+class HttpFetchBlocked(Exception):
+    """The site answered with a login wall, captcha or throttling response."""
+
+
+class HttpResumeFetcher:
+    """Downloads resume pages with a pooled aiohttp session on a background loop.
+
+    The session reuses the browser's cookies and user agent, keeps at most
+    ``concurrency`` connections open and parses pages with the offline parser,
+    so results match ``ResumeDetailPage.collect()``.
+    """
+
+    def __init__(self, session: BrowserSession, *, concurrency: int, timeout: float) -> None:
+        self.session = session
+        self.concurrency = max(1, concurrency)
+        self.timeout = timeout
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="resume-http", daemon=True)
+        self._thread.start()
+        self._client: aiohttp.ClientSession = self._run(self._open_client()).result()
+
+    def _run(self, coroutine) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    async def _open_client(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.concurrency)
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            cookie_jar=aiohttp.DummyCookieJar(),
+        )
+
+    async def _fetch_one(self, link: str, query: str) -> FetchResult:
+        # Runs on the loop thread, so the query label is passed in explicitly.
+        await asyncio.sleep(http_pacer.reserve())
+        started = time.monotonic()
+        try:
+            async with self._client.get(link, headers=self.session.headers(link)) as response:
+                final_url = str(response.url)
+                if response.status in THROTTLE_STATUSES:
+                    http_pacer.penalize("throttle")
+                    raise HttpFetchBlocked(f"HTTP {response.status} for {final_url}")
+                page_source = await response.text(errors="replace")
+            state_error = page_error(final_url, html_markers(page_source))
+            if state_error is None and response.status in _GONE_STATUSES:
+                state_error = PageStateError(SKIP, "removed", final_url)
+            if state_error is not None and state_error.state != SKIP:
+                http_pacer.penalize("captcha" if state_error.state == PAUSE else "throttle")
+                raise HttpFetchBlocked(str(state_error))
+            http_pacer.success()
+            if state_error is not None:
+                metrics.increment(f"page_{state_error.reason}", query=query)
+                return link, None, state_error
+            response.raise_for_status()
+            metrics.observe("http_fetch", time.monotonic() - started, query=query)
+            started = time.monotonic()
+            record = await self._loop.run_in_executor(None, parse_resume_html, page_source, final_url)
+            metrics.observe("resume_parse", time.monotonic() - started, query=query)
+        except asyncio.TimeoutError as error:
+            http_pacer.penalize("timeout")
+            return link, None, error
+        except Exception as error:
+            return link, None, error
+        return link, record, None
+
+    def refresh_session(self, session: BrowserSession) -> None:
+        self.session = session
+
+    def fetch(self, links: Iterable[str]) -> Iterator[FetchResult]:
+        """Yield ``(link, record, error)`` in completion order."""
+        query = metrics.current_query
+        futures = [self._run(self._fetch_one(link, query)) for link in links]
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def close(self) -> None:
+        if not self._loop.is_running():
+            return
+        self._run(self._client.close()).result(timeout=self.timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=self.timeout)
+
+
+_fetcher: Optional[HttpResumeFetcher] = None
+
+
+def get_http_fetcher() -> HttpResumeFetcher:
+    global _fetcher
+    if _fetcher is None:
+        _fetcher = HttpResumeFetcher(
+            export_session(config.driver),
+            concurrency=config.http_concurrency,
+            timeout=config.wait_time,
+        )
+    return _fetcher
+
+
+def close_http_fetcher() -> None:
+    global _fetcher
+    if _fetcher is not None:
+        _fetcher.close()
+        _fetcher = None
+
+
+def fetch_resumes_http(links: Iterable[str]) -> Iterator[FetchResult]:
+    """Fetch resumes over HTTP; pages behind a login wall or captcha go through the browser.
+
+    After a browser retry the cookies are exported again, so a session renewed
+    in the browser is picked up by the following requests.
+    """
+    fetcher = get_http_fetcher()
+    blocked: List[str] = []
+
+    for link, record, error in fetcher.fetch(links):
+        if isinstance(error, HttpFetchBlocked):
+            logger.info("HTTP-запрос резюме заблокирован (%s), повторим в браузере", error)
+            metrics.increment("http_blocked")
+            blocked.append(link)
+            continue
+        yield link, record, error
+
+    if blocked:
+        yield from fetch_resumes(blocked, pool_size=config.tab_pool_size)
+        fetcher.refresh_session(export_session(config.driver))
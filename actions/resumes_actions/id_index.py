@@ -0,0 +1,362 @@
+"""Persistent sidecar index of resume ids and row count for a CSV file."""
+from __future__ import annotations
+
+import csv
+import heapq
+import json
+import mmap
+import os
+from collections.abc import MutableSet
+from pathlib import Path
+from typing import IO, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from actions.resumes_actions.dataframe import read_columns
+from helpers.ru_dates import updated_stamp
+
+_HEADER_SIZE = 256
+_STAMP_WIDTH = 10
+_TAIL_LIMIT = 50_000
+_VERSION = 2
+# Stamp field of a tail line that removes an id instead of adding a row.
+_TOMBSTONE = "-"
+
+Entry = Tuple[str, Optional[int]]
+
+
+def _encode_stamp(stamp: Optional[int]) -> str:
+    return "" if stamp is None else str(stamp)
+
+
+def _decode_stamp(value: str | bytes) -> Optional[int]:
+    value = value.strip()
+    return int(value) if value else None
+
+
+class KnownIdIndex(MutableSet):
+    """Sorted fixed-width id file plus an append-only tail, kept next to a CSV.
+
+    ``<csv>.ids`` starts with a JSON header (row count, CSV size, record width
+    and generation) followed by sorted records of the id and the resume's
+    ``updated_at`` as epoch seconds, padded to a fixed width, so lookups are a
+    binary search over a memory map. Every appended row is logged to
+    ``<csv>.ids.tail`` together with the CSV size after the write; the tail is
+    merged into the sorted file once it grows large and on :meth:`close`.
+    :meth:`discard` logs a tombstone line to the tail, and the id is left out
+    of the sorted file on the next merge.
+    When the recorded size does not match the CSV on disk the index is rebuilt
+    from the CSV.
+
+    A ``read_only`` index never touches the sidecar files: it is meant for
+    processes that read a CSV another process appends to. If the sidecar is
+    stale it falls back to scanning the CSV into memory.
+    """
+
+    def __init__(self, csv_path: str | Path, *, read_only: bool = False) -> None:
+        self.csv_path = Path(csv_path)
+        self.read_only = read_only
+        self.index_path = self.csv_path.with_name(f"{self.csv_path.name}.ids")
+        self.tail_path = self.csv_path.with_name(f"{self.csv_path.name}.ids.tail")
+        self._map: Optional[mmap.mmap] = None
+        self._index_handle: Optional[IO[bytes]] = None
+        self._tail_handle: Optional[IO[str]] = None
+        self._tail: Dict[str, Optional[int]] = {}
+        self._tail_rows = 0
+        # Discarded ids; never also in ``_tail``.
+        self._removed: Set[str] = set()
+        # Kept up to date on every change, so ``len`` needs no scan.
+        self._size = 0
+        self.generation = 0
+        self.width = 0
+        self.base_count = 0
+        self.base_rows = 0
+
+        if self._load():
+            return
+        if read_only:
+            self._tail, self._tail_rows = self._scan_csv()
+            self._size = len(self._tail)
+        else:
+            self.rebuild()
+
+    # ------------------------------------------------------------------
+    # Loading and rebuilding
+    # ------------------------------------------------------------------
+    def _csv_size(self) -> int:
+        try:
+            return self.csv_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def _load(self) -> bool:
+        try:
+            with self.index_path.open("rb") as handle:
+                header = json.loads(handle.read(_HEADER_SIZE).decode("utf-8"))
+        except (OSError, ValueError):
+            return False
+        if header.get("version") != _VERSION:
+            return False
+
+        tail: Dict[str, Optional[int]] = {}
+        removed: Set[str] = set()
+        tail_rows = 0
+        expected_size = int(header["csv_size"])
+        try:
+            with self.tail_path.open("r", encoding="utf-8") as handle:
+                if handle.readline().strip() == f"#{header['generation']}":
+                    for line in handle:
+                        resume_id, size, stamp = line.rstrip("\n").split("\t")
+                        expected_size = int(size)
+                        if stamp == _TOMBSTONE:
+                            tail.pop(resume_id, None)
+                            removed.add(resume_id)
+                            continue
+                        tail_rows += 1
+                        if resume_id:
+                            tail[resume_id] = _decode_stamp(stamp)
+                            removed.discard(resume_id)
+        except FileNotFoundError:
+            pass
+        except ValueError:
+            return False
+
+        if expected_size != self._csv_size():
+            return False
+
+        self.generation = int(header["generation"])
+        self.width = int(header["width"])
+        self.base_count = int(header["count"])
+        self.base_rows = int(header["rows"])
+        self._tail = tail
+        self._tail_rows = tail_rows
+        self._removed = removed
+        self._open_files(reset_tail=False)
+        self._size = (
+            self.base_count
+            + sum(1 for resume_id in tail if self._find(resume_id) is None)
+            - sum(1 for resume_id in removed if self._find(resume_id) is not None)
+        )
+        return True
+
+    def _scan_csv(self) -> Tuple[Dict[str, Optional[int]], int]:
+        entries: Dict[str, Optional[int]] = {}
+        rows = 0
+        if not self.csv_path.exists():
+            return entries, rows
+
+        columns = read_columns(self.csv_path)
+        if "resume_id" not in columns:
+            position = updated = None
+        else:
+            position = columns.index("resume_id")
+            updated = columns.index("updated_at") if "updated_at" in columns else None
+        with self.csv_path.open("r", encoding="utf-8", newline="") as handle:
+            reader = csv.reader(handle)
+            next(reader, None)
+            for row in reader:
+                rows += 1
+                if position is None or position >= len(row) or not row[position].strip():
+                    continue
+                text = row[updated] if updated is not None and updated < len(row) else ""
+                # Later rows are newer versions of the same resume.
+                entries[row[position].strip()] = updated_stamp(text)
+        return entries, rows
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def _close_files(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._index_handle is not None:
+            self._index_handle.close()
+            self._index_handle = None
+        if self._tail_handle is not None:
+            self._tail_handle.close()
+            self._tail_handle = None
+
+    def _open_files(self, *, reset_tail: bool) -> None:
+        if not self.read_only:
+            if reset_tail or not self.tail_path.exists():
+                temporary = self.tail_path.with_name(f"{self.tail_path.name}.tmp")
+                temporary.write_text(f"#{self.generation}\n", encoding="utf-8")
+                os.replace(temporary, self.tail_path)
+            self._tail_handle = self.tail_path.open("a", encoding="utf-8", newline="\n")
+        if self.base_count:
+            self._index_handle = self.index_path.open("rb")
+            self._map = mmap.mmap(self._index_handle.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _write_base(self, entries: Iterable[Entry], *, width: int, rows: int, csv_size: int) -> None:
+        """Write sorted unique ``entries`` as the new base and start an empty tail."""
+        generation = self.generation + 1
+        count = 0
+
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.index_path.with_name(f"{self.index_path.name}.tmp")
+        with temporary.open("wb") as handle:
+            handle.write(b" " * _HEADER_SIZE)
+            for resume_id, stamp in entries:
+                handle.write(
+                    resume_id.encode().ljust(width)
+                    + _encode_stamp(stamp).encode().rjust(_STAMP_WIDTH)
+                    + b"\n"
+                )
+                count += 1
+            header = {
+                "version": _VERSION,
+                "generation": generation,
+                "width": width,
+                "count": count,
+                "rows": rows,
+                "csv_size": csv_size,
+            }
+            handle.seek(0)
+            handle.write(json.dumps(header).encode("utf-8").ljust(_HEADER_SIZE - 1) + b"\n")
+
+        # The new base already contains the old tail, so a tail whose generation
+        # no longer matches is ignored if we stop before replacing it below.
+        self._close_files()
+        os.replace(temporary, self.index_path)
+
+        self.generation = generation
+        self.width = width
+        self.base_count = count
+        self.base_rows = rows
+        self._tail = {}
+        self._tail_rows = 0
+        self._removed = set()
+        self._size = count
+        self._open_files(reset_tail=True)
+
+    def rebuild(self) -> None:
+        """Recreate the index from the CSV file."""
+        entries, rows = self._scan_csv()
+        ordered = sorted(entries.items(), key=lambda entry: entry[0].encode())
+        width = max((len(resume_id.encode()) for resume_id, _ in ordered), default=0)
+        self._write_base(ordered, width=width, rows=rows, csv_size=self._csv_size())
+
+    def _merged_entries(self) -> Iterator[Entry]:
+        # heapq.merge is stable, so for equal ids the tail entry (newer) comes last.
+        tail = sorted(self._tail.items(), key=lambda entry: entry[0].encode())
+        pending: Optional[Entry] = None
+        base = (entry for entry in self._iter_base() if entry[0] not in self._removed)
+        for entry in heapq.merge(base, tail, key=lambda entry: entry[0].encode()):
+            if pending is not None and pending[0] != entry[0]:
+                yield pending
+            pending = entry
+        if pending is not None:
+            yield pending
+
+    def compact(self) -> None:
+        """Merge the tail into the sorted id file."""
+        if self.read_only or not (self._tail_rows or self._removed):
+            return
+        width = max([self.width, *(len(resume_id.encode()) for resume_id in self._tail)])
+        self._write_base(
+            self._merged_entries(), width=width, rows=self.rows, csv_size=self._csv_size()
+        )
+
+    def _log(self, resume_id: str, stamp: str) -> None:
+        if not self.read_only:
+            self._tail_handle.write(f"{resume_id}\t{self._csv_size()}\t{stamp}\n")
+            self._tail_handle.flush()
+
+    def record_row(self, resume_id: str = "", updated_at: str = "") -> None:
+        """Log one row appended to the CSV (``resume_id`` may be empty)."""
+        resume_id = resume_id.strip()
+        stamp = updated_stamp(updated_at)
+        self._log(resume_id, _encode_stamp(stamp))
+        self._tail_rows += 1
+        if resume_id:
+            if resume_id not in self:
+                self._size += 1
+            self._removed.discard(resume_id)
+            self._tail[resume_id] = stamp
+        self._maybe_compact()
+
+    def _maybe_compact(self) -> None:
+        if len(self._tail) + len(self._removed) >= _TAIL_LIMIT:
+            self.compact()
+
+    def close(self) -> None:
+        self.compact()
+        self._close_files()
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+    @property
+    def rows(self) -> int:
+        """Rows in the CSV, including older versions of refreshed resumes."""
+        return self.base_rows + self._tail_rows
+
+    def _entry(self, position: int) -> Tuple[bytes, bytes]:
+        start = _HEADER_SIZE + position * (self.width + _STAMP_WIDTH + 1)
+        record = self._map[start:start + self.width + _STAMP_WIDTH]
+        return record[: self.width].rstrip(b" "), record[self.width:]
+
+    def _iter_base(self) -> Iterator[Entry]:
+        for position in range(self.base_count if self._map is not None else 0):
+            resume_id, stamp = self._entry(position)
+            yield resume_id.decode(), _decode_stamp(stamp)
+
+    def _find(self, resume_id: str) -> Optional[int]:
+        if self._map is None:
+            return None
+        target = resume_id.encode()
+        if len(target) > self.width:
+            return None
+        low, high = 0, self.base_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.base_count and self._entry(low)[0] == target:
+            return low
+        return None
+
+    def updated(self, resume_id: str) -> Optional[int]:
+        """Stored ``updated_at`` of a resume as epoch seconds, if known."""
+        if resume_id in self._removed:
+            return None
+        if resume_id in self._tail:
+            return self._tail[resume_id]
+        position = self._find(resume_id)
+        return None if position is None else _decode_stamp(self._entry(position)[1])
+
+    def __contains__(self, resume_id: object) -> bool:
+        if not isinstance(resume_id, str) or resume_id in self._removed:
+            return False
+        return resume_id in self._tail or self._find(resume_id) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        yield from (
+            resume_id for resume_id, _ in self._iter_base() if resume_id not in self._removed
+        )
+        yield from (resume_id for resume_id in self._tail if self._find(resume_id) is None)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, resume_id: str) -> None:
+        self.record_row(resume_id)
+
+    def discard(self, resume_id: str) -> None:
+        """Forget ``resume_id``; its rows stay in the CSV.
+
+        The removal survives reopening, but a rebuild from the CSV (after the
+        file changed behind the index) brings the id back.
+        """
+        resume_id = resume_id.strip()
+        if resume_id not in self:
+            return
+        self._log(resume_id, _TOMBSTONE)
+        self._tail.pop(resume_id, None)
+        self._removed.add(resume_id)
+        self._size -= 1
+        self._maybe_compact()
+
+
+__all__ = ["KnownIdIndex"]
@@ -0,0 +1,360 @@
+"""Near-duplicate resumes across all queries via MinHash and locality-sensitive hashing.
+
+The same person often publishes several resumes with different ids and nearly
+the same ``work_experience`` and ``self_description``. Each resume is reduced
+to a MinHash signature of the word shingles of those two fields; the
+signature is split into bands and each band is hashed to a bucket. Resumes
+that share a bucket are candidates, and only candidates are compared, so a
+lookup costs a few index seeks however many resumes are stored.
+
+Signatures (512 bytes each) and buckets live in a SQLite file next to the
+output. Matches above the threshold are recorded as pairs and merged into
+clusters; with ``NEAR_DUPLICATES=1`` the storage backends update the file as
+they write.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+import sqlite3
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from actions.resumes_actions.dataframe import iter_records
+from helpers.metrics import metrics
+from helpers.selenium_helpers import logger
+
+NUM_PERM = 128
+# 16 bands of 8 rows: pairs at 0.8 similarity become candidates with ~94%
+# probability, pairs at 0.5 with ~6%.
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+# Resumes with less text than this say nothing about who wrote them.
+MIN_SHINGLES = 8
+# Boilerplate descriptions can fill a bucket; candidates beyond this are ignored.
+MAX_CANDIDATES = 200
+TEXT_FIELDS = ("work_experience", "self_description")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signatures (
+    resume_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL DEFAULT '',
+    cluster TEXT NOT NULL,
+    signature BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS signatures_cluster ON signatures (cluster);
+CREATE TABLE IF NOT EXISTS buckets (
+    bucket INTEGER NOT NULL,
+    resume_id TEXT NOT NULL,
+    PRIMARY KEY (bucket, resume_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS buckets_resume_id ON buckets (resume_id);
+CREATE TABLE IF NOT EXISTS pairs (
+    resume_id TEXT NOT NULL,
+    other_id TEXT NOT NULL,
+    similarity REAL NOT NULL,
+    PRIMARY KEY (resume_id, other_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS pairs_other_id ON pairs (other_id);
+"""
+
+_WORD = re.compile(r"[^\W\d_]+")
+# Fixed seed: signatures written by different runs and processes must agree.
+_rng = np.random.default_rng(20240601)
+# Multiply-shift hashing: (a * x + b) mod 2**64, upper 32 bits; ``a`` is odd.
+_A = _rng.integers(1, 2**63, size=NUM_PERM, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+_B = _rng.integers(0, 2**63, size=NUM_PERM, dtype=np.uint64)
+_SHIFT = np.uint64(32)
+
+
+def shingles(record: Mapping[str, Any]) -> set:
+    """Hashed word ``SHINGLE_SIZE``-grams of the text fields; digits are dropped
+    so changing durations and dates do not hide a copy."""
+    text = " ".join(str(record.get(field) or "") for field in TEXT_FIELDS)
+    words = _WORD.findall(text.lower().replace("ё", "е"))
+    return {
+        zlib.crc32(" ".join(words[start : start + SHINGLE_SIZE]).encode("utf-8"))
+        for start in range(max(0, len(words) - SHINGLE_SIZE + 1))
+    }
+
+
+def minhash(hashed_shingles: Iterable[int]) -> np.ndarray:
+    """The ``NUM_PERM`` minimum hash values of a shingle set, as ``uint32``."""
+    values = np.fromiter(hashed_shingles, dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        hashed = (_A[:, None] * values[None, :] + _B[:, None]) >> _SHIFT
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def signature_of(record: Mapping[str, Any]) -> Optional[np.ndarray]:
+    hashed = shingles(record)
+    return minhash(hashed) if len(hashed) >= MIN_SHINGLES else None
+
+
+def band_buckets(signature: np.ndarray) -> List[int]:
+    """One bucket key per band; the band number is hashed in so bands never collide."""
+    keys = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(
+            signature[band * ROWS : (band + 1) * ROWS].tobytes(),
+            digest_size=8,
+            salt=band.to_bytes(2, "little"),
+        ).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
+
+
+def similarity(left: np.ndarray, right: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the shingle sets behind two signatures."""
+    return float(np.count_nonzero(left == right)) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    """Signature store that flags and clusters near-duplicate resumes.
+
+    :meth:`add_resume` finds the already stored resumes whose estimated
+    similarity is at least ``threshold``, records the pairs and merges their
+    clusters (a cluster is named after its smallest resume id). Changes are
+    committed by :meth:`flush` or every ``batch_size`` resumes.
+    """
+
+    def __init__(self, path: str | Path, *, threshold: float = 0.8, batch_size: int = 200) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.threshold = threshold
+        self.batch_size = max(1, batch_size)
+        self.connection = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+        self._pending = 0
+
+    def candidates(self, resume_id: str, buckets: List[int]) -> Iterator[Tuple[str, str, np.ndarray]]:
+        placeholders = ", ".join("?" for _ in buckets)
+        rows = self.connection.execute(
+            "SELECT s.resume_id, s.cluster, s.signature FROM signatures s WHERE s.resume_id IN ("
+            f"SELECT DISTINCT resume_id FROM buckets WHERE bucket IN ({placeholders}) "
+            "AND resume_id != ? LIMIT ?)",
+            (*buckets, resume_id, MAX_CANDIDATES),
+        )
+        for other_id, cluster, blob in rows:
+            yield other_id, cluster, np.frombuffer(blob, dtype=np.uint32)
+
+    def add_resume(self, record: Mapping[str, Any]) -> List[Tuple[str, float]]:
+        """Store the signature of ``record``; return its near-duplicates with similarities."""
+        resume_id = str(record.get("resume_id") or "").strip()
+        signature = signature_of(record) if resume_id else None
+        if signature is None:
+            return []
+        buckets = band_buckets(signature)
+
+        matches: List[Tuple[str, float]] = []
+        clusters = set()
+        for other_id, cluster, other in self.candidates(resume_id, buckets):
+            score = similarity(signature, other)
+            if score >= self.threshold:
+                matches.append((other_id, score))
+                clusters.add(cluster)
+
+        row = self.connection.execute(
+            "SELECT cluster FROM signatures WHERE resume_id = ?", (resume_id,)
+        ).fetchone()
+        # A stored resume that was updated keeps its cluster and gets fresh pairs.
+        clusters.add(row[0] if row else resume_id)
+        cluster = min(clusters)
+        merged = sorted(clusters - {cluster})
+        if merged:
+            self.connection.execute(
+                f"UPDATE signatures SET cluster = ? WHERE cluster IN ({', '.join('?' for _ in merged)})",
+                (cluster, *merged),
+            )
+        self.connection.execute("DELETE FROM buckets WHERE resume_id = ?", (resume_id,))
+        self.connection.execute("DELETE FROM pairs WHERE resume_id = ?", (resume_id,))
+        self.connection.execute(
+            "INSERT OR REPLACE INTO signatures (resume_id, url, title, cluster, signature) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (
+                resume_id,
+                str(record.get("url") or ""),
+                str(record.get("full_name") or record.get("desired_position") or record.get("title") or ""),
+                cluster,
+                signature.tobytes(),
+            ),
+        )
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO buckets (bucket, resume_id) VALUES (?, ?)",
+            [(bucket, resume_id) for bucket in buckets],
+        )
+        self.connection.executemany(
+            "INSERT OR REPLACE INTO pairs (resume_id, other_id, similarity) VALUES (?, ?, ?)",
+            [(resume_id, other_id, score) for other_id, score in matches],
+        )
+        if matches:
+            metrics.increment("near_duplicates")
+            best_id, best_score = max(matches, key=lambda match: match[1])
+            logger.info("Похожее резюме: %s ~ %s (%.0f%%)", resume_id, best_id, best_score * 100)
+
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+        return matches
+
+    def add_membership(self, query: str, resume_id: str) -> None:
+        # Duplicates are searched across all queries.
+        return None
+
+    def flush(self) -> None:
+        if self._pending:
+            self.connection.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+    # ------------------------------------------------------------------
+    # Reports
+    # ------------------------------------------------------------------
+    def clusters(self, *, min_size: int = 2) -> List[Dict[str, Any]]:
+        """Clusters with at least ``min_size`` resumes, largest first."""
+        rows = self.connection.execute(
+            "SELECT cluster, COUNT(*) AS size FROM signatures GROUP BY cluster "
+            "HAVING size >= ? ORDER BY size DESC, cluster",
+            (max(1, min_size),),
+        ).fetchall()
+        result = []
+        for cluster, size in rows:
+            members = self.connection.execute(
+                "SELECT resume_id, url, title FROM signatures WHERE cluster = ? ORDER BY resume_id",
+                (cluster,),
+            )
+            result.append(
+                {
+                    "cluster": cluster,
+                    "size": size,
+                    "resumes": [
+                        {"resume_id": resume_id, "url": url, "title": title}
+                        for resume_id, url, title in members
+                    ],
+                }
+            )
+        return result
+
+    def similar(self, resume_id: str) -> List[Tuple[str, float]]:
+        rows = self.connection.execute(
+            "SELECT other_id, similarity FROM pairs WHERE resume_id = ? "
+            "UNION SELECT resume_id, similarity FROM pairs WHERE other_id = ? "
+            "ORDER BY 2 DESC",
+            (resume_id, resume_id),
+        )
+        return [(other_id, score) for other_id, score in rows]
+
+    def stats(self) -> Dict[str, int]:
+        count = lambda sql: self.connection.execute(sql).fetchone()[0]  # noqa: E731
+        return {
+            "resumes": count("SELECT COUNT(*) FROM signatures"),
+            "pairs": count("SELECT COUNT(*) FROM pairs"),
+            "clusters": count(
+                "SELECT COUNT(*) FROM (SELECT cluster FROM signatures GROUP BY cluster "
+                "HAVING COUNT(*) > 1)"
+            ),
+        }
+
+
+def backfill(index: NearDuplicateIndex, source_path: str) -> int:
+    """Add every resume stored in the general CSV or the SQLite backend database."""
+    source = Path(source_path)
+    if source.suffix in {".sqlite", ".db"}:
+        from actions.resumes_actions.sqlite_storage import SqliteStorage
+
+        storage = SqliteStorage(str(source))
+        try:
+            return _add_all(index, storage.iter_records())
+        finally:
+            storage.close()
+    if not source.exists():
+        return 0
+    return _add_all(index, iter_records(source))
+
+
+def _add_all(index: NearDuplicateIndex, records: Iterable[Mapping[str, Any]]) -> int:
+    added = 0
+    for record in records:
+        index.add_resume(record)
+        added += 1
+    index.flush()
+    return added
+
+
+def open_near_duplicates() -> Optional[NearDuplicateIndex]:
+    """The index at ``NEAR_DUPLICATES_PATH`` with ``NEAR_DUPLICATES=1``, otherwise ``None``."""
+    from configs.config import config
+
+    if not (config.near_duplicates and config.near_duplicates_path):
+        return None
+    return NearDuplicateIndex(config.near_duplicates_path, threshold=config.near_duplicate_threshold)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from configs.config import config
+
+    parser = argparse.ArgumentParser(description="Find near-duplicate resumes with MinHash/LSH.")
+    parser.add_argument("--index", default=config.near_duplicates_path, help="Path to the index file")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=config.near_duplicate_threshold,
+        help="Minimum estimated similarity of work experience and self description",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fill = commands.add_parser("backfill", help="Add resumes already stored in the output")
+    fill.add_argument(
+        "--source",
+        default=config.sqlite_path if config.output_backend == "sqlite" else config.output_path,
+        help="General CSV file or SQLite database",
+    )
+    report = commands.add_parser("clusters", help="List clusters of near-duplicates")
+    report.add_argument("--min-size", type=int, default=2)
+    report.add_argument("--json", action="store_true", help="print JSON lines")
+    lookup = commands.add_parser("similar", help="Near-duplicates of one resume")
+    lookup.add_argument("resume_id")
+    commands.add_parser("stats", help="Print index size")
+    args = parser.parse_args(argv)
+
+    if not args.index:
+        parser.error("NEAR_DUPLICATES_PATH is empty; pass --index")
+    index = NearDuplicateIndex(args.index, threshold=args.threshold)
+    try:
+        if args.command == "backfill":
+            added = backfill(index, args.source)
+            print(f"Обработано резюме: {added}, кластеров дублей: {index.stats()['clusters']}")
+        elif args.command == "clusters":
+            clusters = index.clusters(min_size=args.min_size)
+            for cluster in clusters:
+                if args.json:
+                    print(json.dumps(cluster, ensure_ascii=False))
+                    continue
+                print(f"{cluster['cluster']} ({cluster['size']}):")
+                for member in cluster["resumes"]:
+                    print(f"  {member['resume_id']}\t{member['title']}\t{member['url']}")
+            if not args.json:
+                print(f"Кластеров: {len(clusters)}")
+        elif args.command == "similar":
+            for other_id, score in index.similar(args.resume_id):
+                print(f"{other_id}\t{score:.2f}")
+        else:
+            print(json.dumps(index.stats(), ensure_ascii=False))
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
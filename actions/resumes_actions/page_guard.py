@@ -0,0 +1,84 @@
+"""Recovery from pages the classifier stopped: login walls and captchas."""
+from __future__ import annotations
+
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from configs.config import config
+from helpers.metrics import metrics
+from helpers.pacer import pacer
+from helpers.selenium_helpers import logger
+from pages.resumes.page_state import PAUSE, REFRESH, PageStateError, read_page_state
+
+_HUMAN_POLL = 2.0
+
+
+@contextmanager
+def _scratch_tab() -> Iterator[WebDriver]:
+    # Отдельная вкладка: главное окно остаётся на выдаче (важно для PAGINATION=click).
+    driver = config.driver
+    main_handle = driver.current_window_handle
+    before = set(driver.window_handles)
+    driver.execute_script("window.open('about:blank', '_blank');")
+    opened = [handle for handle in driver.window_handles if handle not in before]
+    driver.switch_to.window(opened[-1])
+    try:
+        yield driver
+    finally:
+        try:
+            driver.close()
+        except WebDriverException as error:
+            logger.warning("Не удалось закрыть служебную вкладку: %s", error)
+        driver.switch_to.window(main_handle)
+
+
+def _is_blocked(driver: WebDriver) -> bool:
+    state, _, _ = read_page_state(driver)
+    return state in {PAUSE, REFRESH}
+
+
+def _wait_for_human(driver: WebDriver, reason: str) -> bool:
+    if config.browser_mode == "lean" or not config.human_wait:
+        logger.error("Сайт требует вмешательства (%s), но ждать человека некому", reason)
+        return False
+
+    logger.warning(
+        "Сайт требует вмешательства (%s): решите капчу или войдите в аккаунт в окне браузера, "
+        "ждём до %.0f с",
+        reason,
+        config.human_wait,
+    )
+    deadline = time.monotonic() + config.human_wait
+    with metrics.timer("human_wait"):
+        while time.monotonic() < deadline:
+            time.sleep(_HUMAN_POLL)
+            if not _is_blocked(driver):
+                logger.info("Страница снова доступна, продолжаем сбор")
+                return True
+    return False
+
+
+def recover(error: PageStateError, link: str) -> bool:
+    """Try to get past the captcha or login wall met on ``link``.
+
+    A login wall first gets a session refresh: a visit to the home page renews
+    the site's cookies, which is often enough. A captcha is retried once the
+    pacer's pause is over. If the page is still blocked, the browser window is
+    left on it for a human for up to ``HUMAN_WAIT`` seconds. Returns ``True``
+    when ``link`` can be opened again.
+    """
+    metrics.increment(f"recover_{error.state}")
+    with _scratch_tab() as driver:
+        if error.state == REFRESH:
+            pacer.acquire()
+            driver.get(config.base_page)
+        pacer.acquire()
+        driver.get(link)
+        if not _is_blocked(driver):
+            logger.info("Доступ восстановлен (%s) без участия человека", error.reason)
+            return True
+        return _wait_for_human(driver, error.reason)
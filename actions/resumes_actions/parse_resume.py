@@ -4,4 +4,11 @@ from pages.resumes.detail_page import ResumeDetailPage
 
 def parse_resume():
     page = ResumeDetailPage(config.driver)
+    if config.resume_parser == "script":
+        return page.collect_script()
+    if config.resume_parser == "html":
+        from pages.resumes.html_parser import parse_resume_html
+
+        page.wait_for_document_ready()
+        return parse_resume_html(config.driver.page_source, page.current_url)
     return page.collect()
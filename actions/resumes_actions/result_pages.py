@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from actions.resumes_actions.serp_prefetch import SerpPrefetcher
+from actions.resumes_actions.setup_search import setup_search
+from configs.config import config
+from helpers.browser_session import export_session
+from helpers.metrics import metrics
+from helpers.pacer import pacer
+from helpers.selenium_helpers import logger
+from pages.resumes.page_state import PAUSE, REFRESH, PageStateError, classify_page
+from pages.resumes.search_page import ResumeSearchPage
+
+ResultPage = Tuple[int, List[Dict[str, str]]]
+
+# How many times a SERP page that came back as a captcha or throttle page is
+# loaded again (after the pacer's pause) before the query is given up.
+_BLOCKED_RETRIES = 3
+
+
+def _blocked(url: str) -> PageStateError:
+    # A blocked page has no cards; returning them empty would end the query
+    # as if the results ran out and mark its checkpoint finished.
+    state, reason = classify_page(url, ())
+    if state not in {PAUSE, REFRESH}:
+        state, reason = PAUSE, "throttle"
+    return PageStateError(state, reason, url)
+
+
+def _extract_cards(search_page: ResumeSearchPage) -> List[Dict[str, str]]:
+    with metrics.timer("card_extraction"):
+        return search_page.extract_resume_cards()
+
+
+def _count_page(cards: List[Dict[str, str]]) -> None:
+    metrics.increment("pages")
+    metrics.increment("cards", len(cards))
+
+
+def _iter_clicked_pages(query: str) -> Iterator[ResultPage]:
+    pacer.acquire()
+    with metrics.timer("serp_load"):
+        search_page = setup_search(query)
+    if pacer.observe_url(search_page.current_url):
+        raise _blocked(search_page.current_url)
+    page_index = 0
+    while True:
+        cards = _extract_cards(search_page)
+        _count_page(cards)
+        yield page_index, cards
+        pacer.acquire()
+        with metrics.timer("pagination"):
+            moved = search_page.go_to_next_page()
+        if not moved:
+            return
+        if pacer.observe_url(search_page.current_url):
+            raise _blocked(search_page.current_url)
+        page_index += 1
+
+
+def _iter_url_pages(query: str, start_page: int) -> Iterator[ResultPage]:
+    search_page = ResumeSearchPage(config.driver)
+    prefetcher: Optional[SerpPrefetcher] = None
+    page_index = start_page
+    retries = 0
+
+    try:
+        while True:
+            started = time.monotonic()
+            cards = prefetcher.get(page_index) if prefetcher else None
+            if cards is not None:
+                metrics.increment("prefetch_hits")
+            else:
+                pacer.acquire()
+                with metrics.timer("serp_load"):
+                    search_page.open_page(config.resume_search_url, query, page_index)
+                if pacer.observe_url(search_page.current_url):
+                    if retries < _BLOCKED_RETRIES:
+                        retries += 1
+                        continue
+                    raise _blocked(search_page.current_url)
+                cards = _extract_cards(search_page)
+            retries = 0
+            if page_index > start_page:
+                metrics.observe("pagination", time.monotonic() - started)
+            _count_page(cards)
+            if not cards:
+                return
+
+            if prefetcher is None and config.serp_prefetch > 0:
+                # Cookies are only available once the browser is on the SERP domain.
+                prefetcher = SerpPrefetcher(
+                    export_session(config.driver),
+                    search_url=config.resume_search_url,
+                    query=query,
+                    start_page=page_index + 1,
+                    depth=config.serp_prefetch,
+                    timeout=config.wait_time,
+                ).start()
+
+            yield page_index, cards
+            page_index += 1
+    finally:
+        if prefetcher is not None:
+            prefetcher.stop()
+
+
+def iter_result_pages(query: str, *, start_page: int = 0) -> Iterator[ResultPage]:
+    """Yield ``(page_index, cards)`` for every SERP page of ``query``.
+
+    Raises :class:`PageStateError` when the SERP stays on a captcha, login or
+    throttle page, so the query stops with its checkpoint in place.
+    """
+    if config.pagination == "click":
+        if start_page:
+            logger.info("Переход сразу на страницу %s недоступен при PAGINATION=click", start_page)
+        return _iter_clicked_pages(query)
+    return _iter_url_pages(query, start_page)
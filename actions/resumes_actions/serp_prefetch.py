@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import queue
+import threading
+import urllib.error
+import urllib.request
+from typing import Dict, List, Optional, Tuple
+
+from helpers.browser_session import BrowserSession
+from helpers.pacer import pacer
+from helpers.selenium_helpers import logger
+from pages.resumes.html_parser import parse_search_cards_html
+from pages.resumes.search_page import ResumeSearchPage
+
+Cards = List[Dict[str, str]]
+
+_PUT_TIMEOUT = 0.5
+
+
+class SerpPrefetcher:
+    """Downloads upcoming SERP pages over HTTP while resumes are being parsed.
+
+    Pages are fetched in order into a bounded queue of ``(page, cards)``. A page
+    that cannot be fetched or yields no cards is queued as ``None`` and ends the
+    producer: the caller then loads that page (and the following ones) in the
+    browser, which also decides whether the results are really exhausted.
+    """
+
+    def __init__(
+        self,
+        session: BrowserSession,
+        *,
+        search_url: str,
+        query: str,
+        start_page: int,
+        depth: int,
+        timeout: float,
+    ) -> None:
+        self.session = session
+        self.search_url = search_url
+        self.query = query
+        self.timeout = timeout
+        self._next_page = start_page
+        self._pages: "queue.Queue[Tuple[int, Optional[Cards]]]" = queue.Queue(maxsize=max(1, depth))
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="serp-prefetch", daemon=True)
+
+    def start(self) -> "SerpPrefetcher":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join(timeout=self.timeout)
+
+    def get(self, page: int) -> Optional[Cards]:
+        """Return prefetched cards for ``page`` or ``None`` if the browser must load it."""
+        while True:
+            try:
+                fetched_page, cards = self._pages.get(timeout=_PUT_TIMEOUT)
+            except queue.Empty:
+                if not self._thread.is_alive():
+                    return None
+                continue
+            if fetched_page == page:
+                return cards
+            if fetched_page > page:
+                return None
+
+    def _fetch(self, page: int) -> Optional[Cards]:
+        url = ResumeSearchPage.page_url(self.search_url, self.query, page)
+        request = urllib.request.Request(url, headers=self.session.headers(url))
+        pacer.acquire()
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                charset = response.headers.get_content_charset() or "utf-8"
+                page_source = response.read().decode(charset, errors="replace")
+                final_url = response.geturl()
+        except urllib.error.HTTPError as error:
+            pacer.observe_status(error.code, error.geturl() or url)
+            logger.info("SERP page %s prefetch failed: %s", page, error)
+            return None
+        except Exception as error:
+            logger.info("SERP page %s prefetch failed: %s", page, error)
+            return None
+
+        # A captcha or login page: leave it to the browser (and a human).
+        if pacer.observe_url(final_url):
+            return None
+
+        cards = parse_search_cards_html(page_source, final_url)
+        return cards or None
+
+    def _put(self, item: Tuple[int, Optional[Cards]]) -> bool:
+        while not self._stop.is_set():
+            try:
+                self._pages.put(item, timeout=_PUT_TIMEOUT)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            page = self._next_page
+            cards = self._fetch(page)
+            logger.info("Prefetched SERP page %s: %s cards", page, len(cards or []))
+            if not self._put((page, cards)) or cards is None:
+                return
+            self._next_page += 1
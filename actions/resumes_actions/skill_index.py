@@ -0,0 +1,439 @@
+"""Incremental on-disk inverted index from skills to resume ids, with a search CLI.
+
+Postings (normalized skill token -> resume id) live in a SQLite file next to
+the output, together with the few typed fields searches filter on and the
+search queries each resume was found by. With ``SKILL_INDEX=1`` the storage
+backends update it as they write, so lookups never read the CSVs: an AND/OR skill search over
+hundreds of thousands of resumes is a handful of index seeks.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sqlite3
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from actions.resumes_actions.dataframe import _slugify, iter_records
+from helpers.normalize import normalize_record
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    token TEXT NOT NULL,
+    resume_id TEXT NOT NULL,
+    PRIMARY KEY (token, resume_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_resume_id ON postings (resume_id);
+CREATE TABLE IF NOT EXISTS resumes (
+    resume_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL DEFAULT '',
+    full_name TEXT NOT NULL DEFAULT '',
+    desired_position TEXT NOT NULL DEFAULT '',
+    location TEXT NOT NULL DEFAULT '',
+    skills TEXT NOT NULL DEFAULT '',
+    salary_amount INTEGER,
+    salary_currency TEXT NOT NULL DEFAULT '',
+    age_years INTEGER,
+    experience_months INTEGER,
+    updated_at_iso TEXT NOT NULL DEFAULT ''
+);
+-- ``query`` is the slug of the search query, as in the per-query file names.
+CREATE TABLE IF NOT EXISTS memberships (
+    query TEXT NOT NULL,
+    resume_id TEXT NOT NULL,
+    PRIMARY KEY (query, resume_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS memberships_resume_id ON memberships (resume_id);
+"""
+
+_UPSERT_RESUME = """
+INSERT INTO resumes (
+    resume_id, url, full_name, desired_position, location, skills,
+    salary_amount, salary_currency, age_years, experience_months, updated_at_iso
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (resume_id) DO UPDATE SET
+    url = excluded.url,
+    full_name = excluded.full_name,
+    desired_position = excluded.desired_position,
+    location = excluded.location,
+    skills = excluded.skills,
+    salary_amount = excluded.salary_amount,
+    salary_currency = excluded.salary_currency,
+    age_years = excluded.age_years,
+    experience_months = excluded.experience_months,
+    updated_at_iso = excluded.updated_at_iso
+"""
+
+_FREQUENCY_CAP = 5000
+_SEPARATORS = re.compile(r"[;,\n]+")
+_WORDS = re.compile(r"[\s/|]+")
+_EDGE_PUNCTUATION = re.compile(r"^[\s\"'«»()\[\].:-]+|[\s\"'«»()\[\]:-]+$")
+# Common spellings of the same skill; both sides are already normalized.
+ALIASES = {
+    "js": "javascript",
+    "ts": "typescript",
+    "golang": "go",
+    "k8s": "kubernetes",
+    "postgres": "postgresql",
+    "postgre": "postgresql",
+    "ms sql": "mssql",
+    "ci cd": "ci/cd",
+    "reactjs": "react",
+    "react.js": "react",
+    "vue.js": "vue",
+    "node.js": "nodejs",
+}
+
+
+@lru_cache(maxsize=65536)
+def normalize_skill(value: str) -> str:
+    """Lower-case, ``ё`` -> ``е``, single spaces, no quotes around; aliases resolved."""
+    token = _EDGE_PUNCTUATION.sub("", " ".join(value.lower().replace("ё", "е").split()))
+    return ALIASES.get(token, token)
+
+
+@lru_cache(maxsize=65536)
+def skill_tokens(skill: str) -> Tuple[str, ...]:
+    """Tokens for one skill: the whole phrase plus its words, so ``python`` finds ``Python 3``."""
+    phrase = normalize_skill(skill)
+    if not phrase:
+        return ()
+    tokens = {phrase}
+    words = [normalize_skill(word) for word in _WORDS.split(phrase)]
+    if len(words) > 1:
+        tokens.update(word for word in words if len(word) > 1)
+    return tuple(sorted(tokens))
+
+
+def record_skills(record: Mapping[str, Any]) -> List[str]:
+    """Skill strings of a record: ``key_skills`` (or its JSON twin) and ``skill_keywords``."""
+    skills: List[str] = []
+    raw = record.get("key_skills_raw")
+    if isinstance(raw, str) and raw.startswith("["):
+        try:
+            skills.extend(str(item) for item in json.loads(raw))
+        except ValueError:
+            pass
+    elif isinstance(raw, list):
+        skills.extend(str(item) for item in raw)
+    if not skills:
+        skills.extend(_SEPARATORS.split(str(record.get("key_skills") or "")))
+    skills.extend(_SEPARATORS.split(str(record.get("skill_keywords") or "")))
+    return [skill.strip() for skill in skills if skill and skill.strip()]
+
+
+def _casefold(value: Optional[str]) -> str:
+    return (value or "").casefold()
+
+
+class SkillIndex:
+    """Writer and reader of the skill index file.
+
+    :meth:`add_resume` and :meth:`add_membership` are buffered into one
+    transaction that is committed by :meth:`flush` (the background writer
+    calls it once per batch) or every ``batch_size`` changes. The open
+    transaction holds the write lock, so only the process that owns the storage
+    writes the index; worker processes send their memberships to it.
+    """
+
+    def __init__(self, path: str | Path, *, batch_size: int = 200) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, batch_size)
+        self.connection = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(_SCHEMA)
+        # SQLite folds case for ASCII only; locations are mostly Cyrillic.
+        self.connection.create_function("casefold", 1, _casefold, deterministic=True)
+        self._pending = 0
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+    def add_resume(self, record: Mapping[str, Any]) -> None:
+        resume_id = str(record.get("resume_id") or "").strip()
+        if not resume_id:
+            return
+        typed = normalize_record(record)
+        skills = record_skills(record)
+        tokens: Set[str] = set()
+        for skill in skills:
+            tokens.update(skill_tokens(skill))
+
+        # A newer version of the resume replaces its postings.
+        self.connection.execute("DELETE FROM postings WHERE resume_id = ?", (resume_id,))
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO postings (token, resume_id) VALUES (?, ?)",
+            [(token, resume_id) for token in tokens],
+        )
+        self.connection.execute(
+            _UPSERT_RESUME,
+            (
+                resume_id,
+                str(record.get("url") or ""),
+                str(record.get("full_name") or record.get("title") or ""),
+                str(record.get("desired_position") or ""),
+                str(record.get("location") or ""),
+                "; ".join(skills),
+                typed.get("salary_amount"),
+                typed.get("salary_currency") or "",
+                typed.get("age_years"),
+                typed.get("experience_months"),
+                typed.get("updated_at_iso") or "",
+            ),
+        )
+        self._changed()
+
+    def add_membership(self, query: str, resume_id: str) -> None:
+        resume_id = str(resume_id or "").strip()
+        if not resume_id:
+            return
+        self.connection.execute(
+            "INSERT OR IGNORE INTO memberships (query, resume_id) VALUES (?, ?)",
+            (_slugify(query), resume_id),
+        )
+        self._changed()
+
+    def _changed(self) -> None:
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._pending:
+            self.connection.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+    def search(
+        self,
+        *,
+        all_skills: Sequence[str] = (),
+        any_skills: Sequence[str] = (),
+        query: Optional[str] = None,
+        min_salary: Optional[int] = None,
+        max_salary: Optional[int] = None,
+        currency: Optional[str] = None,
+        min_experience: Optional[int] = None,
+        max_age: Optional[int] = None,
+        location: Optional[str] = None,
+        limit: int = 50,
+    ) -> List[Dict[str, Any]]:
+        """Resumes having every skill of ``all_skills`` and at least one of ``any_skills``.
+
+        Filters are ANDed; ``min_experience`` is in months. Newest first.
+        """
+        all_tokens = [normalize_skill(skill) for skill in all_skills if normalize_skill(skill)]
+        any_tokens = [normalize_skill(skill) for skill in any_skills if normalize_skill(skill)]
+        if not all_tokens and not any_tokens:
+            raise ValueError("at least one skill is required")
+
+        # The rarest required skill drives the lookup; the others are probed per
+        # candidate through the primary key, so the cost follows the smallest list.
+        all_tokens = sorted(set(all_tokens), key=self._frequency)
+        any_placeholders = ", ".join("?" for _ in any_tokens)
+        params: List[Any] = []
+        if all_tokens:
+            driver = "SELECT resume_id FROM postings WHERE token = ?"
+            params.append(all_tokens[0])
+        else:
+            driver = " UNION ".join(
+                "SELECT resume_id FROM postings WHERE token = ?" for _ in any_tokens
+            )
+            params.extend(any_tokens)
+
+        conditions: List[str] = []
+        for token in all_tokens[1:]:
+            conditions.append(
+                "EXISTS (SELECT 1 FROM postings p WHERE p.token = ? AND p.resume_id = r.resume_id)"
+            )
+            params.append(token)
+        if all_tokens and any_tokens:
+            conditions.append(
+                "EXISTS (SELECT 1 FROM postings p "
+                f"WHERE p.token IN ({any_placeholders}) AND p.resume_id = r.resume_id)"
+            )
+            params.extend(any_tokens)
+        if query:
+            conditions.append(
+                "EXISTS (SELECT 1 FROM memberships m WHERE m.query = ? AND m.resume_id = r.resume_id)"
+            )
+            params.append(_slugify(query))
+        for clause, value in (
+            ("r.salary_amount >= ?", min_salary),
+            ("r.salary_amount <= ?", max_salary),
+            ("r.salary_currency = ?", currency.upper() if currency else None),
+            ("r.experience_months >= ?", min_experience),
+            ("r.age_years <= ?", max_age),
+            ("instr(casefold(r.location), ?) > 0", location.casefold() if location else None),
+        ):
+            if value is not None:
+                conditions.append(clause)
+                params.append(value)
+
+        params.append(max(1, limit))
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        rows = self.connection.execute(
+            f"SELECT r.* FROM ({driver}) matched JOIN resumes r ON r.resume_id = matched.resume_id "
+            f"{where}ORDER BY r.updated_at_iso DESC LIMIT ?",
+            params,
+        )
+        columns = [description[0] for description in rows.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def _frequency(self, token: str) -> int:
+        # Only the order matters, and anything this common is a poor driver anyway.
+        row = self.connection.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM postings WHERE token = ? LIMIT ?)",
+            (token, _FREQUENCY_CAP),
+        ).fetchone()
+        return int(row[0])
+
+    def stats(self) -> Dict[str, int]:
+        count = lambda sql: self.connection.execute(sql).fetchone()[0]  # noqa: E731
+        return {
+            "resumes": count("SELECT COUNT(*) FROM resumes"),
+            "tokens": count("SELECT COUNT(DISTINCT token) FROM postings"),
+            "postings": count("SELECT COUNT(*) FROM postings"),
+        }
+
+
+def _rebuild_from_sqlite(index: SkillIndex, path: Path) -> int:
+    source = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        indexed = 0
+        for (data,) in source.execute("SELECT data FROM resumes"):
+            index.add_resume(json.loads(data))
+            indexed += 1
+        for query, resume_id in source.execute("SELECT query, resume_id FROM resume_queries"):
+            index.add_membership(query, resume_id)
+    finally:
+        source.close()
+    return indexed
+
+
+def rebuild(index: SkillIndex, source_path: str) -> int:
+    """Back-fill the index from stored resumes; return the number of records read.
+
+    ``source_path`` is the general CSV (the per-query CSVs next to it give the
+    memberships) or the database of the SQLite backend.
+    """
+    from actions.resumes_actions.compact_parquet import query_files
+
+    source = Path(source_path)
+    if source.suffix in {".sqlite", ".db"}:
+        indexed = _rebuild_from_sqlite(index, source)
+        index.flush()
+        return indexed
+
+    indexed = 0
+    if source.exists():
+        for record in iter_records(source):
+            index.add_resume(record)
+            indexed += 1
+    for slug, path in query_files(source):
+        for record in iter_records(path):
+            index.add_membership(slug, record.get("resume_id", ""))
+    index.flush()
+    return indexed
+
+
+def open_skill_index() -> Optional[SkillIndex]:
+    """The index at ``SKILL_INDEX_PATH`` with ``SKILL_INDEX=1``, otherwise ``None``."""
+    from configs.config import config
+
+    if not (config.skill_index and config.skill_index_path):
+        return None
+    return SkillIndex(config.skill_index_path)
+
+
+def _print_results(results: Iterable[Mapping[str, Any]]) -> int:
+    shown = 0
+    for row in results:
+        shown += 1
+        salary = f"{row['salary_amount']} {row['salary_currency']}" if row["salary_amount"] else "—"
+        experience = row["experience_months"]
+        years = f"{experience // 12} г. {experience % 12} мес." if experience is not None else "—"
+        print(
+            f"{row['resume_id']}\t{row['full_name'] or row['desired_position']}\t{salary}\t"
+            f"стаж {years}\t{row['location']}\t{row['url']}"
+        )
+    return shown
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    from configs.config import config
+
+    parser = argparse.ArgumentParser(description="Search resumes by skills using the skill index.")
+    parser.add_argument("--index", default=config.skill_index_path, help="Path to the index file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    search = commands.add_parser("search", help="Find resumes by skills")
+    search.add_argument("--all", nargs="+", default=[], metavar="SKILL", help="every skill is required")
+    search.add_argument("--any", nargs="+", default=[], metavar="SKILL", help="at least one is required")
+    search.add_argument("--query", help="only resumes found by this search query")
+    search.add_argument("--min-salary", type=int)
+    search.add_argument("--max-salary", type=int)
+    search.add_argument("--currency", help="RUB, USD, EUR ...")
+    search.add_argument("--min-years", type=float, help="minimum total experience in years")
+    search.add_argument("--max-age", type=int)
+    search.add_argument("--location", help="substring of the location")
+    search.add_argument("--limit", type=int, default=50)
+    search.add_argument("--json", action="store_true", help="print JSON lines")
+
+    backfill = commands.add_parser("rebuild", help="Index resumes already stored in the CSV files")
+    backfill.add_argument(
+        "--source",
+        default=config.sqlite_path if config.output_backend == "sqlite" else config.output_path,
+        help="General CSV file or SQLite database",
+    )
+
+    commands.add_parser("stats", help="Print index size")
+    args = parser.parse_args(argv)
+
+    if not args.index:
+        parser.error("SKILL_INDEX_PATH is empty; pass --index")
+    index = SkillIndex(args.index)
+    try:
+        if args.command == "rebuild":
+            indexed = rebuild(index, args.source)
+            print(f"Проиндексировано резюме: {indexed} -> {args.index}")
+        elif args.command == "stats":
+            print(json.dumps(index.stats(), ensure_ascii=False))
+        else:
+            try:
+                results = index.search(
+                    all_skills=args.all,
+                    any_skills=args.any,
+                    query=args.query,
+                    min_salary=args.min_salary,
+                    max_salary=args.max_salary,
+                    currency=args.currency,
+                    min_experience=round(args.min_years * 12) if args.min_years is not None else None,
+                    max_age=args.max_age,
+                    location=args.location,
+                    limit=args.limit,
+                )
+            except ValueError as error:
+                parser.error(str(error))
+            if args.json:
+                for row in results:
+                    sys.stdout.write(json.dumps(row, ensure_ascii=False) + "\n")
+            else:
+                print(f"Найдено резюме: {_print_results(results)}")
+    finally:
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,337 @@
+"""SQLite storage backend keyed on ``resume_id``."""
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import os
+import sqlite3
+from collections.abc import MutableSet
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from helpers.normalize import normalize_record
+from helpers.ru_dates import updated_stamp
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    resume_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL DEFAULT '',
+    updated_at TEXT NOT NULL DEFAULT '',
+    updated_stamp INTEGER,
+    saved_at TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resume_queries (
+    query TEXT NOT NULL,
+    resume_id TEXT NOT NULL,
+    saved_at TEXT NOT NULL,
+    PRIMARY KEY (query, resume_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS resume_queries_resume_id ON resume_queries (resume_id);
+"""
+
+_UPSERT_RESUME = """
+INSERT INTO resumes (resume_id, url, updated_at, updated_stamp, saved_at, data)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (resume_id) DO UPDATE SET
+    url = excluded.url,
+    updated_at = excluded.updated_at,
+    updated_stamp = excluded.updated_stamp,
+    saved_at = excluded.saved_at,
+    data = excluded.data
+"""
+
+_INSERT_MEMBERSHIP = """
+INSERT OR IGNORE INTO resume_queries (query, resume_id, saved_at) VALUES (?, ?, ?)
+"""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+
+def _normalize(record: Mapping[str, Any]) -> Dict[str, Any]:
+    return {
+        key: json.dumps(value, ensure_ascii=False) if isinstance(value, (list, dict)) else value
+        for key, value in record.items()
+    }
+
+
+# Reserved ids kept in memory before the set drops those that reached the database.
+_LOCAL_LIMIT = 10_000
+
+
+class _IdSet(MutableSet):
+    """Live view of stored and pending ids plus ids reserved in memory.
+
+    Only ids that this storage will not write are held in memory: a worker
+    process reserves the general ids it hands to the parent. Once the parent
+    commits them they are found in the database and dropped from memory.
+    """
+
+    def __init__(self, storage: "SqliteStorage", query: Optional[str] = None) -> None:
+        self._storage = storage
+        self._query = query
+        self._local: Set[str] = set()
+        self._prune_at = _LOCAL_LIMIT
+
+    def _stored(self, resume_id: str) -> bool:
+        if self._storage.is_pending(resume_id, self._query):
+            return True
+        if self._query is None:
+            sql, params = "SELECT 1 FROM resumes WHERE resume_id = ?", (resume_id,)
+        else:
+            sql = "SELECT 1 FROM resume_queries WHERE query = ? AND resume_id = ?"
+            params = (self._query, resume_id)
+        return self._storage.connection.execute(sql, params).fetchone() is not None
+
+    def _prune(self) -> None:
+        self._local = {resume_id for resume_id in self._local if not self._stored(resume_id)}
+        # Ids the writer has not committed yet stay; do not rescan them on every add.
+        self._prune_at = max(_LOCAL_LIMIT, 2 * len(self._local))
+
+    def __contains__(self, resume_id: object) -> bool:
+        return isinstance(resume_id, str) and (resume_id in self._local or self._stored(resume_id))
+
+    def __iter__(self) -> Iterator[str]:
+        self._storage.flush()
+        yield from self._local
+        for (resume_id,) in self._storage.connection.execute(*self._select_ids()):
+            if resume_id not in self._local:
+                yield resume_id
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def _select_ids(self) -> Tuple[str, Tuple[Any, ...]]:
+        if self._query is None:
+            return "SELECT resume_id FROM resumes", ()
+        return "SELECT resume_id FROM resume_queries WHERE query = ?", (self._query,)
+
+    def add(self, resume_id: str) -> None:
+        if self._stored(resume_id):
+            return
+        self._local.add(resume_id)
+        if len(self._local) >= self._prune_at:
+            self._prune()
+
+    def discard(self, resume_id: str) -> None:
+        self._local.discard(resume_id)
+
+
+class SqliteStorage:
+    """Resumes in one table keyed on ``resume_id`` and query membership in another.
+
+    Writes are buffered and applied in one transaction every ``batch_size``
+    records and on :meth:`flush`/:meth:`close`. Id sets returned by
+    :meth:`general_ids` and :meth:`query_ids` answer membership checks with an
+    indexed lookup instead of loading every id into memory. With ``normalize``
+    the stored JSON also carries the typed columns of ``helpers.normalize``.
+    Records without a ``resume_id`` are rejected, as in ``CsvStorage``.
+    """
+
+    backend = "sqlite"
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        batch_size: int = 20,
+        durable: bool = False,
+        normalize: bool = False,
+        indexes: Sequence[Any] = (),
+    ) -> None:
+        self.path = Path(path)
+        self.normalize = normalize
+        self.indexes = list(indexes)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = max(1, batch_size)
+        # Callers that share the storage between threads serialize access themselves.
+        self.connection = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(f"PRAGMA synchronous={'FULL' if durable else 'NORMAL'}")
+        self.connection.executescript(_SCHEMA)
+        self._add_updated_stamp()
+        self._pending_resumes: List[Tuple[str, str, str, Optional[int], str, str]] = []
+        self._pending_memberships: List[Tuple[str, str, str]] = []
+
+    def _add_updated_stamp(self) -> None:
+        # Databases created before the column existed: fill it from the stored text once.
+        columns = {row[1] for row in self.connection.execute("PRAGMA table_info(resumes)")}
+        if "updated_stamp" in columns:
+            return
+        with self.connection:
+            self.connection.execute("ALTER TABLE resumes ADD COLUMN updated_stamp INTEGER")
+            rows = self.connection.execute("SELECT resume_id, updated_at FROM resumes").fetchall()
+            self.connection.executemany(
+                "UPDATE resumes SET updated_stamp = ? WHERE resume_id = ?",
+                [(updated_stamp(updated_at), resume_id) for resume_id, updated_at in rows],
+            )
+
+    def general_ids(self, *, read_only: bool = False) -> MutableSet:
+        # Ids added to the set stay in memory until a record is written, so the
+        # same view also serves processes that only reserve ids.
+        return _IdSet(self)
+
+    def query_ids(self, query: str) -> MutableSet:
+        return _IdSet(self, query)
+
+    def count(self, query: str) -> int:
+        self.flush()
+        row = self.connection.execute(
+            "SELECT COUNT(*) FROM resume_queries WHERE query = ?", (query,)
+        ).fetchone()
+        return int(row[0])
+
+    def stored_updated(self, query: str, resume_id: str) -> Optional[int]:
+        """``updated_at`` (epoch seconds) of a stored resume; ``query`` is not needed here.
+
+        The stamp is taken when the record is written: relative dates such as
+        "вчера" must resolve against the crawl date, not the day of the lookup.
+        """
+        for pending in reversed(self._pending_resumes):
+            if pending[0] == resume_id:
+                return pending[3]
+        row = self.connection.execute(
+            "SELECT updated_stamp FROM resumes WHERE resume_id = ?", (resume_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def is_known(self, known_ids: MutableSet, resume_id: str) -> bool:
+        return resume_id in known_ids
+
+    def is_pending(self, resume_id: str, query: Optional[str] = None) -> bool:
+        """Whether ``resume_id`` (for ``query``, if given) waits in the current batch."""
+        if query is None:
+            return any(pending[0] == resume_id for pending in self._pending_resumes)
+        return any(
+            pending[0] == query and pending[1] == resume_id for pending in self._pending_memberships
+        )
+
+    def add_to_query(
+        self,
+        record: Mapping[str, Any],
+        query: str,
+        known_ids: MutableSet,
+        *,
+        replace: bool = False,
+    ) -> bool:
+        resume_id = str(record.get("resume_id", "")).strip()
+        if not resume_id or (resume_id in known_ids and not replace):
+            return False
+        self._pending_memberships.append((query, resume_id, _now()))
+        known_ids.add(resume_id)
+        self.add_membership(query, resume_id)
+        self._maybe_flush()
+        return True
+
+    def add_membership(self, query: str, resume_id: str) -> None:
+        """Record in the secondary indexes that ``resume_id`` was found by ``query``."""
+        for index in self.indexes:
+            index.add_membership(query, resume_id)
+
+    def add_to_general(
+        self, record: Mapping[str, Any], known_ids: MutableSet, *, replace: bool = False
+    ) -> bool:
+        resume_id = str(record.get("resume_id", "")).strip()
+        if not resume_id or (resume_id in known_ids and not replace):
+            return False
+        normalized = _normalize(normalize_record(record) if self.normalize else record)
+        updated_at = str(normalized.get("updated_at") or "")
+        self._pending_resumes.append(
+            (
+                resume_id,
+                str(normalized.get("url") or ""),
+                updated_at,
+                updated_stamp(updated_at),
+                _now(),
+                json.dumps(normalized, ensure_ascii=False),
+            )
+        )
+        known_ids.add(resume_id)
+        for index in self.indexes:
+            index.add_resume(normalized)
+        self._maybe_flush()
+        return True
+
+    def _maybe_flush(self) -> None:
+        if len(self._pending_resumes) + len(self._pending_memberships) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        for index in self.indexes:
+            index.flush()
+        if not self._pending_resumes and not self._pending_memberships:
+            return
+        with self.connection:
+            self.connection.executemany(_UPSERT_RESUME, self._pending_resumes)
+            self.connection.executemany(_INSERT_MEMBERSHIP, self._pending_memberships)
+        self._pending_resumes.clear()
+        self._pending_memberships.clear()
+
+    def sync(self) -> None:
+        # Commits are already durable with synchronous=FULL.
+        self.flush()
+
+    def after_write(self, callback: Callable[[], None]) -> None:
+        """Commit pending rows, then run ``callback``."""
+        self.flush()
+        callback()
+
+    def close(self) -> None:
+        self.flush()
+        self.connection.close()
+        while self.indexes:
+            self.indexes.pop().close()
+
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """Stream every stored resume in insertion order."""
+        self.flush()
+        for (data,) in self.connection.execute("SELECT data FROM resumes ORDER BY rowid"):
+            yield json.loads(data)
+
+    def export_csv(self, output_path: str, *, query: Optional[str] = None) -> int:
+        """Write stored resumes (all or one query's) to a CSV file; return the row count."""
+        if query is None:
+            records = list(self.iter_records())
+        else:
+            self.flush()
+            rows = self.connection.execute(
+                "SELECT r.data FROM resumes r JOIN resume_queries q USING (resume_id) "
+                "WHERE q.query = ? ORDER BY q.saved_at",
+                (query,),
+            )
+            records = [json.loads(data) for (data,) in rows]
+
+        columns: Dict[str, None] = {}
+        for record in records:
+            columns.update(dict.fromkeys(record))
+
+        output = Path(output_path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        with output.open("w", encoding="utf-8", newline="") as handle:
+            writer = csv.DictWriter(handle, fieldnames=list(columns), lineterminator=os.linesep)
+            writer.writeheader()
+            writer.writerows(records)
+        return len(records)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Export resumes from the SQLite store to CSV.")
+    parser.add_argument("database", help="Path to the SQLite database")
+    parser.add_argument("output", help="CSV file to write")
+    parser.add_argument("--query", help="Export only resumes found by this search query")
+    args = parser.parse_args(argv)
+
+    storage = SqliteStorage(args.database)
+    try:
+        exported = storage.export_csv(args.output, query=args.query)
+    finally:
+        storage.close()
+    print(f"Выгружено резюме: {exported} -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
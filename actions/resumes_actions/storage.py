@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Mapping, MutableSet, Optional, Sequence
+
+from actions.resumes_actions.dataframe import (
+    close_sinks,
+    get_sink,
+    query_output_path,
+    sync_sinks,
+)
+from actions.resumes_actions.id_index import KnownIdIndex
+from configs.config import config
+from helpers.normalize import normalize_record
+
+
+class CsvStorage:
+    """The default backend: a general CSV file plus one CSV per search query.
+
+    Known ids and row counts come from a :class:`KnownIdIndex` sidecar next to
+    each file, so neither startup nor deduplication reads the CSVs. Records
+    without a ``resume_id`` are rejected: the id is the deduplication key, and
+    the SQLite backend cannot store them either.
+    """
+
+    backend = "csv"
+
+    def __init__(self, output_path: str, *, indexes: Sequence[Any] = ()) -> None:
+        self.output_path = output_path
+        self.indexes = list(indexes)
+        self._indexes: Dict[str, KnownIdIndex] = {}
+
+    def query_path(self, query: str) -> str:
+        return str(query_output_path(self.output_path, query))
+
+    def _index(self, path: str) -> KnownIdIndex:
+        key = str(Path(path).resolve())
+        index = self._indexes.get(key)
+        if index is None:
+            index = self._indexes[key] = KnownIdIndex(path)
+        return index
+
+    def general_ids(self, *, read_only: bool = False) -> MutableSet[str]:
+        if read_only:
+            # Another process appends to the general file: take a private copy.
+            index = KnownIdIndex(self.output_path, read_only=True)
+            try:
+                return set(index)
+            finally:
+                index.close()
+        return self._index(self.output_path)
+
+    def query_ids(self, query: str) -> MutableSet[str]:
+        return self._index(self.query_path(query))
+
+    def count(self, query: str) -> int:
+        """Distinct resumes stored for ``query``; refreshed versions count once."""
+        return len(self._index(self.query_path(query)))
+
+    def stored_updated(self, query: str, resume_id: str) -> Optional[int]:
+        """``updated_at`` (epoch seconds) of the resume as stored for ``query``."""
+        return self._index(self.query_path(query)).updated(resume_id)
+
+    def is_known(self, known_ids: MutableSet[str], resume_id: str) -> bool:
+        return resume_id in known_ids
+
+    def _append(
+        self,
+        record: Mapping[str, Any],
+        path: str,
+        known_ids: MutableSet[str],
+        *,
+        replace: bool = False,
+    ) -> bool:
+        resume_id = str(record.get("resume_id", "")).strip()
+        if not resume_id or (resume_id in known_ids and not replace):
+            return False
+
+        if config.normalize:
+            record = normalize_record(record)
+        # A replacement is appended as well: readers keep the last row per id
+        # (see ``dataframe.latest_rows``), and the index counts the id once.
+        get_sink(path).write(record)
+        index = self._index(path)
+        if known_ids is index:
+            index.record_row(resume_id, str(record.get("updated_at") or ""))
+        else:
+            known_ids.add(resume_id)
+        return True
+
+    def add_to_query(
+        self,
+        record: Mapping[str, Any],
+        query: str,
+        known_ids: MutableSet[str],
+        *,
+        replace: bool = False,
+    ) -> bool:
+        added = self._append(record, self.query_path(query), known_ids, replace=replace)
+        if added:
+            self.add_membership(query, str(record.get("resume_id", "")))
+        return added
+
+    def add_membership(self, query: str, resume_id: str) -> None:
+        """Record in the secondary indexes that ``resume_id`` was found by ``query``."""
+        for index in self.indexes:
+            index.add_membership(query, resume_id)
+
+    def add_to_general(
+        self, record: Mapping[str, Any], known_ids: MutableSet[str], *, replace: bool = False
+    ) -> bool:
+        added = self._append(record, self.output_path, known_ids, replace=replace)
+        if added:
+            for index in self.indexes:
+                index.add_resume(record)
+        return added
+
+    def flush(self) -> None:
+        for index in self.indexes:
+            index.flush()
+
+    def after_write(self, callback: Callable[[], None]) -> None:
+        """Run ``callback`` once every record added so far is on disk."""
+        # Every row is flushed to the OS as it is written.
+        callback()
+
+    def sync(self) -> None:
+        sync_sinks()
+        self.flush()
+
+    def close(self) -> None:
+        close_sinks()
+        while self.indexes:
+            self.indexes.pop().close()
+        while self._indexes:
+            _, index = self._indexes.popitem()
+            index.close()
+
+
+_storage: Optional[Any] = None
+
+
+def open_indexes() -> List[Any]:
+    """Secondary indexes the storage keeps up to date as it writes.
+
+    Each one has ``add_resume(record)``, ``add_membership(query, resume_id)``,
+    ``flush()`` and ``close()``.
+    """
+    from actions.resumes_actions.near_duplicates import open_near_duplicates
+    from actions.resumes_actions.skill_index import open_skill_index
+
+    return [index for index in (open_skill_index(), open_near_duplicates()) if index is not None]
+
+
+def get_storage():
+    """Return the process-wide storage selected by ``OUTPUT_BACKEND``."""
+    global _storage
+    if _storage is None:
+        indexes = open_indexes()
+        if config.output_backend == "sqlite":
+            from actions.resumes_actions.sqlite_storage import SqliteStorage
+
+            _storage = SqliteStorage(
+                config.sqlite_path,
+                batch_size=config.sqlite_batch_size,
+                durable=config.writer_fsync != "never",
+                normalize=config.normalize,
+                indexes=indexes,
+            )
+        else:
+            _storage = CsvStorage(config.output_path, indexes=indexes)
+
+        # Normalization parses every record with regexes; it must not run in the crawl loop.
+        if config.background_writer or config.normalize:
+            from actions.resumes_actions.background_writer import BackgroundWriter
+
+            _storage = BackgroundWriter(
+                _storage,
+                queue_size=config.writer_queue_size,
+                batch_size=config.writer_batch_size,
+                max_delay=config.writer_max_delay,
+                fsync=config.writer_fsync,
+            )
+    return _storage
+
+
+def close_storage() -> None:
+    global _storage
+    if _storage is not None:
+        _storage.close()
+        _storage = None
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, MutableSet, Sequence, Tuple
+
+from actions.resumes_actions.checkpoint import store_checkpoint
+from actions.resumes_actions.storage import close_storage, get_storage
+from configs.config import config
+from drivers.clone_profile import clone_profile
+from helpers.log_setup import DEFAULT_LOG_PATH, configure_logging
+from helpers.metrics import metrics
+from helpers.pacer import http_pacer, pacer
+from helpers.selenium_helpers import logger
+from pages.resumes.page_state import PageStateError
+
+_RESULT_POLL_SECONDS = 1.0
+
+
+@contextmanager
+def _environment(**values: str) -> Iterator[None]:
+    previous = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in previous.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _worker_path(path: str, worker_index: int) -> str:
+    """Per-worker variant of an output file, so processes never share one."""
+    if not path:
+        return ""
+    output = Path(path)
+    return str(output.with_name(f"{output.stem}_worker_{worker_index}{output.suffix}"))
+
+
+def _worker_main(
+    worker_index: int,
+    tasks: "multiprocessing.Queue",
+    results: "multiprocessing.Queue",
+    pacer_states: Tuple[Any, Any],
+) -> None:
+    # Imported here so the spawned interpreter builds its own config (and browser)
+    # from CHROME_USER_DATA_DIR set by the parent for this worker.
+    from actions.resumes_actions.click_resumes import _collect_for_query, close_fetchers
+
+    configure_logging()
+    # One request rate and one captcha pause for the whole pool.
+    pacer.attach(pacer_states[0])
+    http_pacer.attach(pacer_states[1])
+    logger.info("Воркер %s запущен с профилем %s", worker_index, config.user_data_dir)
+    known_general_ids = get_storage().general_ids(read_only=True)
+    metrics.start_dumping(config.metrics_path, interval=config.metrics_interval)
+    try:
+        while True:
+            query = tasks.get()
+            if query is None:
+                break
+
+            def publish(record, kind="record", _query=query):
+                results.put((kind, _query, dict(record)))
+
+            try:
+                saved = _collect_for_query(query, known_general_ids, publish=publish)
+            except PageStateError as error:
+                logger.error("Воркер %s остановлен на запросе '%s': %s", worker_index, query, error)
+                results.put(("query", query, 0))
+                break
+            except Exception as error:
+                logger.exception("Ошибка при обработке запроса '%s': %s", query, error)
+                saved = 0
+            results.put(("query", query, saved))
+    finally:
+        close_fetchers()
+        close_storage()
+        config.quit_driver()
+        metrics.stop_dumping(config.metrics_path)
+        results.put(("done", worker_index, None))
+
+
+def run_worker_pool(queries: Sequence[str], known_general_ids: MutableSet[str]) -> Dict[str, int]:
+    """Spread queries across ``config.workers`` browser processes.
+
+    Every worker runs its own Chrome on a clone of ``config.user_data_dir`` and
+    stores the per-query results of the queries it owns. The request pacers are
+    shared, so the pool as a whole keeps to ``PACER_RATE`` and
+    ``HTTP_PACER_RATE``. Records for the general output are sent back here, so
+    the parent remains its only writer and the summary counts only records that
+    were really added to it. Query memberships
+    come back as well, so the secondary indexes also have a single writer, and
+    so do checkpoint states, which are written only after those records.
+    """
+    worker_count = min(config.workers, len(queries))
+    context = multiprocessing.get_context("spawn")
+    tasks = context.Queue()
+    results = context.Queue()
+    pacer_states = (pacer.share(context), http_pacer.share(context))
+
+    for query in queries:
+        tasks.put(query)
+    for _ in range(worker_count):
+        tasks.put(None)
+
+    processes: List[multiprocessing.process.BaseProcess] = []
+    for index in range(worker_count):
+        profile = clone_profile(
+            config.user_data_dir, str(Path(config.worker_profile_root) / f"worker_{index}")
+        )
+        process = context.Process(
+            target=_worker_main,
+            args=(index, tasks, results, pacer_states),
+            name=f"resume-worker-{index}",
+        )
+        # The child reads these paths while importing the config module. It opens
+        # no secondary indexes: memberships come back here, so one process writes them.
+        with _environment(
+            CHROME_USER_DATA_DIR=profile,
+            METRICS_PATH=_worker_path(config.metrics_path, index),
+            LOG_PATH=_worker_path(os.getenv("LOG_PATH", DEFAULT_LOG_PATH), index),
+            SKILL_INDEX_PATH="",
+            NEAR_DUPLICATES_PATH="",
+        ):
+            process.start()
+        processes.append(process)
+
+    storage = get_storage()
+    saved_summary: Dict[str, int] = defaultdict(int)
+    finished = 0
+    while finished < worker_count:
+        try:
+            kind, key, payload = results.get(timeout=_RESULT_POLL_SECONDS)
+        except queue.Empty:
+            if not any(process.is_alive() for process in processes):
+                logger.warning("Все воркеры завершились, не дождавшись сигнала окончания")
+                break
+            continue
+
+        if kind == "record":
+            if storage.add_to_general(payload, known_general_ids):
+                saved_summary[key] += 1
+                metrics.increment("resumes_saved", query=key)
+            else:
+                metrics.increment("duplicates", query=key)
+        elif kind == "replace":
+            storage.add_to_general(payload, known_general_ids, replace=True)
+        elif kind == "membership":
+            storage.add_membership(key, payload["resume_id"])
+        elif kind == "checkpoint":
+            # Sent after the records it covers, so it follows them to disk here.
+            store_checkpoint(key, payload)
+        elif kind == "query":
+            saved_summary.setdefault(key, 0)
+            logger.info("Воркер завершил запрос '%s': %s новых резюме", key, payload)
+        elif kind == "done":
+            finished += 1
+
+    for process in processes:
+        process.join()
+
+    return saved_summary
@@ -0,0 +1,285 @@
+"""Local stand-in for hh.ru that serves SERP and resume pages for benchmarks.
+
+Pages come either from a directory of recorded HTML (see
+``benchmarks/record.py``) or from a deterministic generator that uses the
+same ``data-qa`` markup the page objects look for. The server listens on
+``127.0.0.1`` only, so ``BASE_URL``/``RESUME_SEARCH_URL`` can point at it and
+the crawler runs end to end without network access.
+"""
+from __future__ import annotations
+
+import argparse
+import html
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from helpers.ru_dates import MONTHS
+
+_MONTH_NAMES = {number: name for name, number in MONTHS.items()}
+_FIRST_NAMES = ["Анна", "Иван", "Мария", "Пётр", "Ольга", "Алексей", "Елена", "Дмитрий"]
+_LAST_NAMES = ["Иванова", "Петров", "Смирнова", "Кузнецов", "Попова", "Соколов", "Орлова"]
+_POSITIONS = ["DevOps-инженер", "Frontend-разработчик", "Backend-разработчик", "Project manager"]
+_SKILLS = ["Python", "Docker", "Kubernetes", "Linux", "Git", "SQL", "React", "Go", "Ansible", "CI/CD"]
+_LANGUAGES = ["Русский — Родной", "Английский — B2 — Средне-продвинутый", "Немецкий — A1 — Начальный"]
+_HH_LINK = re.compile(r"https?://(?:[a-z0-9-]+\.)*hh\.ru")
+
+_SEARCH_FORM = """
+<form action="/search/resume" method="get">
+  <input id="a11y-search-input" name="text" value="{query}">
+  <button type="submit" data-qa="search-button">Найти</button>
+</form>
+"""
+
+
+def _page(title: str, body: str) -> str:
+    return (
+        "<!DOCTYPE html><html lang=\"ru\"><head><meta charset=\"utf-8\">"
+        f"<title>{html.escape(title)}</title></head><body>{body}</body></html>"
+    )
+
+
+def _format_updated(moment: datetime) -> str:
+    return f"{moment.day} {_MONTH_NAMES[moment.month]} {moment.year} в {moment:%H:%M}"
+
+
+class SyntheticSite:
+    """Deterministic SERP and resume pages: ``pages`` pages of ``per_page`` cards."""
+
+    def __init__(self, *, pages: int = 5, per_page: int = 20, seed: int = 0) -> None:
+        self.pages = pages
+        self.per_page = per_page
+        self.seed = seed
+        self._base_time = datetime(2025, 1, 1, 9, 0)
+
+    def resume_id(self, page: int, position: int) -> str:
+        return f"{self.seed:04x}{page:04x}{position:04x}bench"
+
+    def _random(self, resume_id: str) -> random.Random:
+        return random.Random(f"{self.seed}:{resume_id}")
+
+    def _updated(self, resume_id: str) -> datetime:
+        return self._base_time + timedelta(minutes=self._random(resume_id).randint(0, 60 * 24 * 300))
+
+    def serp(self, query: str, page: int) -> str:
+        cards: List[str] = []
+        if 0 <= page < self.pages:
+            for position in range(self.per_page):
+                resume_id = self.resume_id(page, position)
+                rng = self._random(resume_id)
+                cards.append(
+                    f'<div data-qa="resume-serp__resume" data-resume-id="{resume_id}">'
+                    f'<a data-qa="serp-item__title" href="/resume/{resume_id}?query={html.escape(query)}">'
+                    f"{rng.choice(_POSITIONS)}</a>"
+                    f'<span data-qa="resume-serp__resume-age">{rng.randint(20, 55)} лет</span>'
+                    f'<span data-qa="resume-serp__resume-compensation">{rng.randint(8, 40) * 10_000} ₽</span>'
+                    f'<span data-qa="resume-serp__resume-date">Обновлено {_format_updated(self._updated(resume_id))}</span>'
+                    "</div>"
+                )
+        pager = ""
+        if page + 1 < self.pages:
+            pager = f'<a data-qa="pager-next" href="/search/resume?{urlencode({"text": query, "page": page + 1})}">дальше</a>'
+        body = _SEARCH_FORM.format(query=html.escape(query)) + "".join(cards) + pager
+        return _page(f"Резюме {query}", body)
+
+    def resume(self, resume_id: str) -> Optional[str]:
+        rng = self._random(resume_id)
+
+        # Sparse resumes leave optional blocks out, as real ones often do.
+        def optional(share: float) -> bool:
+            return rng.random() < share
+
+        name = f"{rng.choice(_FIRST_NAMES)} {rng.choice(_LAST_NAMES)}"
+        skills = rng.sample(_SKILLS, rng.randint(2, 6))
+        parts = [
+            '<div data-qa="resume">',
+            f'<h1 data-qa="resume-personal-name">{name}</h1>',
+            '<div data-qa="resume-block-personal">',
+            f'<span data-qa="resume-personal-gender">{rng.choice(["Мужчина", "Женщина"])}</span>',
+            f'<span data-qa="resume-personal-age">{rng.randint(20, 55)} лет</span>',
+            '<span data-qa="resume-personal-address">Тюмень</span>',
+        ]
+        if optional(0.5):
+            parts.append('<span data-qa="resume-personal-metro">не имеет значения</span>')
+        if optional(0.6):
+            parts.append('<p data-qa="resume-personal-relocation">Готов к переезду</p>')
+        parts.append('<span data-qa="resume-personal-citizenship">Россия</span>')
+        parts.append("</div>")
+        parts.append(f'<span data-qa="resume-block-title-position">{rng.choice(_POSITIONS)}</span>')
+        if optional(0.7):
+            parts.append(f'<span data-qa="resume-block-salary">{rng.randint(8, 40) * 10_000} ₽</span>')
+        parts.append(
+            f'<div data-qa="resume-block-experience">Опыт работы {rng.randint(0, 15)} лет {rng.randint(0, 11)} месяцев</div>'
+        )
+        if optional(0.8):
+            parts.append('<div data-qa="resume-block-education">Высшее образование</div>')
+        parts.extend(
+            f'<li data-qa="resume-block-language-item">{language}</li>'
+            for language in _LANGUAGES[: rng.randint(1, len(_LANGUAGES))]
+        )
+        parts.extend(f'<span data-qa="bloko-tag__text">{skill}</span>' for skill in skills)
+        if optional(0.4):
+            parts.extend(f'<span data-qa="skills-table-item">{skill}</span>' for skill in skills[:2])
+        if optional(0.5):
+            parts.append('<div data-qa="resume-block-skills-content">Ответственный, люблю автоматизацию.</div>')
+        if optional(0.3):
+            parts.append('<span data-qa="resume-block-driver-license">Права категории B</span>')
+        parts.append(
+            f'<span data-qa="resume-updatedAt">Резюме обновлено {_format_updated(self._updated(resume_id))}</span>'
+        )
+        parts.append("</div>")
+        return _page(name, "".join(parts))
+
+
+class RecordedSite:
+    """Serves ``serp/page_<n>.html`` and ``resume/<id>.html`` from a directory."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _read(self, path: Path) -> Optional[str]:
+        try:
+            return path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+
+    def serp(self, query: str, page: int) -> str:
+        return self._read(self.root / "serp" / f"page_{page}.html") or _page(
+            "Ничего не найдено", _SEARCH_FORM.format(query=html.escape(query))
+        )
+
+    def resume(self, resume_id: str) -> Optional[str]:
+        return self._read(self.root / "resume" / f"{Path(resume_id).name}.html")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "FixtureServer._Server"
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002 - stdlib signature
+        return None
+
+    def _route(self) -> Tuple[int, Optional[str]]:
+        parsed = urlparse(self.path)
+        params = parse_qs(parsed.query)
+        site = self.server.site
+        if parsed.path.rstrip("/") in {"", "/search/resume"}:
+            query = (params.get("text") or [""])[0]
+            page = int((params.get("page") or ["0"])[0] or 0)
+            return 200, site.serp(query, page)
+        if parsed.path.startswith("/resume/"):
+            body = site.resume(parsed.path.rstrip("/").split("/")[-1])
+            return (200, body) if body is not None else (404, _page("Резюме не найдено", ""))
+        return 404, _page("Не найдено", "")
+
+    def do_GET(self) -> None:  # noqa: N802 - stdlib name
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        status, body = self._route()
+        with self.server.lock:
+            self.server.requests += 1
+        # Recorded pages link to the live site; keep the crawler on this server.
+        payload = _HH_LINK.sub(self.server.base_url, body or "").encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class FixtureServer:
+    """Runs the stand-in site on a background thread; use as a context manager."""
+
+    class _Server(ThreadingHTTPServer):
+        daemon_threads = True
+        site: "SyntheticSite | RecordedSite"
+        latency: float
+        base_url: str
+        requests: int
+        lock: threading.Lock
+
+    def __init__(
+        self,
+        *,
+        fixtures: Optional[str] = None,
+        pages: int = 5,
+        per_page: int = 20,
+        seed: int = 0,
+        latency: float = 0.0,
+        port: int = 0,
+    ) -> None:
+        self._server = self._Server(("127.0.0.1", port), _Handler)
+        self._server.site = RecordedSite(fixtures) if fixtures else SyntheticSite(
+            pages=pages, per_page=per_page, seed=seed
+        )
+        self._server.latency = max(0.0, latency)
+        self._server.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        self._server.requests = 0
+        self._server.lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        return self._server.base_url
+
+    @property
+    def search_url(self) -> str:
+        return f"{self.base_url}/search/resume"
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests
+
+    def start(self) -> "FixtureServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fixture-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve benchmark fixtures on localhost")
+    parser.add_argument("--fixtures", help="directory with recorded serp/ and resume/ pages")
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--per-page", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    server = FixtureServer(
+        fixtures=args.fixtures,
+        pages=args.pages,
+        per_page=args.per_page,
+        latency=args.latency_ms / 1000,
+        port=args.port,
+    )
+    print(f"BASE_URL={server.base_url}")
+    print(f"RESUME_SEARCH_URL={server.search_url}")
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
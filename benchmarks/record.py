@@ -0,0 +1,61 @@
+"""Save live SERP and resume pages as fixtures for ``benchmarks.fixture_server``.
+
+Uses the configured browser profile (so the session must be logged in) and
+writes ``serp/page_<n>.html`` and ``resume/<id>.html`` under the target
+directory. Run it once; benchmarks then replay the pages offline.
+"""
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+from typing import List, Optional
+
+
+def record(query: str, output_dir: Path, *, pages: int) -> int:
+    from configs.config import config
+    from helpers.log_setup import configure_logging
+    from pages.resumes.html_parser import parse_search_cards_html
+    from pages.resumes.search_page import ResumeSearchPage
+
+    configure_logging()
+    serp_dir = output_dir / "serp"
+    resume_dir = output_dir / "resume"
+    serp_dir.mkdir(parents=True, exist_ok=True)
+    resume_dir.mkdir(parents=True, exist_ok=True)
+
+    search_page = ResumeSearchPage(config.driver)
+    saved = 0
+    try:
+        for page in range(pages):
+            search_page.open_page(config.resume_search_url, query, page)
+            search_page.wait_for_document_ready()
+            source = config.driver.page_source
+            cards = parse_search_cards_html(source, search_page.current_url)
+            if not cards:
+                break
+            (serp_dir / f"page_{page}.html").write_text(source, encoding="utf-8")
+            for card in cards:
+                if not card["url"] or not card["resume_id"]:
+                    continue
+                config.driver.get(card["url"])
+                search_page.wait_for_document_ready()
+                path = resume_dir / f"{card['resume_id']}.html"
+                path.write_text(config.driver.page_source, encoding="utf-8")
+                saved += 1
+    finally:
+        config.quit_driver()
+    return saved
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Record hh.ru pages as benchmark fixtures")
+    parser.add_argument("query")
+    parser.add_argument("output_dir", type=Path)
+    parser.add_argument("--pages", type=int, default=2)
+    args = parser.parse_args(argv)
+    saved = record(args.query, args.output_dir, pages=args.pages)
+    print(f"Сохранено резюме: {saved} в {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
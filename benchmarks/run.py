@@ -0,0 +1,206 @@
+"""Run the real ``click_resumes`` pipeline against the local fixture server.
+
+Every run appends one JSON line to the results file (``benchmarks/results.jsonl``
+by default) with throughput, WebDriver calls per resume and write latency,
+so runs of different commits or settings can be compared with ``--compare``.
+Settings that are not benchmark parameters (``MODE``, ``TAB_POOL_SIZE``,
+``RESUME_PARSER``, ``BROWSER_MODE`` ...) are read from the environment as
+usual and recorded with the result.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fixture_server import FixtureServer
+
+DEFAULT_RESULTS = Path(__file__).with_name("results.jsonl")
+# Settings that change crawler behaviour and are stored with every result.
+RECORDED_SETTINGS = (
+    "MODE",
+    "RESUME_PARSER",
+    "TAB_POOL_SIZE",
+    "FETCH_BACKEND",
+    "PAGINATION",
+    "SERP_PREFETCH",
+    "BROWSER_MODE",
+    "OUTPUT_BACKEND",
+    "BACKGROUND_WRITER",
+    "WRITER_FSYNC",
+    "WORKERS",
+    "WAIT_TIMEOUT",
+    "PACER_RATE",
+)
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def _stage(snapshot: Dict[str, Any], stage: str) -> Dict[str, float]:
+    items = [item for item in snapshot["stages"] if item["stage"] == stage]
+    count = sum(item["count"] for item in items)
+    total = sum(item["sum"] for item in items)
+    return {
+        "count": count,
+        "mean": round(total / count, 6) if count else 0.0,
+        "p95": max((item["p95"] for item in items), default=0.0),
+    }
+
+
+def _counter(snapshot: Dict[str, Any], event: str) -> int:
+    return sum(item["value"] for item in snapshot["counters"] if item["event"] == event)
+
+
+def run_benchmark(
+    *,
+    fixtures: Optional[str],
+    pages: int,
+    per_page: int,
+    latency: float,
+    query: str,
+    label: str,
+) -> Dict[str, Any]:
+    workdir = Path(tempfile.mkdtemp(prefix="hh_bench_"))
+    server = FixtureServer(fixtures=fixtures, pages=pages, per_page=per_page, latency=latency).start()
+
+    # The config and page objects read these while being imported, so they
+    # are set before anything from the crawler is imported.
+    os.environ.update(
+        {
+            "BASE_URL": server.base_url,
+            "RESUME_SEARCH_URL": server.search_url,
+            "SEARCH_QUERY": query,
+            "OUTPUT_PATH": str(workdir / "resumes.csv"),
+            "METRICS_PATH": "",
+            "RESUME_LIMIT": "0",
+            "EXISTING_RECORD_LIMIT": str(10**9),
+        }
+    )
+    os.environ.setdefault("WAIT_TIMEOUT", "3")
+    os.environ.setdefault("BROWSER_MODE", "lean")
+    # The local server does not throttle; pace only when asked to.
+    os.environ.setdefault("PACER_RATE", "0")
+    os.environ.setdefault("CHROME_USER_DATA_DIR", str(workdir / "profile"))
+
+    from actions.resumes_actions.click_resumes import click_resumes
+    from actions.resumes_actions.storage import close_storage
+    from configs.config import config
+    from helpers.log_setup import configure_logging
+    from helpers.metrics import metrics
+
+    configure_logging()
+
+    started = time.monotonic()
+    driver = config.driver
+    startup = time.monotonic() - started
+
+    calls = 0
+    execute = driver.execute
+
+    def counting_execute(command, params=None):
+        nonlocal calls
+        calls += 1
+        return execute(command, params)
+
+    driver.execute = counting_execute
+
+    try:
+        started = time.monotonic()
+        click_resumes()
+        close_storage()
+        elapsed = time.monotonic() - started
+    finally:
+        config.quit_driver()
+        server.stop()
+
+    snapshot = metrics.snapshot()
+    resumes = _counter(snapshot, "resumes_saved")
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": _git_revision(),
+        "label": label,
+        "fixtures": fixtures or f"synthetic:{pages}x{per_page}",
+        "latency_ms": round(latency * 1000, 3),
+        "settings": {name: os.environ[name] for name in RECORDED_SETTINGS if name in os.environ},
+        "resumes": resumes,
+        "seconds": round(elapsed, 3),
+        "startup_seconds": round(startup, 3),
+        "resumes_per_second": round(resumes / elapsed, 3) if elapsed else 0.0,
+        "webdriver_calls": calls,
+        "webdriver_calls_per_resume": round(calls / resumes, 2) if resumes else None,
+        "http_requests": server.requests,
+        "failures": _counter(snapshot, "failures"),
+        "write_latency": _stage(snapshot, "persistence"),
+        "write_batch_latency": _stage(snapshot, "persistence_batch"),
+        "output_dir": str(workdir),
+    }
+
+
+def compare(results_path: Path, last: int) -> None:
+    try:
+        lines = results_path.read_text(encoding="utf-8").splitlines()
+    except FileNotFoundError:
+        print(f"Нет результатов в {results_path}")
+        return
+    rows = [json.loads(line) for line in lines if line.strip()][-last:]
+    header = f"{'время':20} {'ревизия':9} {'метка':16} {'рез/с':>8} {'вызовов/рез':>12} {'запись p95, мс':>15}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        calls = row.get("webdriver_calls_per_resume")
+        print(
+            f"{row['timestamp'][:19]:20} {row.get('revision', ''):9} {row.get('label', '')[:16]:16} "
+            f"{row['resumes_per_second']:>8.2f} {('-' if calls is None else f'{calls:.1f}'):>12} "
+            f"{row['write_latency']['p95'] * 1000:>15.2f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Offline crawler benchmark")
+    parser.add_argument("--fixtures", help="directory with recorded serp/ and resume/ pages")
+    parser.add_argument("--pages", type=int, default=3, help="synthetic SERP pages")
+    parser.add_argument("--per-page", type=int, default=20, help="synthetic cards per page")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="added server latency")
+    parser.add_argument("--query", default="benchmark")
+    parser.add_argument("--label", default="", help="free-form note stored with the result")
+    parser.add_argument("--results", type=Path, default=DEFAULT_RESULTS)
+    parser.add_argument("--compare", type=int, metavar="N", help="print the last N results and exit")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(args.results, args.compare)
+        return
+
+    result = run_benchmark(
+        fixtures=args.fixtures,
+        pages=args.pages,
+        per_page=args.per_page,
+        latency=args.latency_ms / 1000,
+        query=args.query,
+        label=args.label,
+    )
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+    with args.results.open("a", encoding="utf-8") as handle:
+        handle.write(json.dumps(result, ensure_ascii=False) + "\n")
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
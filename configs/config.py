@@ -1,14 +1,21 @@
 import os
 
 from dotenv import load_dotenv
-from selenium.webdriver import ActionChains
-from selenium.webdriver.support.wait import WebDriverWait
 
-from drivers.set_driver import set_driver
+from drivers.use_chrome_driver import DEFAULT_USER_DATA_DIR
 
 load_dotenv()
 
 
+def _env_flag(name: str, default: str = "0") -> bool:
+    return os.getenv(name, default).strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _serp_path(path: str) -> str:
+    stem, suffix = os.path.splitext(path)
+    return f"{stem}_serp{suffix}"
+
+
 class Config:
     _instance = None
 
@@ -20,9 +27,11 @@ class Config:
             cls._instance.login_url = "https://hh.ru/account/login"
             cls._instance.base_page = "https://hh.ru"
             cls._instance.driver_type = os.getenv("DRIVER", "chrome").lower()
-            cls._instance.driver = set_driver(cls._instance.driver_type)
-            cls._instance.action = ActionChains(cls._instance.driver)
-            cls._instance.wait = WebDriverWait(cls._instance.driver, cls._instance.wait_time)
+            cls._instance.user_data_dir = os.getenv("CHROME_USER_DATA_DIR") or DEFAULT_USER_DATA_DIR
+            cls._instance.browser_mode = os.getenv("BROWSER_MODE", "full").strip().lower()
+            cls._instance._driver = None
+            cls._instance._action = None
+            cls._instance._wait = None
             raw_queries = os.getenv("SEARCH_QUERY", "")
             cls._instance.search_queries = [
                 query.strip()
@@ -38,7 +47,61 @@ class Config:
                 os.getenv("EXISTING_RECORD_LIMIT", "1500") or 1500
             )
             cls._instance.resume_records = []
+            cls._instance.mode = os.getenv("MODE", "detail").strip().lower()
             cls._instance.output_path = os.getenv("OUTPUT_PATH", "data/resumes.csv")
+            cls._instance.output_backend = os.getenv("OUTPUT_BACKEND", "csv").strip().lower()
+            cls._instance.sqlite_path = os.getenv("SQLITE_PATH") or os.path.splitext(
+                cls._instance.output_path
+            )[0] + ".sqlite"
+            if cls._instance.mode == "serp":
+                # SERP cards carry a handful of fields: keep them out of the resume files.
+                cls._instance.output_path = os.getenv("SERP_OUTPUT_PATH") or _serp_path(
+                    cls._instance.output_path
+                )
+                cls._instance.sqlite_path = _serp_path(cls._instance.sqlite_path)
+            cls._instance.sqlite_batch_size = max(1, int(os.getenv("SQLITE_BATCH_SIZE", "20") or 20))
+            cls._instance.background_writer = _env_flag("BACKGROUND_WRITER", "0")
+            cls._instance.writer_queue_size = int(os.getenv("WRITER_QUEUE_SIZE", "1000") or 1000)
+            cls._instance.writer_batch_size = int(os.getenv("WRITER_BATCH_SIZE", "50") or 50)
+            cls._instance.writer_max_delay = float(os.getenv("WRITER_MAX_DELAY", "1.0") or 1.0)
+            cls._instance.normalize = _env_flag("NORMALIZE", "0")
+            cls._instance.writer_fsync = os.getenv("WRITER_FSYNC", "batch").strip().lower()
+            cls._instance.tab_pool_size = max(1, int(os.getenv("TAB_POOL_SIZE", "3") or 3))
+            cls._instance.fetch_backend = os.getenv("FETCH_BACKEND", "browser").strip().lower()
+            cls._instance.http_concurrency = max(1, int(os.getenv("HTTP_CONCURRENCY", "8") or 8))
+            cls._instance.pagination = os.getenv("PAGINATION", "url").strip().lower()
+            cls._instance.serp_prefetch = max(0, int(os.getenv("SERP_PREFETCH", "2") or 0))
+            cls._instance.start_page = max(0, int(os.getenv("START_PAGE", "0") or 0))
+            cls._instance.incremental = _env_flag("INCREMENTAL", "0")
+            cls._instance.known_pages_limit = max(0, int(os.getenv("KNOWN_PAGES_LIMIT", "3") or 0))
+            cls._instance.checkpoint_dir = os.getenv(
+                "CHECKPOINT_DIR",
+                os.path.join(
+                    os.path.dirname(cls._instance.output_path) or ".",
+                    "checkpoints_serp" if cls._instance.mode == "serp" else "checkpoints",
+                ),
+            ).strip()
+            cls._instance.skill_index = _env_flag("SKILL_INDEX", "0")
+            cls._instance.skill_index_path = os.getenv(
+                "SKILL_INDEX_PATH", os.path.splitext(cls._instance.output_path)[0] + "_skills.sqlite"
+            ).strip()
+            cls._instance.near_duplicates = _env_flag("NEAR_DUPLICATES", "0")
+            cls._instance.near_duplicates_path = os.getenv(
+                "NEAR_DUPLICATES_PATH",
+                os.path.splitext(cls._instance.output_path)[0] + "_near_duplicates.sqlite",
+            ).strip()
+            cls._instance.near_duplicate_threshold = float(
+                os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8") or 0.8
+            )
+            cls._instance.human_wait = max(0.0, float(os.getenv("HUMAN_WAIT", "300") or 0))
+            cls._instance.workers = max(1, int(os.getenv("WORKERS", "1") or 1))
+            profile_root = cls._instance.user_data_dir.rstrip("\\/")
+            cls._instance.worker_profile_root = os.getenv(
+                "WORKER_PROFILE_ROOT", f"{profile_root}_workers"
+            )
+            cls._instance.metrics_path = os.getenv("METRICS_PATH", "data/metrics.json").strip()
+            cls._instance.metrics_interval = float(os.getenv("METRICS_INTERVAL", "30") or 30)
+            cls._instance.resume_parser = os.getenv("RESUME_PARSER", "element").strip().lower()
             resume_search_url = os.getenv("RESUME_SEARCH_URL")
             if resume_search_url:
                 cls._instance.resume_search_url = resume_search_url
@@ -48,6 +111,45 @@ class Config:
 
         return cls._instance
 
+    # Браузер запускается при первом обращении: выгрузки, статистика и другие
+    # утилиты, которым нужны только настройки, стартуют без Chrome.
+    @property
+    def driver(self):
+        if self._driver is None:
+            from drivers.set_driver import set_driver
+
+            self._driver = set_driver(self.driver_type)
+        return self._driver
+
+    @property
+    def action(self):
+        if self._action is None:
+            from selenium.webdriver import ActionChains
+
+            self._action = ActionChains(self.driver)
+        return self._action
+
+    @property
+    def wait(self):
+        if self._wait is None:
+            from selenium.webdriver.support.wait import WebDriverWait
+
+            self._wait = WebDriverWait(self.driver, self.wait_time)
+        return self._wait
+
+    @property
+    def has_driver(self) -> bool:
+        return self._driver is not None
+
+    def quit_driver(self) -> None:
+        """Закрывает браузер, если он был запущен."""
+        driver, self._driver, self._action, self._wait = self._driver, None, None, None
+        if driver is not None:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+
     def increment_counter(self):
         self.counter += 1
 
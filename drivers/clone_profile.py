@@ -0,0 +1,52 @@
+import shutil
+from pathlib import Path
+
+from helpers.selenium_helpers import logger
+
+# Caches and lock files are neither needed for a session nor safe to copy
+# while the source profile is in use.
+_IGNORED = shutil.ignore_patterns(
+    "Singleton*",
+    "lockfile",
+    "LOCK",
+    "Cache",
+    "Code Cache",
+    "GPUCache",
+    "GrShaderCache",
+    "ShaderCache",
+    "DawnCache",
+    "CacheStorage",
+    "Crashpad",
+)
+
+
+def _copy_tolerant(source: str, target: str) -> str:
+    try:
+        return shutil.copy2(source, target)
+    except OSError as error:
+        logger.warning("Skipping profile file %s: %s", source, error)
+        return target
+
+
+def clone_profile(source: str, target: str) -> str:
+    """Copy a Chrome user-data-dir so another browser process can use it."""
+    source_path = Path(source)
+    target_path = Path(target)
+
+    if target_path.exists():
+        shutil.rmtree(target_path, ignore_errors=True)
+
+    if not source_path.exists():
+        logger.warning("Profile %s does not exist; worker starts with a fresh one", source)
+        target_path.mkdir(parents=True, exist_ok=True)
+        return str(target_path)
+
+    logger.info("Cloning browser profile %s -> %s", source_path, target_path)
+    shutil.copytree(
+        source_path,
+        target_path,
+        ignore=_IGNORED,
+        copy_function=_copy_tolerant,
+        dirs_exist_ok=True,
+    )
+    return str(target_path)
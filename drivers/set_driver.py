@@ -1,10 +1,10 @@
 from drivers.use_chrome_driver import use_chrome_driver
 
 
-def set_driver(driver_type="chrome"):
+def set_driver(driver_type="chrome", **options):
     driver = None
 
     if driver_type.lower() == "chrome":
-        driver = use_chrome_driver()
+        driver = use_chrome_driver(**options)
 
     return driver
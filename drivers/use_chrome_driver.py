@@ -1,12 +1,173 @@
-import chromedriver_autoinstaller
-from selenium import webdriver
+import json
+import os
+from typing import Optional
 
+# chromedriver_autoinstaller и selenium импортируются при запуске драйвера:
+# конфигурация и утилиты (выгрузки, статистика) не должны их ждать.
+
+if os.name == "nt":
+    DEFAULT_USER_DATA_DIR = r"C:\\selenium_profile"
+else:
+    DEFAULT_USER_DATA_DIR = os.path.join(
+        os.getenv("XDG_DATA_HOME") or os.path.join(os.path.expanduser("~"), ".local", "share"),
+        "hh_scraper",
+        "selenium_profile",
+    )
+
+# Домены счётчиков и рекламы: в lean-режиме они не резолвятся вовсе.
+ANALYTICS_HOSTS = (
+    "*.google-analytics.com",
+    "*.googletagmanager.com",
+    "*.doubleclick.net",
+    "mc.yandex.ru",
+    "an.yandex.ru",
+    "top-fwz1.mail.ru",
+    "*.facebook.net",
+)
+# Картинки, медиа и шрифты блокируются через CDP в каждой вкладке.
+BLOCKED_URL_PATTERNS = (
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.avif",
+    "*.svg",
+    "*.ico",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.eot",
+    "*.mp4",
+    "*.webm",
+    "*.mp3",
+    "*.ogg",
+    "*vk.com/rtrg*",
+    *(f"*{host.lstrip('*')}/*" for host in ANALYTICS_HOSTS),
+)
+
+
+def blocked_url_patterns():
+    extra = [pattern.strip() for pattern in os.getenv("BLOCKED_URLS", "").split(",") if pattern.strip()]
+    return [*BLOCKED_URL_PATTERNS, *extra]
+
+
+def block_resources(driver) -> None:
+    """Включает блокировку ресурсов в текущей вкладке (CDP действует на одну вкладку)."""
+    from selenium.common.exceptions import WebDriverException
+
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns()})
+    except WebDriverException:
+        pass
+
+
+def _add_lean_options(options) -> None:
+    options.page_load_strategy = "eager"
+    options.add_argument("--headless=new")
+    options.add_argument("--window-size=1366,900")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--mute-audio")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    rules = ", ".join(f"MAP {host} ~NOTFOUND" for host in ANALYTICS_HOSTS)
+    options.add_argument(f"--host-resolver-rules={rules}")
+    options.add_experimental_option(
+        "prefs",
+        {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        },
+    )
+    if os.name != "nt" and hasattr(os, "geteuid") and os.geteuid() == 0:
+        # Chrome отказывается запускаться от root в контейнере без этого флага.
+        options.add_argument("--no-sandbox")
+
+
+def _cache_path() -> str:
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.getenv("CHROMEDRIVER_CACHE") or os.path.join(cache_home, "hh_scraper", "chromedriver.json")
+
+
+def _chrome_version() -> str:
+    """Версия установленного Chrome или пустая строка, если её не удалось узнать."""
+    import chromedriver_autoinstaller
+
+    try:
+        return chromedriver_autoinstaller.get_chrome_version() or ""
+    except Exception:
+        return ""
+
+
+def _major(version: str) -> str:
+    return str(version or "").split(".", 1)[0]
+
+
+def _install_chromedriver() -> str:
+    """Скачивает подходящий chromedriver и запоминает путь вместе с версией Chrome."""
+    import chromedriver_autoinstaller
+
+    path = chromedriver_autoinstaller.install()
+    stamp = {"path": path, "chrome_version": _chrome_version()}
+    cache = _cache_path()
+    try:
+        os.makedirs(os.path.dirname(cache), exist_ok=True)
+        temporary = f"{cache}.tmp"
+        with open(temporary, "w", encoding="utf-8") as handle:
+            json.dump(stamp, handle)
+        os.replace(temporary, cache)
+    except OSError:
+        pass
+    return path
+
+
+def chromedriver_path(*, refresh: bool = False) -> str:
+    """Путь к chromedriver: из CHROMEDRIVER_PATH, из кэша или после установки.
+
+    Закэшированный драйвер используется, пока файл существует и мажорная версия
+    Chrome, для которой он ставился, совпадает с установленной; иначе драйвер
+    переустанавливается.
+    """
+    explicit = os.getenv("CHROMEDRIVER_PATH")
+    if explicit:
+        return explicit
+    if not refresh:
+        try:
+            with open(_cache_path(), encoding="utf-8") as handle:
+                stamp = json.load(handle)
+        except (OSError, ValueError):
+            stamp = {}
+        if not isinstance(stamp, dict):
+            stamp = {}
+        cached = stamp.get("path") or ""
+        if cached and os.path.exists(cached):
+            installed = _major(_chrome_version())
+            # Если версию Chrome узнать не удалось, доверяем кэшу.
+            if not installed or installed == _major(stamp.get("chrome_version")):
+                return cached
+    return _install_chromedriver()
+
+
+def _is_version_mismatch(error: Exception) -> bool:
+    message = str(getattr(error, "msg", None) or error).lower()
+    return "only supports chrome version" in message or "current browser version" in message
+
+
+def use_chrome_driver(user_data_dir: Optional[str] = None, lean: Optional[bool] = None):
+    from selenium import webdriver
+    from selenium.common.exceptions import SessionNotCreatedException
+    from selenium.webdriver.chrome.service import Service
+
+    # Профиль и режим берутся из конфигурации; она сама импортирует этот модуль.
+    from configs.config import config
 
-def use_chrome_driver():
-    chromedriver_autoinstaller.install()
     options = webdriver.ChromeOptions()
 
-    options.add_argument(r"--user-data-dir=C:\\selenium_profile")
+    user_data_dir = user_data_dir or config.user_data_dir
+    options.add_argument(f"--user-data-dir={user_data_dir}")
     options.add_argument("--profile-directory=Default")
 
     # Подавляем шумящие логи
@@ -14,6 +175,18 @@ def use_chrome_driver():
     options.add_experimental_option("excludeSwitches", ["enable-logging", "enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
 
-    driver = webdriver.Chrome(options=options)
-    driver.get("https://www.google.com")
+    lean = config.browser_mode == "lean" if lean is None else lean
+    if lean:
+        _add_lean_options(options)
+
+    try:
+        driver = webdriver.Chrome(service=Service(chromedriver_path()), options=options)
+    except SessionNotCreatedException as error:
+        # Штамп не поймал обновление Chrome (например, кэш задан вручную):
+        # переустанавливаем только при несовпадении версий, прочие ошибки не маскируем.
+        if os.getenv("CHROMEDRIVER_PATH") or not _is_version_mismatch(error):
+            raise
+        driver = webdriver.Chrome(service=Service(chromedriver_path(refresh=True)), options=options)
+    if lean:
+        block_resources(driver)
     return driver
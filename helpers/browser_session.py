@@ -0,0 +1,46 @@
+"""Export the authenticated Selenium session for plain HTTP clients."""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Tuple
+from urllib.parse import urlparse
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+@dataclass(frozen=True)
+class BrowserSession:
+    """Cookies and user agent copied from a live browser."""
+
+    user_agent: str
+    cookies: Tuple[Mapping[str, Any], ...]
+
+    def cookie_header(self, url: str) -> str:
+        host = (urlparse(url).hostname or "").lower()
+        pairs = []
+        for cookie in self.cookies:
+            domain = str(cookie.get("domain") or "").lstrip(".").lower()
+            if domain and host != domain and not host.endswith(f".{domain}"):
+                continue
+            pairs.append(f"{cookie['name']}={cookie['value']}")
+        return "; ".join(pairs)
+
+    def headers(self, url: str) -> Dict[str, str]:
+        headers = {
+            "User-Agent": self.user_agent,
+            "Accept": "text/html,application/xhtml+xml",
+            "Accept-Language": "ru-RU,ru;q=0.9,en;q=0.8",
+        }
+        cookie = self.cookie_header(url)
+        if cookie:
+            headers["Cookie"] = cookie
+        return headers
+
+
+def export_session(driver: WebDriver) -> BrowserSession:
+    """Copy cookies of the current site and the user agent from ``driver``."""
+    user_agent = driver.execute_script("return navigator.userAgent") or ""
+    return BrowserSession(user_agent=user_agent, cookies=tuple(driver.get_cookies()))
+
+
+__all__ = ["BrowserSession", "export_session"]
@@ -0,0 +1,194 @@
+"""Queue-based logging for the crawler: console and JSON file off the hot loop.
+
+Nothing here runs at import time. :func:`configure_logging` attaches a
+``QueueHandler`` to the ``hh_scraper`` logger only (the root logger is left
+alone), and a ``QueueListener`` thread formats records and writes them to the
+console and to a rotating JSON-lines file. Repeated wait/lookup messages are
+rate-limited per call site before they are even queued.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+ROOT_LOGGER = "hh_scraper"
+DEFAULT_LOG_PATH = "data/logs/hh_scraper.jsonl"
+CONSOLE_FORMAT = "%(asctime)s [%(levelname)s] %(message)s"
+# Messages with these prefixes are emitted for every wait and lookup.
+RATE_LIMITED_PREFIXES = (
+    "Waiting for",
+    "Finding all elements",
+    "Reading text from",
+    "Optional element",
+    "No elements located",
+)
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+_lock = threading.Lock()
+
+
+class RateLimitFilter(logging.Filter):
+    """Lets at most ``burst`` matching records per call site through every ``interval`` seconds.
+
+    The first record let through after a quiet period reports how many were
+    dropped in between, so the log still shows that the loop was waiting.
+    """
+
+    def __init__(self, *, burst: int = 5, interval: float = 10.0, prefixes=RATE_LIMITED_PREFIXES) -> None:
+        super().__init__()
+        self.burst = max(1, burst)
+        self.interval = max(0.0, interval)
+        self.prefixes = tuple(prefixes)
+        self._windows: Dict[Tuple[str, int], Tuple[float, int, int]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or not self.interval:
+            return True
+        template = record.msg if isinstance(record.msg, str) else ""
+        if not template.startswith(self.prefixes):
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            started, emitted, dropped = self._windows.get(key, (now, 0, 0))
+            if now - started >= self.interval:
+                started, emitted = now, 0
+            if emitted >= self.burst:
+                self._windows[key] = (started, emitted, dropped + 1)
+                return False
+            self._windows[key] = (started, emitted + 1, 0)
+        if dropped:
+            record.suppressed = dropped
+        return True
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queues the record as is: formatting happens on the listener thread.
+
+    The stock handler renders the message in the caller's thread so the record
+    can be pickled; this queue never leaves the process, so that is not needed.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line with the message and where it came from."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "module": record.module,
+            "line": record.lineno,
+            "process": record.process,
+            "thread": record.threadName,
+        }
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            payload["suppressed"] = suppressed
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class _ConsoleFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        return f"{text} (ещё {suppressed} похожих пропущено)" if suppressed else text
+
+
+def configure_logging(
+    *,
+    level: Optional[str] = None,
+    log_path: Optional[str] = None,
+    console: Optional[bool] = None,
+) -> None:
+    """Route ``hh_scraper.*`` loggers through a queue to the console and a JSON file.
+
+    Defaults come from ``LOG_LEVEL`` (INFO), ``LOG_PATH`` (``data/logs/hh_scraper.jsonl``,
+    empty disables the file), ``LOG_CONSOLE`` (1), ``LOG_MAX_BYTES``,
+    ``LOG_BACKUPS``, ``LOG_RATE_BURST`` and ``LOG_RATE_INTERVAL``. Calling it
+    again replaces the previous setup.
+    """
+    global _listener, _queue_handler
+
+    level = (level or os.getenv("LOG_LEVEL", "INFO")).upper()
+    log_path = os.getenv("LOG_PATH", DEFAULT_LOG_PATH) if log_path is None else log_path
+    if console is None:
+        console = os.getenv("LOG_CONSOLE", "1").strip().lower() in {"1", "true", "yes", "on"}
+
+    handlers = []
+    if console:
+        stream = logging.StreamHandler()
+        stream.setFormatter(_ConsoleFormatter(CONSOLE_FORMAT))
+        handlers.append(stream)
+    if log_path:
+        Path(log_path).parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_path,
+            maxBytes=int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+            backupCount=int(os.getenv("LOG_BACKUPS", "5")),
+            encoding="utf-8",
+        )
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+
+    with _lock:
+        shutdown_logging()
+        records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        _queue_handler = _DeferredQueueHandler(records)
+        _queue_handler.addFilter(
+            RateLimitFilter(
+                burst=int(os.getenv("LOG_RATE_BURST", "5")),
+                interval=float(os.getenv("LOG_RATE_INTERVAL", "10")),
+            )
+        )
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(level)
+        root.addHandler(_queue_handler)
+        # Records stop here: whatever the embedding application did to the
+        # root logger, they are not printed twice.
+        root.propagate = False
+        _listener = logging.handlers.QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records and detach the handlers installed by :func:`configure_logging`."""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger(ROOT_LOGGER).removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+__all__ = [
+    "DEFAULT_LOG_PATH",
+    "RateLimitFilter",
+    "configure_logging",
+    "shutdown_logging",
+]
@@ -0,0 +1,237 @@
+"""Stage timers, counters and periodic metric dumps for the crawl loop."""
+from __future__ import annotations
+
+import bisect
+import json
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds, Prometheus style (cumulative, +Inf is implicit).
+BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_RESERVOIR = 1000
+
+Key = Tuple[str, str]
+
+
+class Histogram:
+    """Bucketed latencies plus a window of recent samples for quantiles."""
+
+    def __init__(self) -> None:
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._recent: Deque[float] = deque(maxlen=_RESERVOIR)
+
+    def observe(self, seconds: float) -> None:
+        self.buckets[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self._recent.append(seconds)
+
+    def quantile(self, q: float) -> float:
+        if not self._recent:
+            return 0.0
+        ordered = sorted(self._recent)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def as_dict(self) -> Dict[str, Any]:
+        cumulative, running = {}, 0
+        for bound, count in zip([*map(str, BUCKETS), "+Inf"], self.buckets):
+            running += count
+            cumulative[bound] = running
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else 0.0,
+            "p50": round(self.quantile(0.5), 6),
+            "p95": round(self.quantile(0.95), 6),
+            "max": round(self.max, 6),
+            "buckets": cumulative,
+        }
+
+
+class Metrics:
+    """Thread-safe registry of stage histograms and event counters.
+
+    Every sample is labelled with the query the current thread is working on
+    (see :meth:`query_scope`), so deep helpers such as field lookups do not
+    need the query passed down to them.
+    """
+
+    def __init__(self) -> None:
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+        self._histograms: Dict[Key, Histogram] = defaultdict(Histogram)
+        self._counters: Dict[Key, int] = defaultdict(int)
+        self._query_time: Dict[str, float] = defaultdict(float)
+        self._local = threading.local()
+        self._dumper: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+    @property
+    def current_query(self) -> str:
+        return getattr(self._local, "query", "")
+
+    @contextmanager
+    def query_scope(self, query: str) -> Iterator[None]:
+        previous = self.current_query
+        self._local.query = query
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._query_time[query] += time.monotonic() - started
+            self._local.query = previous
+
+    def observe(self, stage: str, seconds: float, *, query: Optional[str] = None) -> None:
+        key = (stage, self.current_query if query is None else query)
+        with self._lock:
+            self._histograms[key].observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str, *, query: Optional[str] = None) -> Iterator[None]:
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.monotonic() - started, query=query)
+
+    def increment(self, event: str, amount: int = 1, *, query: Optional[str] = None) -> None:
+        key = (event, self.current_query if query is None else query)
+        with self._lock:
+            self._counters[key] += amount
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            uptime = time.monotonic() - self.started_at
+            saved = sum(value for (event, _), value in self._counters.items() if event == "resumes_saved")
+            return {
+                "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "uptime_seconds": round(uptime, 3),
+                "resumes_per_minute": round(saved / uptime * 60, 3) if uptime else 0.0,
+                "stages": [
+                    {"stage": stage, "query": query, **histogram.as_dict()}
+                    for (stage, query), histogram in sorted(self._histograms.items())
+                ],
+                "counters": [
+                    {"event": event, "query": query, "value": value}
+                    for (event, query), value in sorted(self._counters.items())
+                ],
+                "query_seconds": {query: round(value, 3) for query, value in self._query_time.items()},
+            }
+
+    def to_prometheus(self) -> str:
+        snapshot = self.snapshot()
+        lines = [
+            "# HELP hh_stage_seconds Time spent in each crawl stage.",
+            "# TYPE hh_stage_seconds histogram",
+        ]
+        for item in snapshot["stages"]:
+            labels = f'stage="{_escape(item["stage"])}",query="{_escape(item["query"])}"'
+            for bound, count in item["buckets"].items():
+                lines.append(f'hh_stage_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f"hh_stage_seconds_sum{{{labels}}} {item['sum']}")
+            lines.append(f"hh_stage_seconds_count{{{labels}}} {item['count']}")
+        lines += ["# HELP hh_events_total Crawl events.", "# TYPE hh_events_total counter"]
+        for item in snapshot["counters"]:
+            labels = f'event="{_escape(item["event"])}",query="{_escape(item["query"])}"'
+            lines.append(f"hh_events_total{{{labels}}} {item['value']}")
+        lines += [
+            "# TYPE hh_resumes_per_minute gauge",
+            f"hh_resumes_per_minute {snapshot['resumes_per_minute']}",
+            "# TYPE hh_uptime_seconds gauge",
+            f"hh_uptime_seconds {snapshot['uptime_seconds']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str | Path) -> None:
+        """Write a JSON snapshot, or Prometheus text for ``.prom``/``.txt`` files."""
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        if output.suffix in {".prom", ".txt"}:
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+        temporary = output.with_name(f"{output.name}.tmp")
+        temporary.write_text(content, encoding="utf-8")
+        os.replace(temporary, output)
+
+    def start_dumping(self, path: str, *, interval: float) -> None:
+        """Dump to ``path`` every ``interval`` seconds until :meth:`stop_dumping`."""
+        if not path or self._dumper is not None:
+            return
+        self._stop.clear()
+
+        def _run() -> None:
+            while not self._stop.wait(max(1.0, interval)):
+                try:
+                    self.dump(path)
+                except OSError:
+                    pass
+
+        self._dumper = threading.Thread(target=_run, name="metrics-dump", daemon=True)
+        self._dumper.start()
+
+    def stop_dumping(self, path: str = "") -> None:
+        if self._dumper is not None:
+            self._stop.set()
+            self._dumper.join()
+            self._dumper = None
+        if path:
+            self.dump(path)
+
+    def query_breakdown(self) -> List[str]:
+        """Human-readable per-query lines: throughput, events and where time went."""
+        snapshot = self.snapshot()
+        by_query: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"events": {}, "stages": []})
+        for item in snapshot["counters"]:
+            by_query[item["query"]]["events"][item["event"]] = item["value"]
+        for item in snapshot["stages"]:
+            by_query[item["query"]]["stages"].append(item)
+
+        lines: List[str] = []
+        for query in sorted(by_query, key=lambda value: (value == "", value)):
+            data = by_query[query]
+            if query:
+                seconds = snapshot["query_seconds"].get(query, 0.0)
+                saved = data["events"].get("resumes_saved", 0)
+                rate = f"{saved / seconds * 60:.1f} резюме/мин, " if seconds else ""
+                lines.append(
+                    f"  - {query}: {saved} новых, {rate}"
+                    f"дублей {data['events'].get('duplicates', 0)}, "
+                    f"ошибок {data['events'].get('failures', 0)}, {seconds:.1f} с"
+                )
+            else:
+                lines.append("  - вне запросов (фоновая запись и т. п.):")
+            stages = sorted(data["stages"], key=lambda item: item["sum"], reverse=True)
+            for item in stages[:8]:
+                lines.append(
+                    f"      {item['stage']}: {item['sum']:.2f} с всего, "
+                    f"{item['count']} раз, p50 {item['p50']:.3f} с, p95 {item['p95']:.3f} с"
+                )
+        return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metrics = Metrics()
+
+
+__all__ = ["BUCKETS", "Histogram", "Metrics", "metrics"]
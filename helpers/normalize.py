@@ -0,0 +1,139 @@
+"""Typed columns derived from the display strings of a resume record.
+
+``salary``, ``age``, ``work_experience`` and ``updated_at`` are stored as hh.ru
+shows them; :func:`normalize_record` adds numeric/ISO twins next to them so
+consumers filter on numbers instead of re-parsing Russian text. Patterns are
+compiled once and results for repeated strings are memoized, so the cost per
+record is a few dictionary lookups. The storage backends call it while
+writing, and ``NORMALIZE=1`` always starts the background writer, so it runs
+on the writer thread and never in the browser loop.
+"""
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from helpers.ru_dates import parse_ru_datetime
+
+NORMALIZED_COLUMNS = (
+    "salary_amount",
+    "salary_currency",
+    "salary_period",
+    "age_years",
+    "experience_months",
+    "updated_at_iso",
+)
+
+_AMOUNT = re.compile(r"\d[\d\s]*")
+_SPACES = re.compile(r"\s+")
+# Checked in order: "бел. руб." must win over "руб".
+_CURRENCIES: Tuple[Tuple[str, "re.Pattern[str]"], ...] = tuple(
+    (code, re.compile(pattern, re.IGNORECASE))
+    for code, pattern in (
+        ("BYN", r"бел\.?\s*руб|\bbyn\b|\bbr\b"),
+        ("RUB", r"₽|руб|\brur\b|\brub\b"),
+        ("USD", r"\$|\busd\b|долл"),
+        ("EUR", r"€|\beur\b|евро"),
+        ("KZT", r"₸|\bkzt\b|тенге"),
+        ("UAH", r"₴|\buah\b|грн"),
+        ("UZS", r"\buzs\b|сум"),
+        ("KGS", r"\bkgs\b|сом"),
+        ("AZN", r"₼|\bazn\b|манат"),
+        ("GEL", r"₾|\bgel\b|лари"),
+    )
+)
+_PERIODS: Tuple[Tuple[str, "re.Pattern[str]"], ...] = (
+    ("hour", re.compile(r"в\s+час|/\s*час|за\s+час|per\s+hour", re.IGNORECASE)),
+    ("day", re.compile(r"в\s+день|за\s+смену|за\s+день|per\s+day", re.IGNORECASE)),
+    ("year", re.compile(r"в\s+год|за\s+год|per\s+year", re.IGNORECASE)),
+)
+_AGE = re.compile(r"(\d{1,3})\s*(?:год|года|лет)\b", re.IGNORECASE)
+_EXPERIENCE = re.compile(
+    r"опыт\s+работы\s*(?:(?P<years>\d+)\s*(?:год|года|лет))?\s*(?:(?P<months>\d+)\s*месяц)?",
+    re.IGNORECASE,
+)
+# The total is in the block header; job entries below carry their own durations.
+_EXPERIENCE_HEAD = 120
+_RELATIVE_DAY = re.compile(r"сегодня|вчера", re.IGNORECASE)
+
+
+@lru_cache(maxsize=8192)
+def parse_salary(text: str) -> Tuple[Optional[int], str, str]:
+    """``(amount, currency, period)`` for strings like ``150 000 ₽ на руки``.
+
+    The currency defaults to RUB and the period to month when an amount is
+    present; without an amount all three are empty.
+    """
+    match = _AMOUNT.search(text or "")
+    if not match:
+        return None, "", ""
+    amount = int(_SPACES.sub("", match.group()))
+    currency = next((code for code, pattern in _CURRENCIES if pattern.search(text)), "RUB")
+    period = next((name for name, pattern in _PERIODS if pattern.search(text)), "month")
+    return amount, currency, period
+
+
+@lru_cache(maxsize=1024)
+def parse_age(text: str) -> Optional[int]:
+    match = _AGE.search(text or "")
+    return int(match.group(1)) if match else None
+
+
+@lru_cache(maxsize=8192)
+def _experience_head(head: str) -> Optional[int]:
+    match = _EXPERIENCE.search(head)
+    if not match or not (match["years"] or match["months"]):
+        return None
+    return int(match["years"] or 0) * 12 + int(match["months"] or 0)
+
+
+def experience_months(text: str) -> Optional[int]:
+    """Total experience in months from the ``Опыт работы 5 лет 3 месяца`` header."""
+    return _experience_head((text or "")[:_EXPERIENCE_HEAD])
+
+
+@lru_cache(maxsize=8192)
+def _cached_iso(text: str) -> str:
+    parsed = parse_ru_datetime(text)
+    return parsed.isoformat() if parsed else ""
+
+
+def updated_at_iso(text: str) -> str:
+    """ISO 8601 local time of an update string, or ``""`` if it has no date."""
+    if not text:
+        return ""
+    if _RELATIVE_DAY.search(text):
+        # "сегодня"/"вчера" depend on the current date and must not be cached.
+        parsed = parse_ru_datetime(text)
+        return parsed.isoformat() if parsed else ""
+    return _cached_iso(text)
+
+
+def normalize_record(record: Mapping[str, Any]) -> Dict[str, Any]:
+    """A copy of ``record`` with :data:`NORMALIZED_COLUMNS` added.
+
+    Records that already carry the columns (e.g. normalized by a worker
+    process) are returned unchanged.
+    """
+    normalized = dict(record)
+    if "salary_amount" in normalized:
+        return normalized
+    amount, currency, period = parse_salary(str(record.get("salary") or ""))
+    normalized["salary_amount"] = amount
+    normalized["salary_currency"] = currency
+    normalized["salary_period"] = period
+    normalized["age_years"] = parse_age(str(record.get("age") or ""))
+    normalized["experience_months"] = experience_months(str(record.get("work_experience") or ""))
+    normalized["updated_at_iso"] = updated_at_iso(str(record.get("updated_at") or ""))
+    return normalized
+
+
+__all__ = [
+    "NORMALIZED_COLUMNS",
+    "experience_months",
+    "normalize_record",
+    "parse_age",
+    "parse_salary",
+    "updated_at_iso",
+]
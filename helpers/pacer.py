@@ -0,0 +1,240 @@
+"""Adaptive request pacing shared by every navigation to the site.
+
+One token bucket (``pacer``) paces SERP loads, pagination and resume tabs; the
+HTTP backend, whose requests are far cheaper than a browser tab, has its own
+(``http_pacer``, ``HTTP_PACER_*`` settings). The rate creeps up while responses
+are healthy and is cut, with an exponentially growing pause and random jitter,
+when the site throttles or shows a captcha; the aim is the best sustained
+rate, not the best burst.
+With ``WORKERS>1`` the buckets live in shared memory (see
+:meth:`AdaptivePacer.share`), so all worker processes spend one rate and a
+captcha seen by one of them pauses every one.
+"""
+from __future__ import annotations
+
+import os
+import random
+import threading
+import time
+from typing import Any, Optional
+
+from helpers.metrics import metrics
+from helpers.selenium_helpers import logger
+
+# Substrings of a final URL that mean the request was not served normally.
+BLOCKED_URL_MARKERS = ("/account/login", "captcha")
+# HTTP statuses the site uses for rate limiting and blocks.
+THROTTLE_STATUSES = {401, 403, 429, 503}
+
+_PAUSE_SIGNALS = {"captcha", "throttle"}
+# Bucket state, in this order, in a plain list or a shared ``multiprocessing.Array``.
+_STATE_FIELDS = ("rate", "tokens", "updated", "paused_until", "healthy", "strikes")
+
+
+def _state_property(name: str) -> property:
+    position = _STATE_FIELDS.index(name)
+
+    def getter(self: "AdaptivePacer") -> float:
+        return self._state[position]
+
+    def setter(self: "AdaptivePacer", value: float) -> None:
+        self._state[position] = value
+
+    return property(getter, setter)
+
+
+def _env_float(name: str, default: str) -> float:
+    return float(os.getenv(name, default) or default)
+
+
+def is_blocked_url(url: str) -> bool:
+    return any(marker in url for marker in BLOCKED_URL_MARKERS)
+
+
+class AdaptivePacer:
+    """Thread-safe token bucket with additive increase and multiplicative decrease.
+
+    ``rate`` is in requests per second and ``burst`` tokens can be spent at
+    once. Every ``increase_every`` healthy responses in a row raise the rate by
+    ``step`` up to ``max_rate``. A ``"timeout"`` cuts the rate by a quarter; a
+    ``"throttle"`` or ``"captcha"`` halves it and also pauses all requests for
+    ``backoff * 2**strikes`` seconds (capped at ``max_backoff``) with full
+    jitter, where ``strikes`` counts penalties since the last healthy streak.
+    A rate of zero disables pacing, but the pauses still apply.
+
+    The mutable state can be moved to shared memory with :meth:`share` and
+    picked up in another process with :meth:`attach`; ``time.monotonic`` is
+    system-wide on the supported platforms, so the timestamps stay comparable.
+    """
+
+    rate = _state_property("rate")
+    _tokens = _state_property("tokens")
+    _updated = _state_property("updated")
+    _paused_until = _state_property("paused_until")
+    _healthy = _state_property("healthy")
+    _strikes = _state_property("strikes")
+
+    def __init__(
+        self,
+        *,
+        rate: float = 0.5,
+        min_rate: float = 0.05,
+        max_rate: float = 2.0,
+        burst: float = 3.0,
+        step: float = 0.05,
+        increase_every: int = 10,
+        backoff: float = 30.0,
+        max_backoff: float = 900.0,
+    ) -> None:
+        self._state: Any = [0.0] * len(_STATE_FIELDS)
+        self._lock: Any = threading.Lock()
+        self.enabled = rate > 0
+        self.min_rate = max(0.001, min_rate)
+        self.max_rate = max(self.min_rate, max_rate)
+        self.rate = min(self.max_rate, max(self.min_rate, rate)) if self.enabled else 0.0
+        self.burst = max(1.0, burst)
+        self.step = max(0.0, step)
+        self.increase_every = max(1, increase_every)
+        self.backoff = max(0.0, backoff)
+        self.max_backoff = max(self.backoff, max_backoff)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._healthy = 0
+        self._strikes = 0
+
+    def share(self, context: Any) -> Any:
+        """Move the state into shared memory of ``context``; pass the result to :meth:`attach`."""
+        with self._lock:
+            shared = context.Array("d", list(self._state))
+        self.attach(shared)
+        return shared
+
+    def attach(self, shared: Any) -> None:
+        """Use state created by :meth:`share` in another process."""
+        # The Array's lock is a multiprocessing RLock: it also serializes threads.
+        self._lock = shared.get_lock()
+        self._state = shared
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def ready_in(self) -> float:
+        """Seconds until :meth:`acquire` would return without sleeping; claims nothing."""
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._paused_until - now)
+            if self.enabled:
+                tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                if tokens < 1:
+                    delay = max(delay, (1 - tokens) / self.rate)
+            return delay
+
+    def reserve(self) -> float:
+        """Claim the next slot and return how long to wait before using it.
+
+        For callers that sleep on their own, e.g. ``await asyncio.sleep(...)``.
+        """
+        with self._lock:
+            now = time.monotonic()
+            delay = max(0.0, self._paused_until - now)
+            if not self.enabled:
+                return delay
+            self._refill(now)
+            self._tokens -= 1
+            if self._tokens < 0:
+                delay = max(delay, -self._tokens / self.rate)
+            return delay
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; return the seconds waited."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+        metrics.observe("pacer_wait", delay)
+        return delay
+
+    def success(self) -> None:
+        with self._lock:
+            self._healthy += 1
+            if int(self._healthy) % self.increase_every:
+                return
+            self._strikes = 0
+            if self.enabled:
+                self._refill(time.monotonic())
+                self.rate = min(self.max_rate, self.rate + self.step)
+
+    def penalize(self, signal: str) -> float:
+        """Slow down after ``signal`` ("timeout", "throttle" or "captcha"); return the pause."""
+        metrics.increment(f"pacer_{signal}")
+        with self._lock:
+            now = time.monotonic()
+            self._healthy = 0
+            if self.enabled:
+                self._refill(now)
+                factor = 0.5 if signal in _PAUSE_SIGNALS else 0.75
+                self.rate = max(self.min_rate, self.rate * factor)
+            if signal not in _PAUSE_SIGNALS:
+                return 0.0
+            pause = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** int(self._strikes)))
+            self._strikes += 1
+            self._paused_until = max(self._paused_until, now + pause)
+            # Requests already queued in the bucket should not fire right after the pause.
+            self._tokens = min(self._tokens, 0.0)
+            rate = self.rate
+        logger.warning(
+            "Сайт ограничивает запросы (%s): пауза %.0f с, темп %.2f запросов/с", signal, pause, rate
+        )
+        return pause
+
+    def observe_url(self, url: str, *, timed_out: bool = False) -> Optional[str]:
+        """Feed the outcome of a browser navigation; return the penalty signal, if any."""
+        if is_blocked_url(url):
+            signal = "captcha" if "captcha" in url else "throttle"
+        elif timed_out:
+            signal = "timeout"
+        else:
+            self.success()
+            return None
+        self.penalize(signal)
+        return signal
+
+    def observe_status(self, status: int, url: str = "") -> Optional[str]:
+        """Feed the outcome of an HTTP request; return the penalty signal, if any."""
+        if status in THROTTLE_STATUSES:
+            self.penalize("throttle")
+            return "throttle"
+        return self.observe_url(url)
+
+    @property
+    def paused_for(self) -> float:
+        with self._lock:
+            return max(0.0, self._paused_until - time.monotonic())
+
+
+def _build_pacer(
+    prefix: str = "PACER_", *, rate: str = "0.5", max_rate: str = "2", burst: str = "3"
+) -> AdaptivePacer:
+    return AdaptivePacer(
+        rate=_env_float(f"{prefix}RATE", rate),
+        min_rate=_env_float(f"{prefix}MIN_RATE", "0.05"),
+        max_rate=_env_float(f"{prefix}MAX_RATE", max_rate),
+        burst=_env_float(f"{prefix}BURST", burst),
+        backoff=_env_float(f"{prefix}BACKOFF", "30"),
+        max_backoff=_env_float(f"{prefix}MAX_BACKOFF", "900"),
+    )
+
+
+pacer = _build_pacer()
+http_pacer = _build_pacer("HTTP_PACER_", rate="4", max_rate="16", burst="8")
+
+
+__all__ = [
+    "AdaptivePacer",
+    "BLOCKED_URL_MARKERS",
+    "THROTTLE_STATUSES",
+    "http_pacer",
+    "is_blocked_url",
+    "pacer",
+]
@@ -0,0 +1,97 @@
+"""Parsing of the Russian date strings hh.ru shows for resume updates."""
+from __future__ import annotations
+
+import calendar
+import re
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+MONTHS = {
+    "января": 1,
+    "февраля": 2,
+    "марта": 3,
+    "апреля": 4,
+    "мая": 5,
+    "июня": 6,
+    "июля": 7,
+    "августа": 8,
+    "сентября": 9,
+    "октября": 10,
+    "ноября": 11,
+    "декабря": 12,
+}
+
+_ABSOLUTE = re.compile(
+    r"(?P<day>\d{1,2})\s+(?P<month>[а-яё]+)(?:\s+(?P<year>\d{4}))?"
+    r"(?:\s+в\s+(?P<hour>\d{1,2}):(?P<minute>\d{2}))?",
+    re.IGNORECASE,
+)
+_RELATIVE_DAY = re.compile(
+    r"(?P<day>сегодня|вчера)(?:\s+в\s+(?P<hour>\d{1,2}):(?P<minute>\d{2}))?",
+    re.IGNORECASE,
+)
+_NUMERIC = re.compile(r"(?P<day>\d{1,2})\.(?P<month>\d{1,2})\.(?P<year>\d{4})")
+
+
+def parse_ru_datetime(text: str, *, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Parse strings like ``Обновлено 12 октября 2025 в 10:15`` or ``вчера в 09:00``.
+
+    A missing year means the latest such date that is not in the future.
+    Returns ``None`` when nothing date-like is found.
+    """
+    if not text:
+        return None
+    now = now or datetime.now()
+    lowered = text.lower()
+
+    match = _RELATIVE_DAY.search(lowered)
+    if match:
+        day = now.date() - timedelta(days=1 if match["day"] == "вчера" else 0)
+        hour, minute = int(match["hour"] or 0), int(match["minute"] or 0)
+        return datetime(day.year, day.month, day.day, hour, minute)
+
+    match = _NUMERIC.search(lowered)
+    if match:
+        try:
+            return datetime(int(match["year"]), int(match["month"]), int(match["day"]))
+        except ValueError:
+            return None
+
+    for match in _ABSOLUTE.finditer(lowered):
+        month = MONTHS.get(match["month"])
+        if month is None:
+            continue
+        hour, minute = int(match["hour"] or 0), int(match["minute"] or 0)
+        year = int(match["year"]) if match["year"] else now.year
+        try:
+            parsed = datetime(year, month, int(match["day"]), hour, minute)
+        except ValueError:
+            return None
+        if not match["year"] and parsed > now:
+            parsed = parsed.replace(year=year - 1)
+        return parsed
+
+    return None
+
+
+def _stamp(parsed: Optional[datetime]) -> Optional[int]:
+    return calendar.timegm(parsed.timetuple()) if parsed else None
+
+
+@lru_cache(maxsize=4096)
+def _cached_stamp(text: str) -> Optional[int]:
+    return _stamp(parse_ru_datetime(text))
+
+
+def updated_stamp(text: str) -> Optional[int]:
+    """Seconds since the epoch for an update string, treating it as UTC wall time."""
+    if not text:
+        return None
+    if _RELATIVE_DAY.search(text.lower()):
+        # "сегодня"/"вчера" depend on the current date and must not be cached.
+        return _stamp(parse_ru_datetime(text))
+    return _cached_stamp(text)
+
+
+__all__ = ["MONTHS", "parse_ru_datetime", "updated_stamp"]
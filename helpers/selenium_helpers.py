@@ -14,16 +14,10 @@ from selenium.webdriver.support.ui import WebDriverWait
 Locator = Tuple[str, str]
 
 _LOGGER_NAME = "hh_scraper.selenium"
+# Handlers are installed by helpers.log_setup.configure_logging() from the
+# entry points; importing this module leaves logging configuration alone.
 logger = logging.getLogger(_LOGGER_NAME)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    force=True,
-)
-
-logger.setLevel(logging.INFO)
-
 DEFAULT_TIMEOUT: float = float(os.getenv("WAIT_TIMEOUT", "10"))
 _DEBUG_UI = os.getenv("DEBUG_UI", "0").lower() in {"1", "true", "yes", "on"}
 
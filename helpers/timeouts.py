@@ -0,0 +1,91 @@
+"""Adaptive lookup timeouts learned from how late elements actually appear."""
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Deque, Dict, Hashable, Optional
+
+RESUME_DEADLINE: float = float(os.getenv("RESUME_DEADLINE", "5"))
+_WINDOW = int(os.getenv("TIMEOUT_WINDOW", "200") or 200)
+_MIN_SAMPLES = int(os.getenv("TIMEOUT_MIN_SAMPLES", "20") or 20)
+_MARGIN = 1.5
+
+
+class Deadline:
+    """A fixed point in time that bounds every wait made for one page."""
+
+    def __init__(self, seconds: float) -> None:
+        self.expires_at = time.monotonic() + max(0.0, seconds)
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def cap(self, timeout: float) -> float:
+        return min(timeout, self.remaining())
+
+
+class LatencyTracker:
+    """Keeps a sliding window of delays per locator and derives timeouts from them.
+
+    A delay is how long a lookup made on a ready page waited for the element,
+    measured from the start of that lookup (the span its timeout covers).
+    A lookup that found nothing although it had budget left is recorded as a
+    zero delay (:meth:`record_miss`): the wait bought nothing, so a field that
+    is usually absent soon gets no wait at all. Until a locator has
+    ``min_samples`` observations the caller's fallback timeout is used, then
+    the timeout becomes the observed p95 times a safety margin — zero for
+    elements that are always rendered together with the page or never shown.
+    """
+
+    def __init__(self, *, window: int = _WINDOW, min_samples: int = _MIN_SAMPLES) -> None:
+        self.min_samples = max(1, min_samples)
+        self._samples: Dict[Hashable, Deque[float]] = defaultdict(lambda: deque(maxlen=window))
+        self._lock = threading.Lock()
+
+    def record(self, key: Hashable, seconds: float) -> None:
+        with self._lock:
+            self._samples[key].append(max(0.0, seconds))
+
+    def record_miss(self, key: Hashable) -> None:
+        """Note that ``key`` was absent from a ready page."""
+        self.record(key, 0.0)
+
+    def p95(self, key: Hashable) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(key, ()))
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)]
+
+    def timeout_for(self, key: Hashable, *, fallback: float) -> float:
+        """``fallback`` until ``key`` has enough samples, then p95 times the margin.
+
+        >>> tracker = LatencyTracker(min_samples=3)
+        >>> tracker.timeout_for("field", fallback=2.0)
+        2.0
+        >>> for delay in (0.0, 0.0, 0.4):
+        ...     tracker.record("field", delay)
+        >>> round(tracker.timeout_for("field", fallback=2.0), 2)
+        0.6
+        >>> for delay in (0.0, 0.0, 0.0):
+        ...     tracker.record("instant", delay)
+        >>> tracker.timeout_for("instant", fallback=2.0)
+        0.0
+        >>> for _ in range(3):
+        ...     tracker.record_miss("absent")
+        >>> tracker.timeout_for("absent", fallback=2.0)
+        0.0
+        """
+        p95 = self.p95(key)
+        if p95 is None:
+            return fallback
+        return min(fallback, p95 * _MARGIN)
+
+
+latency_tracker = LatencyTracker()
+
+
+__all__ = ["Deadline", "LatencyTracker", "RESUME_DEADLINE", "latency_tracker"]
@@ -2,20 +2,25 @@
 from __future__ import annotations
 
 import os
-from typing import Optional
+import time
+from typing import List, Optional
 from urllib.parse import urljoin, urlparse
 
 from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.remote.webdriver import WebDriver
+from selenium.webdriver.remote.webelement import WebElement
 from selenium.webdriver.support import expected_conditions as EC
 
 from helpers.selenium_helpers import (
     DEFAULT_TIMEOUT,
     describe_locator,
+    find_all,
     logger,
     wait_clickable,
+    wait_present,
     wait_visible,
 )
+from helpers.timeouts import RESUME_DEADLINE, Deadline, latency_tracker
 
 
 class BasePage:
@@ -26,6 +31,8 @@ class BasePage:
     def __init__(self, driver: WebDriver, *, timeout: Optional[float] = None) -> None:
         self.driver = driver
         self.timeout = timeout or DEFAULT_TIMEOUT
+        self._ready_at: Optional[float] = None
+        self._deadline: Optional[Deadline] = None
 
     # ------------------------------------------------------------------
     # Navigation helpers
@@ -54,12 +61,69 @@ class BasePage:
         except TimeoutException:
             return False
 
+    def wait_for_document_ready(self, *, timeout: Optional[float] = None) -> bool:
+        logger.info("Waiting for the document to finish loading")
+        try:
+            self.wait(timeout).until(
+                lambda driver: driver.execute_script("return document.readyState") == "complete"
+            )
+            return True
+        except TimeoutException:
+            return False
+
+    def wait_until_ready(
+        self,
+        locator,
+        *,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None,
+    ) -> bool:
+        """Wait once for the page's root container before reading optional fields.
+
+        Afterwards :meth:`get_optional_text` and :meth:`get_optional_elements`
+        wait only as long as lookups of the locator have been observed to take,
+        or not at all once it is known to be usually absent (see
+        :mod:`helpers.timeouts`), all together bounded by ``deadline`` seconds.
+        If the root never appears there is nothing to wait for and every
+        lookup is immediate.
+        """
+        try:
+            wait_present(self.driver, locator, label="Page root", timeout=self._timeout(timeout))
+            ready = True
+        except TimeoutException:
+            logger.info("Page root %s did not appear", describe_locator(locator))
+            ready = False
+        self._ready_at = time.monotonic()
+        self._deadline = Deadline(
+            (RESUME_DEADLINE if deadline is None else deadline) if ready else 0
+        )
+        return ready
+
+    def _optional_timeout(self, locator, fallback: float) -> float:
+        if self._ready_at is None:
+            return fallback
+        return self._deadline.cap(latency_tracker.timeout_for(locator, fallback=fallback))
+
+    def _record_found(self, locator, started: float) -> None:
+        # The sample is this lookup's own wait, the same span its timeout covers;
+        # time spent on earlier fields of a sequential read is not part of it.
+        if self._ready_at is not None:
+            latency_tracker.record(locator, time.monotonic() - started)
+
+    def _record_miss(self, locator) -> None:
+        # Only a lookup that stopped with budget left says the element is absent;
+        # one cut short by the deadline (or a page without its root) says nothing.
+        if self._ready_at is not None and self._deadline.remaining() > 0:
+            latency_tracker.record_miss(locator)
+
     # ------------------------------------------------------------------
     # Element interactions
     # ------------------------------------------------------------------
     def click(self, locator, *, label: Optional[str] = None, timeout: Optional[float] = None):
         description = label or describe_locator(locator)
-        element = wait_clickable(self.driver, locator, label=description, timeout=timeout or self.timeout)
+        element = wait_clickable(
+            self.driver, locator, label=description, timeout=self._timeout(timeout)
+        )
         logger.info("Clicking %s", description)
         element.click()
         return element
@@ -74,7 +138,7 @@ class BasePage:
         timeout: Optional[float] = None,
     ):
         description = label or describe_locator(locator)
-        element = wait_visible(self.driver, locator, label=description, timeout=timeout or self.timeout)
+        element = wait_visible(self.driver, locator, label=description, timeout=self._timeout(timeout))
         logger.info("Typing '%s' into %s", text, description)
         if clear:
             element.clear()
@@ -83,7 +147,7 @@ class BasePage:
 
     def get_text(self, locator, *, label: Optional[str] = None, timeout: Optional[float] = None) -> str:
         description = label or describe_locator(locator)
-        element = wait_visible(self.driver, locator, label=description, timeout=timeout or self.timeout)
+        element = wait_visible(self.driver, locator, label=description, timeout=self._timeout(timeout))
         logger.info("Reading text from %s", description)
         return element.text.strip()
 
@@ -95,16 +159,47 @@ class BasePage:
         timeout: Optional[float] = None,
         default: str = "",
     ) -> str:
+        effective_timeout = timeout if timeout is not None else min(self.timeout, 2)
+        started = time.monotonic()
         try:
-            effective_timeout = timeout if timeout is not None else min(self.timeout, 2)
-            return self.get_text(locator, label=label, timeout=effective_timeout)
+            text = self.get_text(
+                locator, label=label, timeout=self._optional_timeout(locator, effective_timeout)
+            )
         except TimeoutException:
             logger.info("Optional element %s not found; returning default", label or describe_locator(locator))
+            self._record_miss(locator)
             return default
+        self._record_found(locator, started)
+        return text
+
+    def get_optional_elements(
+        self,
+        locator,
+        *,
+        label: Optional[str] = None,
+        timeout: float = 1,
+    ) -> List[WebElement]:
+        started = time.monotonic()
+        elements = find_all(
+            self.driver,
+            locator,
+            label=label,
+            timeout=self._optional_timeout(locator, timeout),
+            require=False,
+        )
+        if elements:
+            self._record_found(locator, started)
+        else:
+            self._record_miss(locator)
+        return elements
 
     # ------------------------------------------------------------------
     # Utilities
     # ------------------------------------------------------------------
+    def _timeout(self, timeout: Optional[float]) -> float:
+        # An explicit zero means "look once", not "use the default".
+        return self.timeout if timeout is None else timeout
+
     def _resolve_url(self, path: Optional[str]) -> str:
         if not path:
             return self.base_url
@@ -3,18 +3,120 @@ from __future__ import annotations
 
 import json
 import re
-from typing import Dict, List
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
 from urllib.parse import urlparse
 
+from selenium.common.exceptions import WebDriverException
 from selenium.webdriver.common.by import By
 
-from helpers.selenium_helpers import find_all, logger
+from helpers.metrics import metrics
+from helpers.selenium_helpers import logger
+from helpers.timeouts import RESUME_DEADLINE, latency_tracker
 from pages.base_page import BasePage
 
+# Reads every locator of the page in a single WebDriver round-trip. The script
+# waits once for the resume root container (or a fully loaded document, bounded
+# by arguments[1] ms) and then mirrors what Selenium would return: ``innerText``
+# of visible nodes only, the first match for scalar fields and every match for
+# list fields. Fields listed in arguments[3] may render late and are re-read
+# while empty for up to their budget in ms, all within arguments[4] ms of the
+# root appearing. ``delays`` reports when each field was first seen after the
+# root (``null`` without a root) and ``deadlineHit`` whether arguments[4] ran out.
+# ``readyWait`` and ``timings`` are what :meth:`ResumeDetailPage.collect` times
+# as ``resume_ready`` and ``field.*``: the wait for the root, then how long each
+# field took to be found or given up after it.
+_COLLECT_SCRIPT = """
+const fields = arguments[0];
+const loadDeadline = Date.now() + arguments[1];
+const rootXpath = arguments[2];
+const budgets = arguments[3];
+const fieldDeadline = arguments[4];
+const done = arguments[arguments.length - 1];
+const started = Date.now();
+
+const isVisible = (node) =>
+  !!(node.offsetWidth || node.offsetHeight || node.getClientRects().length);
+const textOf = (node) => (isVisible(node) ? node.innerText || '' : '');
+const rootPresent = () =>
+  document.evaluate(
+    rootXpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+  ).singleNodeValue !== null;
+const isEmpty = (value) => !value || (Array.isArray(value) && !value.length);
+
+const extract = () => {
+  const result = {};
+  for (const [name, spec] of Object.entries(fields)) {
+    const [xpath, kind] = spec;
+    const snapshot = document.evaluate(
+      xpath, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+    );
+    const nodes = [];
+    for (let i = 0; i < snapshot.snapshotLength; i++) {
+      nodes.push(snapshot.snapshotItem(i));
+    }
+    if (kind === 'text') {
+      result[name] = nodes.length ? textOf(nodes[0]) : '';
+    } else if (kind === 'texts') {
+      result[name] = nodes.map(textOf);
+    } else {
+      result[name] = nodes.map((node) => [node.getAttribute('data-qa') || '', textOf(node)]);
+    }
+  }
+  return result;
+};
+
+let readyAt = null;
+let rooted = false;
+const delays = {};
+const poll = () => {
+  try {
+    if (readyAt === null) {
+      rooted = rootPresent();
+      if (!rooted && document.readyState !== 'complete' && Date.now() < loadDeadline) {
+        setTimeout(poll, 50);
+        return;
+      }
+      readyAt = Date.now();
+    }
+    const result = extract();
+    const elapsed = Date.now() - readyAt;
+    for (const name of Object.keys(fields)) {
+      if (!isEmpty(result[name]) && !(name in delays)) {
+        delays[name] = elapsed;
+      }
+    }
+    const waiting = rooted && Object.entries(budgets).some(
+      ([name, budget]) => isEmpty(result[name]) && elapsed < Math.min(budget, fieldDeadline)
+    );
+    if (waiting) {
+      setTimeout(poll, 50);
+      return;
+    }
+    const timings = {};
+    for (const name of Object.keys(fields)) {
+      timings[name] = name in delays
+        ? delays[name]
+        : (name in budgets ? Math.min(elapsed, budgets[name]) : 0);
+    }
+    result.url = window.location.href;
+    result.delays = rooted ? delays : null;
+    result.readyWait = readyAt - started;
+    result.timings = timings;
+    result.deadlineHit = elapsed >= fieldDeadline;
+    done(result);
+  } catch (error) {
+    done({error: String(error)});
+  }
+};
+poll();
+"""
+
 
 class ResumeDetailPage(BasePage):
     """Encapsulates selectors and helpers for resume details."""
 
+    # Rendered together with the resume body; the only element worth waiting for.
+    RESUME_ROOT = (By.XPATH, '//*[@data-qa="resume" or @data-qa="resume-block-personal"]')
     FULL_NAME = (By.XPATH, '//h1[@data-qa="resume-personal-name"]')
     DESIRED_POSITION = (By.XPATH, '//span[@data-qa="resume-block-title-position"]')
     SALARY = (By.XPATH, '//span[@data-qa="resume-block-salary"]')
@@ -48,120 +150,205 @@ class ResumeDetailPage(BasePage):
         '//div[@data-qa="resume-block-personal"]//*[@data-qa]',
     )
 
+    # Raw field name -> (locator attribute, kind). ``text`` reads the first match,
+    # ``texts`` every match and ``details`` (data-qa, text) pairs.
+    RAW_FIELDS: Dict[str, Tuple[str, str]] = {
+        "full_name": ("FULL_NAME", "text"),
+        "desired_position": ("DESIRED_POSITION", "text"),
+        "salary": ("SALARY", "text"),
+        "age": ("AGE", "text"),
+        "gender": ("GENDER", "text"),
+        "location": ("LOCATION", "text"),
+        "work_experience": ("WORK_EXPERIENCE", "text"),
+        "education": ("EDUCATION", "text"),
+        "languages": ("LANGUAGE_ITEMS", "texts"),
+        "self_description": ("SELF_DESCRIPTION", "text"),
+        "key_skills": ("KEY_SKILLS", "texts"),
+        "skill_keywords": ("SKILL_KEYWORDS", "texts"),
+        "citizenship": ("CITIZENSHIP", "texts"),
+        "ready_to_relocate": ("READY_TO_RELOCATE", "text"),
+        "travel_time": ("TRAVEL_TIME", "text"),
+        "driver_license": ("DRIVER_LICENSES", "texts"),
+        "personal_details": ("PERSONAL_DETAILS", "details"),
+        "updated_at": ("UPDATED_AT", "text"),
+    }
+    # Fallback timeouts that differ from the default optional-field wait.
+    FIELD_TIMEOUTS: Dict[str, float] = {"self_description": 1}
+
+    def _field_timeout(self, name: str, kind: str) -> float:
+        """Wait for an optional field before its delays are known (see ``BasePage``)."""
+        if kind == "text":
+            return self.FIELD_TIMEOUTS.get(name, min(self.timeout, 2))
+        return 1
+
     def collect(self) -> dict:
-        logger.info("Collecting resume details from %s", self.current_url)
-        personal_details = self._collect_personal_details()
-        languages = self._collect_languages()
-        key_skills = self._collect_key_skills()
-        driver_licenses = self._collect_driver_license()
+        url = self.current_url
+        logger.info("Collecting resume details from %s", url)
+        with metrics.timer("resume_ready"):
+            self.wait_until_ready(self.RESUME_ROOT)
+        raw: Dict[str, Any] = {}
+        for name, (attribute, kind) in self.RAW_FIELDS.items():
+            locator = getattr(self, attribute)
+            label = name.replace("_", " ").capitalize()
+            with metrics.timer(f"field.{name}"):
+                if kind == "text":
+                    raw[name] = self.get_optional_text(
+                        locator, label=label, timeout=self._field_timeout(name, kind)
+                    )
+                elif kind == "texts":
+                    raw[name] = self._read_texts(locator, label=label)
+                else:
+                    raw[name] = self._read_details(locator, label=label)
+        return self.build_record(url, raw)
+
+    def collect_script(self) -> dict:
+        """Collect the same record as :meth:`collect` with one in-page script."""
+        logger.info("Collecting resume details with a single script call")
+        fields = {
+            name: [getattr(self, attribute)[1], kind]
+            for name, (attribute, kind) in self.RAW_FIELDS.items()
+        }
+        # Same budgets as the element lookups of :meth:`collect`: the configured
+        # wait until a field has enough samples, then its p95 delay times the
+        # margin, so fields that always come with the root get no wait at all.
+        budgets = {
+            name: int(budget * 1000)
+            for name, (attribute, kind) in self.RAW_FIELDS.items()
+            if (
+                budget := latency_tracker.timeout_for(
+                    getattr(self, attribute), fallback=self._field_timeout(name, kind)
+                )
+            )
+            > 0
+        }
+        try:
+            with metrics.timer("collect_script"):
+                result = self.driver.execute_async_script(
+                    _COLLECT_SCRIPT,
+                    fields,
+                    int(self.timeout * 1000),
+                    self.RESUME_ROOT[1],
+                    budgets,
+                    int(RESUME_DEADLINE * 1000),
+                )
+        except WebDriverException as error:
+            logger.warning("In-page extraction failed (%s); using element lookups", error)
+            return self.collect()
+
+        if not isinstance(result, dict) or "error" in result:
+            logger.warning(
+                "In-page extraction returned no data (%s); using element lookups",
+                (result or {}).get("error") if isinstance(result, dict) else result,
+            )
+            return self.collect()
+
+        url = result.pop("url", "") or self.current_url
+        self._record_delays(result.pop("delays", None), deadline_hit=result.pop("deadlineHit", False))
+        self._record_timings(result.pop("readyWait", None), result.pop("timings", None))
+        return self.build_record(url, self._clean_raw(result))
+
+    def _record_delays(self, delays: Any, *, deadline_hit: bool) -> None:
+        """Feed the script's per-field delays, and misses, to the latency tracker."""
+        if not isinstance(delays, dict):
+            return
+        for name, (attribute, _) in self.RAW_FIELDS.items():
+            locator = getattr(self, attribute)
+            if name in delays:
+                latency_tracker.record(locator, delays[name] / 1000)
+            elif not deadline_hit:
+                # Same rule as ``BasePage._record_miss``: absent with budget left.
+                latency_tracker.record_miss(locator)
+
+    def _record_timings(self, ready_wait: Any, timings: Any) -> None:
+        """Report the script's waits under the stage names :meth:`collect` uses."""
+        if isinstance(ready_wait, (int, float)):
+            metrics.observe("resume_ready", ready_wait / 1000)
+        if not isinstance(timings, dict):
+            return
+        for name in self.RAW_FIELDS:
+            if isinstance(timings.get(name), (int, float)):
+                metrics.observe(f"field.{name}", timings[name] / 1000)
+
+    @classmethod
+    def build_record(cls, url: str, raw: Mapping[str, Any]) -> dict:
+        """Turn raw field values into the record stored in the CSV files."""
+        personal_details = {
+            data_qa: value for data_qa, value in raw.get("personal_details", []) if data_qa and value
+        }
+        languages = cls._parse_languages(raw.get("languages", []))
+        key_skills = cls._unique_preserve_order(list(raw.get("key_skills", [])))
+        driver_licenses = cls._unique_preserve_order(list(raw.get("driver_license", [])))
 
         formatted_languages = [
             formatted
-            for formatted in (self._format_language(entry) for entry in languages)
+            for formatted in (cls._format_language(entry) for entry in languages)
             if formatted
         ]
 
         return {
-            "resume_id": self._extract_resume_id(self.current_url),
-            "url": self.current_url,
-            "full_name": self.get_optional_text(self.FULL_NAME, label="Full name"),
-            "desired_position": self.get_optional_text(
-                self.DESIRED_POSITION, label="Desired position"
-            ),
-            "salary": self.get_optional_text(self.SALARY, label="Salary"),
-            "age": self.get_optional_text(self.AGE, label="Age"),
-            "gender": self.get_optional_text(self.GENDER, label="Gender"),
-            "location": self.get_optional_text(self.LOCATION, label="Location"),
-            "work_experience": self.get_optional_text(
-                self.WORK_EXPERIENCE, label="Work experience"
-            ),
-            "education": self.get_optional_text(self.EDUCATION, label="Education"),
+            "resume_id": cls._extract_resume_id(url),
+            "url": url,
+            "full_name": raw.get("full_name", ""),
+            "desired_position": raw.get("desired_position", ""),
+            "salary": raw.get("salary", ""),
+            "age": raw.get("age", ""),
+            "gender": raw.get("gender", ""),
+            "location": raw.get("location", ""),
+            "work_experience": raw.get("work_experience", ""),
+            "education": raw.get("education", ""),
             "languages": "; ".join(formatted_languages),
             "languages_detailed": json.dumps(languages, ensure_ascii=False),
-            "self_description": self.get_optional_text(
-                self.SELF_DESCRIPTION,
-                label="Self description",
-                timeout=1,
-            ),
+            "self_description": raw.get("self_description", ""),
             "key_skills": "; ".join(key_skills),
             "key_skills_raw": json.dumps(key_skills, ensure_ascii=False),
-            "skill_keywords": self._join_texts(self.SKILL_KEYWORDS, label="Skill keywords"),
-            "citizenship": self._join_texts(self.CITIZENSHIP, label="Citizenship"),
-            "ready_to_relocate": self.get_optional_text(
-                self.READY_TO_RELOCATE, label="Relocation readiness"
-            ),
-            "travel_time": self.get_optional_text(self.TRAVEL_TIME, label="Travel time"),
+            "skill_keywords": ", ".join(raw.get("skill_keywords", [])),
+            "citizenship": ", ".join(raw.get("citizenship", [])),
+            "ready_to_relocate": raw.get("ready_to_relocate", ""),
+            "travel_time": raw.get("travel_time", ""),
             "driver_license": "; ".join(driver_licenses),
             "driver_license_raw": json.dumps(driver_licenses, ensure_ascii=False),
             "personal_details": json.dumps(personal_details, ensure_ascii=False),
-            "updated_at": self.get_optional_text(self.UPDATED_AT, label="Updated at"),
+            "updated_at": raw.get("updated_at", ""),
         }
 
-    def _collect_key_skills(self) -> List[str]:
-        elements = find_all(
-            self.driver, self.KEY_SKILLS, label="Key skills", timeout=1, require=False
-        )
-        return self._unique_preserve_order(
-            [element.text.strip() for element in elements if element.text.strip()]
-        )
-
-    def _collect_languages(self) -> List[Dict[str, str]]:
-        elements = find_all(
-            self.driver,
-            self.LANGUAGE_ITEMS,
-            label="Languages",
-            timeout=1,
-            require=False,
-        )
+    def _read_texts(self, locator, *, label: str) -> List[str]:
+        elements = self.get_optional_elements(locator, label=label)
+        return [element.text.strip() for element in elements if element.text.strip()]
+
+    def _read_details(self, locator, *, label: str) -> List[Tuple[str, str]]:
+        elements = self.get_optional_elements(locator, label=label)
+        return [
+            ((element.get_attribute("data-qa") or "").strip(), element.text.strip())
+            for element in elements
+        ]
+
+    @classmethod
+    def _clean_raw(cls, raw: Mapping[str, Any]) -> Dict[str, Any]:
+        cleaned: Dict[str, Any] = {}
+        for name, (_, kind) in cls.RAW_FIELDS.items():
+            value = raw.get(name)
+            if kind == "text":
+                cleaned[name] = (value or "").strip()
+            elif kind == "texts":
+                cleaned[name] = [text.strip() for text in value or [] if text and text.strip()]
+            else:
+                cleaned[name] = [
+                    ((data_qa or "").strip(), (text or "").strip()) for data_qa, text in value or []
+                ]
+        return cleaned
+
+    @classmethod
+    def _parse_languages(cls, texts: Sequence[str]) -> List[Dict[str, str]]:
         languages: List[Dict[str, str]] = []
 
-        for element in elements:
-            text = element.text.strip()
-            if not text:
-                continue
-            name, level = self._split_language(text)
+        for text in texts:
+            name, level = cls._split_language(text)
             if not name:
                 continue
             languages.append({"name": name, "level": level})
 
         return languages
 
-    def _collect_driver_license(self) -> List[str]:
-        elements = find_all(
-            self.driver,
-            self.DRIVER_LICENSES,
-            label="Driver license",
-            timeout=1,
-            require=False,
-        )
-        return self._unique_preserve_order(
-            [element.text.strip() for element in elements if element.text.strip()]
-        )
-
-    def _collect_personal_details(self) -> Dict[str, str]:
-        elements = find_all(
-            self.driver,
-            self.PERSONAL_DETAILS,
-            label="Personal details",
-            timeout=1,
-            require=False,
-        )
-        details: Dict[str, str] = {}
-
-        for element in elements:
-            data_qa = (element.get_attribute("data-qa") or "").strip()
-            value = element.text.strip()
-            if not data_qa or not value:
-                continue
-            details[data_qa] = value
-
-        return details
-
-    def _join_texts(self, locator, *, label: str, separator: str = ", ") -> str:
-        elements = find_all(self.driver, locator, label=label, timeout=1, require=False)
-        values = [element.text.strip() for element in elements if element.text.strip()]
-        return separator.join(values)
-
     @staticmethod
     def _extract_resume_id(url: str) -> str:
         parsed = urlparse(url)
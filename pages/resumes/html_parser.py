@@ -0,0 +1,127 @@
+"""Offline parsers that read resume and SERP pages from saved HTML."""
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.parse import urljoin
+
+from lxml import html as lxml_html
+
+from pages.resumes.detail_page import ResumeDetailPage
+from pages.resumes.search_page import ResumeSearchPage
+
+_SKIPPED_TAGS = {"script", "style", "template", "noscript", "head"}
+_BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+    "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4",
+    "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section",
+    "table", "tr", "ul",
+}
+_HIDDEN_STYLE = re.compile(r"display\s*:\s*none|visibility\s*:\s*hidden", re.IGNORECASE)
+_SPACES = re.compile(r"[ \t\r\f\v\u00a0]+")
+
+
+def _is_hidden(node) -> bool:
+    if node.get("hidden") is not None or node.get("aria-hidden") == "true":
+        return True
+    return bool(_HIDDEN_STYLE.search(node.get("style") or ""))
+
+
+def _is_visible(node) -> bool:
+    current = node
+    while current is not None:
+        if not isinstance(current.tag, str) or current.tag in _SKIPPED_TAGS:
+            return False
+        if _is_hidden(current):
+            return False
+        current = current.getparent()
+    return True
+
+
+def _collect_text(node, parts: List[str]) -> None:
+    tag = node.tag if isinstance(node.tag, str) else ""
+    if not tag or tag in _SKIPPED_TAGS or _is_hidden(node):
+        return
+
+    # Line breaks in the source are plain whitespace; only block elements break lines.
+    block = tag in _BLOCK_TAGS
+    if block:
+        parts.append("\n")
+    if node.text:
+        parts.append(node.text.replace("\n", " "))
+    for child in node:
+        _collect_text(child, parts)
+        if child.tail:
+            parts.append(child.tail.replace("\n", " "))
+    if block:
+        parts.append("\n")
+
+
+def node_text(node) -> str:
+    """Approximate Selenium's ``WebElement.text`` for an lxml element."""
+    if not _is_visible(node):
+        return ""
+
+    parts: List[str] = []
+    _collect_text(node, parts)
+    lines = (_SPACES.sub(" ", line).strip() for line in "".join(parts).split("\n"))
+    return "\n".join(line for line in lines if line)
+
+
+def _xpath(locator: Tuple[str, str]) -> str:
+    return locator[1]
+
+
+def parse_resume_html(page_source: str, url: str) -> Dict[str, Any]:
+    """Parse a resume detail page into the record produced by ``collect()``."""
+    document = lxml_html.fromstring(page_source)
+    raw: Dict[str, Any] = {}
+
+    for name, (attribute, kind) in ResumeDetailPage.RAW_FIELDS.items():
+        nodes = document.xpath(_xpath(getattr(ResumeDetailPage, attribute)))
+        if kind == "text":
+            raw[name] = node_text(nodes[0]) if nodes else ""
+        elif kind == "texts":
+            raw[name] = [text for text in (node_text(node) for node in nodes) if text]
+        else:
+            raw[name] = [((node.get("data-qa") or "").strip(), node_text(node)) for node in nodes]
+
+    return ResumeDetailPage.build_record(url, raw)
+
+
+def parse_search_cards_html(page_source: str, base_url: str = "") -> List[Dict[str, str]]:
+    """Return the card records ``ResumeSearchPage.extract_resume_cards`` would read."""
+    document = lxml_html.fromstring(page_source)
+    cards: List[Dict[str, str]] = []
+
+    for card in document.xpath(_xpath(ResumeSearchPage.RESUME_CARDS)):
+        record = {"resume_id": (card.get("data-resume-id") or "").strip(), "url": ""}
+        for name, attribute in ResumeSearchPage.CARD_FIELDS.items():
+            nodes = card.xpath(_xpath(getattr(ResumeSearchPage, attribute)))
+            record[name] = node_text(nodes[0]) if nodes else ""
+            if name == "title" and nodes:
+                href = (nodes[0].get("href") or "").strip()
+                record["url"] = urljoin(base_url, href) if href else ""
+        record["resume_id"] = ResumeSearchPage.card_resume_id(record["resume_id"], record["url"])
+        cards.append(record)
+
+    return cards
+
+
+def parse_search_html(page_source: str, base_url: str = "") -> List[str]:
+    """Return the resume links found on a saved search results page."""
+    return [card["url"] for card in parse_search_cards_html(page_source, base_url) if card["url"]]
+
+
+def parse_resume_pages(pages: Iterable[Tuple[str, str]]) -> List[Dict[str, Any]]:
+    """Parse ``(page_source, url)`` pairs; suitable as a process pool task."""
+    return [parse_resume_html(page_source, url) for page_source, url in pages]
+
+
+__all__ = [
+    "node_text",
+    "parse_resume_html",
+    "parse_resume_pages",
+    "parse_search_cards_html",
+    "parse_search_html",
+]
@@ -0,0 +1,108 @@
+"""Fast classification of a freshly loaded resume page.
+
+A captcha, a login wall or a "resume hidden/deleted" stub is recognised from
+the URL and a few sentinel ``data-qa`` markers right after the tab loads, so
+such pages cost one script call instead of every field timeout. The caller
+acts on the returned state: ``parse`` the resume, ``skip`` it, ``pause`` for a
+human (captcha) or ``refresh`` the session (login wall).
+"""
+from __future__ import annotations
+
+import re
+from typing import Iterable, Optional, Tuple
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+PARSE = "parse"
+SKIP = "skip"
+PAUSE = "pause"
+REFRESH = "refresh"
+
+# (pattern, state, reason), checked in order against the final URL.
+URL_RULES: Tuple[Tuple["re.Pattern[str]", str, str], ...] = (
+    (re.compile(r"captcha", re.IGNORECASE), PAUSE, "captcha"),
+    (re.compile(r"/account/(?:login|signup)|/auth/"), REFRESH, "login"),
+    (re.compile(r"/(?:404|error)(?:[/?#]|$)"), SKIP, "removed"),
+)
+# Sentinel data-qa marker -> (state, reason).
+SENTINELS = {
+    "account-captcha-input": (PAUSE, "captcha"),
+    "captcha-image": (PAUSE, "captcha"),
+    "account-login-form": (REFRESH, "login"),
+    "login-input-username": (REFRESH, "login"),
+    "resume-hidden": (SKIP, "removed"),
+    "resume-deleted": (SKIP, "removed"),
+    "resume-not-found": (SKIP, "removed"),
+    "resume-access-denied": (SKIP, "removed"),
+    "resume-hidden-message": (SKIP, "removed"),
+}
+# Markers of a rendered resume body (see ``ResumeDetailPage.RESUME_ROOT``).
+RESUME_MARKERS = ("resume", "resume-block-personal")
+# Everything a page is probed for, in one list for the in-page script.
+PROBED_MARKERS: Tuple[str, ...] = (*SENTINELS, *RESUME_MARKERS)
+
+# Returns the markers from arguments[0] that are present on the page.
+MARKERS_JS = "arguments[0].filter((qa) => document.querySelector(`[data-qa=\"${qa}\"]`) !== null)"
+_STATE_SCRIPT = f"return [location.href, {MARKERS_JS}];"
+_HTML_MARKER = re.compile(
+    r'data-qa=["\'](' + "|".join(re.escape(marker) for marker in PROBED_MARKERS) + r')["\']'
+)
+
+
+class PageStateError(Exception):
+    """A loaded page is not a resume: carries the state the caller should act on."""
+
+    def __init__(self, state: str, reason: str, url: str) -> None:
+        super().__init__(f"{reason}: {url}")
+        self.state = state
+        self.reason = reason
+        self.url = url
+
+
+def classify_page(url: str, markers: Iterable[str]) -> Tuple[str, str]:
+    """Return ``(state, reason)`` for a page at ``url`` showing ``markers``.
+
+    A rendered resume body wins over everything but the URL rules; a page with
+    neither known markers nor a resume body is left to the parser and its
+    regular waits.
+    """
+    for pattern, state, reason in URL_RULES:
+        if pattern.search(url or ""):
+            return state, reason
+    present = set(markers)
+    for marker, (state, reason) in SENTINELS.items():
+        if marker in present and not present.intersection(RESUME_MARKERS):
+            return state, reason
+    return PARSE, "resume" if present.intersection(RESUME_MARKERS) else "unknown"
+
+
+def html_markers(page_source: str) -> set:
+    """Probed markers found in raw HTML, for pages fetched without a browser."""
+    return set(_HTML_MARKER.findall(page_source))
+
+
+def read_page_state(driver: WebDriver) -> Tuple[str, str, str]:
+    """Classify the current tab with a single script call; return ``(state, reason, url)``."""
+    url, markers = driver.execute_script(_STATE_SCRIPT, list(PROBED_MARKERS))
+    state, reason = classify_page(url, markers or [])
+    return state, reason, url
+
+
+def page_error(url: str, markers: Iterable[str]) -> Optional[PageStateError]:
+    """The error for a page that must not be parsed, or ``None`` for a resume."""
+    state, reason = classify_page(url, markers)
+    return None if state == PARSE else PageStateError(state, reason, url)
+
+
+__all__ = [
+    "PARSE",
+    "PAUSE",
+    "PROBED_MARKERS",
+    "PageStateError",
+    "REFRESH",
+    "SKIP",
+    "classify_page",
+    "html_markers",
+    "page_error",
+    "read_page_state",
+]
@@ -1,9 +1,14 @@
 """Page object for the resume search results."""
 from __future__ import annotations
 
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from selenium.common.exceptions import (
+    NoSuchElementException,
+    TimeoutException,
+    WebDriverException,
+)
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
 
@@ -15,6 +20,38 @@ from helpers.selenium_helpers import (
     wait_present,
 )
 from pages.base_page import BasePage
+from pages.resumes.detail_page import ResumeDetailPage
+
+# Reads every card on the SERP in one round-trip. arguments[0] is the card XPath,
+# arguments[1] maps output fields to XPaths relative to the card.
+_CARDS_SCRIPT = """
+const [cardsXpath, fields] = arguments;
+const select = (xpath, context) => {
+  const snapshot = document.evaluate(
+    xpath, context, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null
+  );
+  const nodes = [];
+  for (let i = 0; i < snapshot.snapshotLength; i++) {
+    nodes.push(snapshot.snapshotItem(i));
+  }
+  return nodes;
+};
+const isVisible = (node) =>
+  !!(node.offsetWidth || node.offsetHeight || node.getClientRects().length);
+const textOf = (node) => (node && isVisible(node) ? (node.innerText || '').trim() : '');
+
+return select(cardsXpath, document).map((card) => {
+  const record = {resume_id: card.getAttribute('data-resume-id') || ''};
+  for (const [name, xpath] of Object.entries(fields)) {
+    const node = select(xpath, card)[0];
+    record[name] = node ? textOf(node) : '';
+    if (name === 'title') {
+      record.url = node ? node.href || '' : '';
+    }
+  }
+  return record;
+});
+"""
 
 
 class ResumeSearchPage(BasePage):
@@ -27,8 +64,37 @@ class ResumeSearchPage(BasePage):
         '//div[contains(@data-qa, "resume-serp__resume") and @data-resume-id]'
     )
     RESUME_TITLE = (By.XPATH, './/a[@data-qa="serp-item__title"]')
+    CARD_AGE = (By.XPATH, './/*[@data-qa="resume-serp__resume-age"]')
+    CARD_SALARY = (By.XPATH, './/*[@data-qa="resume-serp__resume-compensation"]')
+    CARD_UPDATED_AT = (By.XPATH, './/*[@data-qa="resume-serp__resume-date"]')
+
+    # Card field -> locator attribute, relative to a card element.
+    CARD_FIELDS: Dict[str, str] = {
+        "title": "RESUME_TITLE",
+        "age": "CARD_AGE",
+        "salary": "CARD_SALARY",
+        "updated_at": "CARD_UPDATED_AT",
+    }
     NEXT_BUTTON = (By.XPATH, '//a[@data-qa="pager-next"]')
 
+    @staticmethod
+    def page_url(search_url: str, query: str, page: int = 0) -> str:
+        """Build the SERP URL for ``query`` and a zero-based ``page`` index."""
+        parsed = urlparse(search_url)
+        params = [
+            (key, value)
+            for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+            if key not in {"text", "page"}
+        ]
+        params.append(("text", (query or "").strip()))
+        if page:
+            params.append(("page", str(page)))
+        return urlunparse(parsed._replace(query=urlencode(params)))
+
+    def open_page(self, search_url: str, query: str, page: int = 0) -> "ResumeSearchPage":
+        self.open(self.page_url(search_url, query, page))
+        return self
+
     def wait_until_ready(self) -> "ResumeSearchPage":
         wait_clickable(self.driver, self.SEARCH_INPUT, label="Resume search input", timeout=self.timeout)
         return self
@@ -58,7 +124,50 @@ class ResumeSearchPage(BasePage):
         highlight(cards)
         return cards
 
+    def extract_resume_cards(self) -> List[Dict[str, str]]:
+        """Read id, link, title, age, salary and update date of every card at once."""
+        try:
+            self.wait_for_results()
+        except TimeoutException:
+            logger.info("No resume cards appeared on the page")
+            return []
+
+        fields = {name: getattr(self, attribute)[1] for name, attribute in self.CARD_FIELDS.items()}
+        try:
+            records = self.driver.execute_script(_CARDS_SCRIPT, self.RESUME_CARDS[1], fields)
+        except WebDriverException as error:
+            logger.warning("Batched card extraction failed (%s); reading links one by one", error)
+            return [
+                {
+                    "resume_id": ResumeDetailPage._extract_resume_id(link),
+                    "url": link,
+                    **{name: "" for name in self.CARD_FIELDS},
+                }
+                for link in self.extract_resume_links(self.get_resume_cards())
+            ]
+
+        cards = []
+        for record in records or []:
+            url = str(record.get("url") or "").strip()
+            cards.append(
+                {
+                    "resume_id": self.card_resume_id(str(record.get("resume_id") or ""), url),
+                    "url": url,
+                    **{name: str(record.get(name) or "").strip() for name in self.CARD_FIELDS},
+                }
+            )
+        logger.info("Extracted %s resume cards in one call", len(cards))
+        return cards
+
+    @staticmethod
+    def card_resume_id(data_resume_id: str, url: str) -> str:
+        """Id of a card as the detail page records it, so both modes share one key."""
+        return ResumeDetailPage._extract_resume_id(url) if url else data_resume_id.strip()
+
     def extract_resume_links(self, cards: Optional[Iterable[WebElement]] = None) -> List[str]:
+        if cards is None:
+            return [card["url"] for card in self.extract_resume_cards() if card["url"]]
+
         cards = list(cards or self.get_resume_cards())
         links: List[str] = []
 
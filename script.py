@@ -1,12 +1,15 @@
 import os
 
 from actions.resumes_actions.click_resumes import click_resumes
+from actions.resumes_actions.storage import close_storage
 from configs.config import config
 from helpers.check_bat import is_running_from_batch
+from helpers.log_setup import configure_logging
 
 
 def main() -> None:
     """Entry point for collecting resumes."""
+    configure_logging()
     click_resumes()
 
 
@@ -17,7 +20,5 @@ if __name__ == "__main__":
     try:
         main()
     finally:
-        try:
-            config.driver.quit()
-        except Exception:
-            pass
+        close_storage()
+        config.quit_driver()
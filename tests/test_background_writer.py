@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from actions.resumes_actions.background_writer import BackgroundWriter
+
+
+class FakeStorage:
+    """Records the calls the writer thread makes, in order."""
+
+    backend = "fake"
+
+    def __init__(self, *, fail_on: str = "") -> None:
+        self.calls = []
+        self.fail_on = fail_on
+        self.general = set()
+        self.closed = False
+        self.thread_names = set()
+
+    def general_ids(self, **kwargs):
+        return self.general
+
+    def _add(self, kind, record, known_ids):
+        self.thread_names.add(threading.current_thread().name)
+        if record["resume_id"] == self.fail_on:
+            raise OSError("disk full")
+        self.calls.append((kind, record["resume_id"]))
+        known_ids.add(record["resume_id"])
+        return True
+
+    def add_to_query(self, record, query, known_ids, *, replace=False):
+        return self._add(f"query:{query}", record, known_ids)
+
+    def add_to_general(self, record, known_ids, *, replace=False):
+        return self._add("general", record, known_ids)
+
+    def add_membership(self, query, resume_id):
+        self.calls.append((f"membership:{query}", resume_id))
+
+    def flush(self):
+        self.calls.append(("flush", None))
+
+    def sync(self):
+        self.calls.append(("sync", None))
+
+    def close(self):
+        self.closed = True
+
+
+def _writer(storage, **options):
+    options = {"batch_size": 3, "max_delay": 5.0, "fsync": "batch", **options}
+    return BackgroundWriter(storage, **options)
+
+
+def test_answers_duplicates_before_the_write_lands():
+    storage = FakeStorage()
+    writer = _writer(storage, batch_size=10, max_delay=0.5)
+    known = writer.general_ids()
+    try:
+        assert writer.add_to_general({"resume_id": "a"}, known)
+        assert not writer.add_to_general({"resume_id": "a"}, known)
+        assert not writer.add_to_general({"resume_id": ""}, known)
+        writer.flush()
+        assert not writer.add_to_general({"resume_id": "a"}, known)
+        assert writer.add_to_general({"resume_id": "a"}, known, replace=True)
+    finally:
+        writer.close()
+    assert storage.calls.count(("general", "a")) == 2
+    assert storage.thread_names == {"resume-writer"}
+
+
+def test_group_commit_flushes_once_per_batch():
+    storage = FakeStorage()
+    writer = _writer(storage)
+    known = writer.general_ids()
+    try:
+        for resume_id in ("a", "b", "c"):
+            writer.add_to_general({"resume_id": resume_id}, known)
+        writer.flush()
+    finally:
+        writer.close()
+    assert storage.calls[:5] == [
+        ("general", "a"),
+        ("general", "b"),
+        ("general", "c"),
+        ("flush", None),
+        ("sync", None),
+    ]
+
+
+def test_partial_batch_is_written_after_max_delay():
+    storage = FakeStorage()
+    writer = _writer(storage, batch_size=100, max_delay=0.05)
+    try:
+        writer.add_to_general({"resume_id": "a"}, writer.general_ids())
+        deadline = time.monotonic() + 2
+        while ("flush", None) not in storage.calls and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert storage.calls[:2] == [("general", "a"), ("flush", None)]
+    finally:
+        writer.close()
+
+
+@pytest.mark.parametrize(("fsync", "syncs"), [("always", 3), ("batch", 1), ("never", 0)])
+def test_fsync_policies(fsync, syncs):
+    storage = FakeStorage()
+    writer = _writer(storage, fsync=fsync)
+    known = writer.general_ids()
+    try:
+        for resume_id in ("a", "b", "c"):
+            writer.add_to_general({"resume_id": resume_id}, known)
+        writer.flush()
+        assert storage.calls.count(("sync", None)) == syncs
+    finally:
+        writer.close()
+
+
+def test_unknown_fsync_policy():
+    with pytest.raises(ValueError):
+        BackgroundWriter(FakeStorage(), fsync="sometimes")
+
+
+def test_callbacks_run_after_the_records_before_them_are_synced():
+    storage = FakeStorage()
+    writer = _writer(storage, batch_size=10, max_delay=0.05)
+    known = writer.general_ids()
+    seen = []
+    try:
+        writer.add_to_query({"resume_id": "a"}, "devops", set())
+        writer.add_membership("devops", "a")
+        writer.add_to_general({"resume_id": "a"}, known)
+        writer.after_write(lambda: seen.append(list(storage.calls)))
+        writer.add_to_general({"resume_id": "b"}, known)
+        writer.flush()
+    finally:
+        writer.close()
+    assert seen, "callback did not run"
+    before = seen[0]
+    assert ("query:devops", "a") in before and ("general", "a") in before
+    assert ("membership:devops", "a") in before
+    # The group the callback landed in was flushed and synced first.
+    assert before[-2:] == [("flush", None), ("sync", None)]
+
+
+def test_write_errors_surface_on_flush():
+    storage = FakeStorage(fail_on="bad")
+    writer = _writer(storage, batch_size=1)
+    known = writer.general_ids()
+    writer.add_to_general({"resume_id": "bad"}, known)
+    with pytest.raises(RuntimeError, match="Background writer failed"):
+        writer.flush()
+    # The failed id is no longer pending, so it can be retried.
+    storage.fail_on = ""
+    try:
+        assert writer.add_to_general({"resume_id": "bad"}, known)
+        writer.flush()
+    finally:
+        writer.close()
+    assert ("general", "bad") in storage.calls
+
+
+def test_failed_record_does_not_drop_the_rest_of_its_batch():
+    storage = FakeStorage(fail_on="bad")
+    writer = _writer(storage, batch_size=3, max_delay=0.1)
+    known = writer.general_ids()
+    ran = []
+    for resume_id in ("a", "bad", "c"):
+        writer.add_to_general({"resume_id": resume_id}, known)
+    writer.after_write(lambda: ran.append(True))
+    try:
+        with pytest.raises(RuntimeError, match="Background writer failed"):
+            writer.flush()
+
+        assert ("general", "a") in storage.calls and ("general", "c") in storage.calls
+        assert writer._pending[id(known)] == set()
+        assert "bad" not in known
+        # A checkpoint queued behind a lost record must not be written.
+        assert ran == []
+    finally:
+        writer.close()
+
+
+def test_close_drains_the_queue():
+    storage = FakeStorage()
+    writer = _writer(storage, batch_size=50, max_delay=5.0)
+    known = writer.general_ids()
+    for resume_id in ("a", "b"):
+        writer.add_to_general({"resume_id": resume_id}, known)
+    writer.close()
+    assert ("general", "a") in storage.calls and ("general", "b") in storage.calls
+    assert storage.closed
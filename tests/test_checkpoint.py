@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from actions.resumes_actions import checkpoint as checkpoint_module
+from actions.resumes_actions import click_resumes, result_pages
+from actions.resumes_actions.checkpoint import (
+    QueryCheckpoint,
+    clear_checkpoints,
+    open_checkpoint,
+    store_checkpoint,
+)
+from configs.config import config
+from helpers.pacer import AdaptivePacer
+from pages.resumes.page_state import PAUSE, PageStateError
+
+CARDS = [{"resume_id": "a1", "url": "https://hh.ru/resume/a1"}]
+
+
+class FakeStorage:
+    """Holds ``after_write`` callbacks until ``flush`` says the records are on disk."""
+
+    def __init__(self, counts=None) -> None:
+        self.callbacks = []
+        self.counts = counts or {}
+
+    def after_write(self, callback):
+        self.callbacks.append(callback)
+
+    def flush(self):
+        while self.callbacks:
+            self.callbacks.pop(0)()
+
+    def count(self, query):
+        return self.counts.get(query, 0)
+
+    def query_ids(self, query):
+        return set()
+
+
+@pytest.fixture
+def storage(monkeypatch, tmp_path):
+    fake = FakeStorage()
+    monkeypatch.setattr(checkpoint_module, "get_storage", lambda: fake)
+    monkeypatch.setattr(click_resumes, "get_storage", lambda: fake)
+    monkeypatch.setattr(config, "checkpoint_dir", str(tmp_path / "checkpoints"))
+    return fake
+
+
+def test_state_waits_for_the_records(storage):
+    checkpoint = open_checkpoint("devops")
+    checkpoint.begin_page(2, CARDS, saved=5)
+
+    assert not checkpoint.path.exists()
+
+    storage.flush()
+    reopened = open_checkpoint("devops")
+
+    assert (reopened.page, reopened.pending, reopened.saved, reopened.done) == (2, CARDS, 5, False)
+    assert reopened.next_page == 3
+
+
+def test_write_is_atomic(storage, monkeypatch):
+    checkpoint = open_checkpoint("devops")
+    checkpoint.finish_page(1, saved=3)
+    storage.flush()
+
+    def crash(fd):
+        raise OSError("power cut")
+
+    monkeypatch.setattr(checkpoint_module.os, "fsync", crash)
+    checkpoint.finish_page(2, saved=4)
+    with pytest.raises(OSError):
+        storage.flush()
+
+    assert json.loads(checkpoint.path.read_text(encoding="utf-8"))["page"] == 1
+    assert open_checkpoint("devops").page == 1
+
+
+def test_damaged_or_foreign_file_starts_over(storage):
+    checkpoint = open_checkpoint("devops")
+    checkpoint.path.parent.mkdir(parents=True)
+    checkpoint.path.write_text("{not json", encoding="utf-8")
+
+    assert not open_checkpoint("devops").exists
+
+    checkpoint.path.write_text(json.dumps({"version": 1, "query": "other", "page": 4}), encoding="utf-8")
+
+    assert not open_checkpoint("devops").exists
+
+
+def test_resumes_from_pending_cards(storage, monkeypatch):
+    checkpoint = open_checkpoint("devops")
+    checkpoint.begin_page(2, CARDS, saved=5)
+    storage.flush()
+    requested = []
+
+    def pages(query, start_page):
+        requested.append(start_page)
+        yield from [(page, [{"resume_id": f"p{page}"}]) for page in range(4)]
+
+    monkeypatch.setattr(click_resumes, "iter_result_pages", pages)
+
+    resumed = list(click_resumes._resumed_pages("devops", open_checkpoint("devops")))
+
+    assert resumed == [(2, CARDS), (3, [{"resume_id": "p3"}])]
+    assert requested == [3]
+
+
+def test_clear_keeps_unfinished_queries(storage):
+    open_checkpoint("devops").finish(7)
+    open_checkpoint("python").begin_page(0, CARDS, saved=0)
+    storage.flush()
+
+    assert clear_checkpoints(["devops", "python", "never started"]) is False
+    assert open_checkpoint("devops").done
+
+    open_checkpoint("python").finish(1)
+    storage.flush()
+
+    assert clear_checkpoints(["devops", "python", "never started"]) is True
+    assert not open_checkpoint("devops").path.exists()
+    assert not open_checkpoint("python").path.exists()
+
+
+def test_threshold_skip_finishes_an_interrupted_query(storage, monkeypatch):
+    open_checkpoint("devops").begin_page(3, CARDS, saved=2)
+    storage.flush()
+    storage.counts["devops"] = 10
+    monkeypatch.setattr(config, "existing_record_threshold", 10)
+
+    assert click_resumes._collect_query_pages("devops", set(), None) == 0
+    storage.flush()
+
+    assert open_checkpoint("devops").done
+    assert clear_checkpoints(["devops"]) is True
+
+
+def test_worker_states_go_through_the_parent(storage):
+    published = []
+
+    def publish(record, kind="record"):
+        published.append((kind, dict(record)))
+
+    checkpoint = open_checkpoint("devops", publish)
+    checkpoint.finish_page(0, saved=1)
+    storage.flush()
+
+    assert not checkpoint.path.exists()
+    assert [kind for kind, _ in published] == ["checkpoint"]
+
+    # The parent stores the state behind its own pending writes.
+    store_checkpoint("devops", published[0][1])
+    assert not checkpoint.path.exists()
+    storage.flush()
+
+    assert QueryCheckpoint(config.checkpoint_dir, "devops").saved == 1
+
+
+class BlockedSearchPage:
+    """A SERP that answers every page with the captcha."""
+
+    def __init__(self, driver) -> None:
+        self.current_url = ""
+        self.opened = []
+
+    def open_page(self, search_url, query, page):
+        self.opened.append(page)
+        self.current_url = f"https://hh.ru/account/captcha?page={page}"
+
+    def extract_resume_cards(self):
+        return []
+
+
+def test_blocked_serp_keeps_the_query_unfinished(storage, monkeypatch):
+    open_checkpoint("devops").finish_page(0, saved=4)
+    storage.flush()
+    monkeypatch.setattr(config, "_driver", object())
+    monkeypatch.setattr(config, "pagination", "url")
+    monkeypatch.setattr(config, "serp_prefetch", 0)
+    monkeypatch.setattr(result_pages, "pacer", AdaptivePacer(rate=0, backoff=0))
+    monkeypatch.setattr(result_pages, "ResumeSearchPage", BlockedSearchPage)
+
+    with pytest.raises(PageStateError) as error:
+        click_resumes._collect_query_pages("devops", set(), None)
+    storage.flush()
+
+    assert error.value.state == PAUSE
+    reopened = open_checkpoint("devops")
+    assert (reopened.done, reopened.next_page, reopened.saved) == (False, 1, 4)
+    assert clear_checkpoints(["devops"]) is False
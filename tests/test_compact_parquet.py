@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import pytest
+
+from actions.resumes_actions.compact_parquet import compact, query_files
+from actions.resumes_actions.skill_index import SkillIndex, rebuild
+from actions.resumes_actions.storage import CsvStorage
+from configs.config import _serp_path, config
+
+
+@pytest.fixture
+def output(tmp_path, monkeypatch):
+    """A detail-mode dataset with MODE=serp outputs next to it, as the config names them."""
+    monkeypatch.setattr(config, "normalize", False)
+    general = tmp_path / "resumes.csv"
+
+    detail = CsvStorage(str(general))
+    resume = {"resume_id": "a1", "url": "https://hh.ru/resume/a1", "key_skills": "Python"}
+    detail.add_to_general(resume, set())
+    detail.add_to_query(resume, "devops", set())
+    detail.close()
+
+    serp = CsvStorage(_serp_path(str(general)))
+    card = {"resume_id": "s1", "url": "https://hh.ru/resume/s1", "title": "SRE"}
+    serp.add_to_general(card, set())
+    serp.add_to_query(card, "python", set())
+    serp.close()
+    return general
+
+
+def test_serp_outputs_are_not_queries(output):
+    assert sorted(path.name for path in output.parent.glob("*.csv")) == [
+        "resumes.csv",
+        "resumes_devops.csv",
+        "resumes_serp.csv",
+        "resumes_serp_python.csv",
+    ]
+    assert [slug for slug, _ in query_files(output)] == ["devops"]
+
+
+def test_serp_files_list_their_own_queries(output):
+    serp = output.with_name("resumes_serp.csv")
+
+    assert [slug for slug, _ in query_files(serp)] == ["python"]
+
+
+def test_compact_skips_serp_cards(output, tmp_path):
+    converted = compact(str(output), str(tmp_path / "parquet"))
+
+    assert converted == {"devops": 1}
+    assert sorted(path.name for path in (tmp_path / "parquet").glob("query=*")) == ["query=devops"]
+
+
+def test_skill_index_rebuild_skips_serp_cards(output, tmp_path):
+    index = SkillIndex(tmp_path / "skills.sqlite")
+    try:
+        rebuild(index, str(output))
+        memberships = index.connection.execute("SELECT query, resume_id FROM memberships").fetchall()
+    finally:
+        index.close()
+
+    assert memberships == [("devops", "a1")]
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import pytest
+
+from configs.config import Config
+
+
+@pytest.fixture
+def fresh_config(monkeypatch):
+    """Build a new ``Config`` from the patched environment, then restore the old one."""
+    previous = Config._instance
+
+    def build(**env: str) -> Config:
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        Config._instance = None
+        return Config()
+
+    yield build
+    Config._instance = previous
+
+
+def test_detail_mode_paths(fresh_config, monkeypatch):
+    for name in ("SERP_OUTPUT_PATH", "SQLITE_PATH", "CHECKPOINT_DIR"):
+        monkeypatch.delenv(name, raising=False)
+
+    config = fresh_config(MODE="detail", OUTPUT_PATH="data/resumes.csv")
+
+    assert config.output_path == "data/resumes.csv"
+    assert config.sqlite_path == "data/resumes.sqlite"
+    assert config.checkpoint_dir.replace("\\", "/") == "data/checkpoints"
+
+
+def test_serp_mode_writes_apart(fresh_config, monkeypatch):
+    for name in ("SERP_OUTPUT_PATH", "SQLITE_PATH", "CHECKPOINT_DIR"):
+        monkeypatch.delenv(name, raising=False)
+
+    config = fresh_config(MODE="serp", OUTPUT_PATH="data/resumes.csv")
+
+    assert config.output_path == "data/resumes_serp.csv"
+    assert config.sqlite_path == "data/resumes_serp.sqlite"
+    assert config.checkpoint_dir.replace("\\", "/") == "data/checkpoints_serp"
+
+
+def test_serp_mode_explicit_paths(fresh_config):
+    config = fresh_config(
+        MODE="serp", SERP_OUTPUT_PATH="out/cards.csv", SQLITE_PATH="out/all.sqlite"
+    )
+
+    assert config.output_path == "out/cards.csv"
+    assert config.sqlite_path == "out/all_serp.sqlite"
+
+
+@pytest.mark.parametrize(
+    ("variable", "attribute"),
+    [
+        ("BACKGROUND_WRITER", "background_writer"),
+        ("INCREMENTAL", "incremental"),
+        ("NORMALIZE", "normalize"),
+        ("SKILL_INDEX", "skill_index"),
+        ("NEAR_DUPLICATES", "near_duplicates"),
+    ],
+)
+def test_optional_features_are_off_by_default(fresh_config, monkeypatch, variable, attribute):
+    monkeypatch.delenv(variable, raising=False)
+
+    assert getattr(fresh_config(), attribute) is False
+    assert getattr(fresh_config(**{variable: "1"}), attribute) is True
+
+
+def test_resume_parser_is_element_by_default(fresh_config, monkeypatch):
+    monkeypatch.delenv("RESUME_PARSER", raising=False)
+
+    assert fresh_config().resume_parser == "element"
+    assert fresh_config(RESUME_PARSER=" Script ").resume_parser == "script"
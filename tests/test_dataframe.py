@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import csv
+
+import pandas as pd
+import pytest
+
+from actions.resumes_actions.dataframe import (
+    CsvSink,
+    count_records,
+    iter_records,
+    load_existing_ids,
+    read_columns,
+    read_dataframe,
+    schema_path,
+)
+
+
+def _write(path, *records):
+    sink = CsvSink(path)
+    try:
+        for record in records:
+            sink.write(record)
+    finally:
+        sink.close()
+
+
+def test_new_columns_go_to_the_sidecar(tmp_path):
+    path = tmp_path / "resumes.csv"
+    _write(path, {"resume_id": "a", "salary": "100"})
+    _write(path, {"resume_id": "b", "salary": "200", "age": "30", "skills": ["Go", "SQL"]})
+
+    with path.open(encoding="utf-8", newline="") as handle:
+        rows = list(csv.reader(handle))
+    # The header is never rewritten: the widened schema lives next to the file.
+    assert rows[0] == ["resume_id", "salary"]
+    assert rows[2] == ["b", "200", "30", '["Go", "SQL"]']
+    assert schema_path(path).exists()
+    assert read_columns(path) == ["resume_id", "salary", "age", "skills"]
+
+
+def test_readers_apply_the_sidecar(tmp_path):
+    path = tmp_path / "resumes.csv"
+    _write(
+        path,
+        {"resume_id": "a", "salary": "100"},
+        {"resume_id": "b", "salary": "200", "age": "30"},
+        {"resume_id": "a", "salary": "150", "age": "41"},
+    )
+
+    assert list(iter_records(path)) == [
+        {"resume_id": "b", "salary": "200", "age": "30"},
+        {"resume_id": "a", "salary": "150", "age": "41"},
+    ]
+    dataframe = read_dataframe(path)
+    assert list(dataframe.columns) == ["resume_id", "salary", "age"]
+    assert dataframe.set_index("resume_id")["age"].to_dict() == {"b": 30, "a": 41}
+    assert count_records(str(path)) == 2
+
+
+def test_read_dataframe_of_missing_file(tmp_path):
+    assert read_dataframe(tmp_path / "missing.csv").empty
+    assert count_records(str(tmp_path / "missing.csv")) == 0
+    assert isinstance(read_dataframe(tmp_path / "missing.csv"), pd.DataFrame)
+
+
+def test_widened_schema_loses_no_rows(tmp_path):
+    path = tmp_path / "resumes.csv"
+    _write(path, *({"resume_id": f"r{number}", "salary": "100"} for number in range(3)))
+    _write(path, *({"resume_id": f"w{number}", "salary": "200", "age": "30"} for number in range(3)))
+
+    dataframe = read_dataframe(path)
+    assert dataframe["resume_id"].tolist() == ["r0", "r1", "r2", "w0", "w1", "w2"]
+    assert dataframe["age"].isna().sum() == 3
+    assert load_existing_ids(str(path)) == {"r0", "r1", "r2", "w0", "w1", "w2"}
+
+
+@pytest.mark.parametrize("rows", ["a\nb,41\n", "a,30\nb,41\n"])
+def test_rows_wider_than_the_header_are_kept(tmp_path, rows):
+    # A sidecar that was lost: whether the first row is short or not, pandas
+    # would drop or shift the wider ones.
+    path = tmp_path / "resumes.csv"
+    path.write_text(f"resume_id\n{rows}", encoding="utf-8")
+
+    dataframe = read_dataframe(path)
+
+    assert list(dataframe.columns) == ["resume_id", "column_1"]
+    assert dataframe["resume_id"].tolist() == ["a", "b"]
+    assert dataframe["column_1"].tolist()[-1] == 41
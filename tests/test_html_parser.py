@@ -0,0 +1,156 @@
+"""Regression tests for the offline parser against saved resume and SERP pages.
+
+``RAW_*`` hold the values ``ResumeDetailPage.collect()`` reads from the same
+pages through WebDriver (``WebElement.text`` of every locator), so the parsed
+records are compared with what the browser path stores.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from pages.resumes.detail_page import ResumeDetailPage
+from pages.resumes.html_parser import (
+    node_text,
+    parse_resume_html,
+    parse_resume_pages,
+    parse_search_cards_html,
+    parse_search_html,
+)
+
+FIXTURES = Path(__file__).parent / "fixtures"
+RESUME_URL = "https://hh.ru/resume/0a1b2c3d4e?query=devops"
+SERP_URL = "https://hh.ru/search/resume?text=devops"
+
+RAW_FULL = {
+    "full_name": "Иванова Анна Сергеевна",
+    "desired_position": "DevOps-инженер",
+    "salary": "250 000 ₽ на руки",
+    "age": "32 года",
+    "gender": "Женщина",
+    "location": "Тюмень",
+    "work_experience": "Опыт работы 7 лет 4 месяца\nООО «Ромашка»\nПоддержка Kubernetes-кластеров",
+    "education": "Высшее образование\nТюмГУ, 2014",
+    "languages": ["Русский — Родной", "Английский — B2 — Средне-продвинутый"],
+    "self_description": "Люблю автоматизацию.\nПишу на Python.",
+    "key_skills": ["Docker", "Kubernetes", "Docker"],
+    "skill_keywords": ["Ansible", "Terraform"],
+    "citizenship": ["Россия", "Казахстан"],
+    "ready_to_relocate": "Не готова к переезду, готова к командировкам",
+    "travel_time": "не имеет значения",
+    "driver_license": ["Права категории B"],
+    "personal_details": [
+        ("resume-personal-name", "Иванова Анна Сергеевна"),
+        ("resume-personal-gender", "Женщина"),
+        ("resume-personal-age", "32 года"),
+        ("resume-personal-address", "Тюмень"),
+        ("resume-personal-metro", "не имеет значения"),
+        ("resume-personal-relocation", "Не готова к переезду, готова к командировкам"),
+        ("resume-personal-citizenship", "Россия"),
+        ("resume-personal-citizenship", "Казахстан"),
+    ],
+    "updated_at": "Резюме обновлено 5 марта 2025 в 14:20",
+}
+
+RAW_SPARSE = {
+    "full_name": "Петров Иван",
+    "desired_position": "Frontend-разработчик",
+    "work_experience": "Опыт работы 1 год",
+    "updated_at": "Резюме обновлено 1 января 2025 в 09:00",
+    **{
+        name: [] if kind != "text" else ""
+        for name, (_, kind) in ResumeDetailPage.RAW_FIELDS.items()
+        if name not in {"full_name", "desired_position", "work_experience", "updated_at"}
+    },
+}
+
+
+def _fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+@pytest.mark.parametrize(
+    ("fixture", "raw"),
+    [("resume_full.html", RAW_FULL), ("resume_sparse.html", RAW_SPARSE)],
+)
+def test_resume_matches_collect(fixture, raw):
+    expected = ResumeDetailPage.build_record(RESUME_URL, raw)
+
+    assert parse_resume_html(_fixture(fixture), RESUME_URL) == expected
+
+
+def test_build_record_fields():
+    record = ResumeDetailPage.build_record(RESUME_URL, RAW_FULL)
+
+    assert record["resume_id"] == "0a1b2c3d4e"
+    assert record["key_skills"] == "Docker; Kubernetes"
+    assert json.loads(record["key_skills_raw"]) == ["Docker", "Kubernetes"]
+    assert record["languages"] == "Русский (Родной); Английский (B2 — Средне-продвинутый)"
+    assert json.loads(record["languages_detailed"])[1] == {
+        "name": "Английский",
+        "level": "B2 — Средне-продвинутый",
+    }
+    assert record["skill_keywords"] == "Ansible, Terraform"
+    assert record["citizenship"] == "Россия, Казахстан"
+    # Repeated data-qa keys keep the last value, as they always have.
+    assert json.loads(record["personal_details"])["resume-personal-citizenship"] == "Казахстан"
+
+
+def test_script_result_matches_collect():
+    # ``collect_script`` gets innerText with stray whitespace and empty nodes.
+    script_raw = {
+        **RAW_FULL,
+        "full_name": "  Иванова Анна Сергеевна\n",
+        "key_skills": ["Docker", " Kubernetes ", "", "Docker"],
+        "personal_details": [[data_qa, f" {text} "] for data_qa, text in RAW_FULL["personal_details"]],
+    }
+    cleaned = ResumeDetailPage._clean_raw(script_raw)
+
+    assert ResumeDetailPage.build_record(RESUME_URL, cleaned) == ResumeDetailPage.build_record(
+        RESUME_URL, RAW_FULL
+    )
+
+
+def test_parse_resume_pages():
+    pages = [(_fixture("resume_full.html"), RESUME_URL), (_fixture("resume_sparse.html"), RESUME_URL)]
+
+    records = parse_resume_pages(pages)
+
+    assert [record["full_name"] for record in records] == ["Иванова Анна Сергеевна", "Петров Иван"]
+
+
+def test_search_cards():
+    cards = parse_search_cards_html(_fixture("serp.html"), SERP_URL)
+
+    assert cards == [
+        {
+            "resume_id": "0a1b2c3d4e",
+            "url": "https://hh.ru/resume/0a1b2c3d4e?query=devops&hhtmFrom=resume_search_result",
+            "title": "DevOps-инженер",
+            "age": "32 года",
+            "salary": "250 000 ₽",
+            "updated_at": "Обновлено 5 марта 2025 в 14:20",
+        },
+        {
+            "resume_id": "ffee99",
+            "url": "https://hh.ru/resume/ffee99",
+            "title": "SRE",
+            "age": "",
+            "salary": "",
+            "updated_at": "",
+        },
+    ]
+    assert parse_search_html(_fixture("serp.html"), SERP_URL) == [card["url"] for card in cards]
+
+
+def test_node_text_skips_hidden_and_breaks_blocks():
+    from lxml import html as lxml_html
+
+    node = lxml_html.fromstring(
+        "<div>Первая\n строка<p>Вторая</p><span hidden>нет</span>"
+        "<span style='visibility: hidden'>нет</span>третья</div>"
+    )
+
+    assert node_text(node) == "Первая строка\nВторая\nтретья"
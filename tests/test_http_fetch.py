@@ -0,0 +1,83 @@
+"""The HTTP backend against the local stand-in site of the benchmarks."""
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from actions.resumes_actions import http_fetch
+from actions.resumes_actions.http_fetch import HttpFetchBlocked, HttpResumeFetcher
+from benchmarks.fixture_server import FixtureServer, SyntheticSite
+from helpers.browser_session import BrowserSession
+from helpers.pacer import AdaptivePacer
+from pages.resumes.html_parser import parse_resume_html
+from pages.resumes.page_state import SKIP, PageStateError
+
+FIXTURES = Path(__file__).parent / "fixtures"
+SESSION = BrowserSession(
+    user_agent="pytest", cookies=({"name": "hhtoken", "value": "token", "domain": "127.0.0.1"},)
+)
+
+
+@pytest.fixture(autouse=True)
+def unpaced(monkeypatch):
+    monkeypatch.setattr(http_fetch, "http_pacer", AdaptivePacer(rate=0))
+
+
+@pytest.fixture
+def fetcher():
+    fetcher = HttpResumeFetcher(SESSION, concurrency=4, timeout=5)
+    yield fetcher
+    fetcher.close()
+
+
+def _results(fetcher, links):
+    return {link: (record, error) for link, record, error in fetcher.fetch(links)}
+
+
+def test_fetches_and_parses_like_the_offline_parser(fetcher):
+    site = SyntheticSite(pages=1, per_page=6)
+    ids = [site.resume_id(0, position) for position in range(6)]
+    with FixtureServer(pages=1, per_page=6) as server:
+        links = [f"{server.base_url}/resume/{resume_id}" for resume_id in ids]
+        results = _results(fetcher, links)
+        assert server.requests == len(links)
+
+    assert set(results) == set(links)
+    for link, resume_id in zip(links, ids):
+        record, error = results[link]
+        assert error is None
+        assert record == parse_resume_html(site.resume(resume_id), link)
+        assert record["resume_id"] == resume_id
+        assert record["full_name"]
+
+
+def test_classifies_missing_and_blocked_pages(fetcher, tmp_path, monkeypatch):
+    (tmp_path / "resume").mkdir()
+    shutil.copy(FIXTURES / "resume_full.html", tmp_path / "resume" / "ok.html")
+    (tmp_path / "resume" / "captcha.html").write_text(
+        '<html><body><img data-qa="captcha-image"></body></html>', encoding="utf-8"
+    )
+    (tmp_path / "resume" / "login.html").write_text(
+        '<html><body><form data-qa="account-login-form"></form></body></html>', encoding="utf-8"
+    )
+    pacer = AdaptivePacer(rate=1, max_rate=1, burst=4, backoff=0)
+    monkeypatch.setattr(http_fetch, "http_pacer", pacer)
+
+    with FixtureServer(fixtures=str(tmp_path)) as server:
+        url = f"{server.base_url}/resume/"
+        results = _results(fetcher, [f"{url}ok", f"{url}gone", f"{url}captcha", f"{url}login"])
+
+    record, error = results[f"{url}ok"]
+    assert error is None and record["full_name"] == "Иванова Анна Сергеевна"
+
+    record, error = results[f"{url}gone"]
+    assert record is None
+    assert isinstance(error, PageStateError) and error.state == SKIP
+
+    for name in ("captcha", "login"):
+        record, error = results[f"{url}{name}"]
+        assert record is None and isinstance(error, HttpFetchBlocked)
+    # The captcha and the login wall each halve the rate.
+    assert pacer.rate == pytest.approx(0.25)
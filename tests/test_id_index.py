@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import pytest
+
+from actions.resumes_actions import id_index
+from actions.resumes_actions.dataframe import CsvSink
+from actions.resumes_actions.id_index import KnownIdIndex
+from helpers.ru_dates import updated_stamp
+
+MARCH = "Резюме обновлено 5 марта 2025 в 14:20"
+APRIL = "Резюме обновлено 1 апреля 2025 в 10:00"
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    return tmp_path / "resumes.csv"
+
+
+def _append(index: KnownIdIndex, resume_id: str, updated_at: str = "") -> None:
+    """Write a row the way ``CsvStorage`` does: the CSV first, then the index."""
+    sink = CsvSink(index.csv_path)
+    try:
+        sink.write({"resume_id": resume_id, "updated_at": updated_at})
+    finally:
+        sink.close()
+    index.record_row(resume_id, updated_at)
+
+
+def test_rows_and_refreshes_survive_reopen(csv_path):
+    index = KnownIdIndex(csv_path)
+    _append(index, "b", MARCH)
+    _append(index, "a")
+    _append(index, "b", APRIL)
+    _append(index, "")
+
+    assert len(index) == 2 and index.rows == 4
+    assert index.updated("b") == updated_stamp(APRIL)
+    index.close()
+
+    reopened = KnownIdIndex(csv_path)
+    try:
+        assert sorted(reopened) == ["a", "b"]
+        assert reopened.rows == 4
+        assert reopened.updated("b") == updated_stamp(APRIL)
+        assert reopened.updated("a") is None
+        assert "c" not in reopened
+    finally:
+        reopened.close()
+
+
+def test_tail_is_replayed_without_compaction(csv_path):
+    index = KnownIdIndex(csv_path)
+    _append(index, "a", MARCH)
+    generation = index.generation
+    # Simulate a crash: the tail is on disk, the base was never rewritten.
+    index._close_files()
+
+    reopened = KnownIdIndex(csv_path)
+    try:
+        assert reopened.generation == generation
+        assert "a" in reopened and len(reopened) == 1
+        assert reopened.updated("a") == updated_stamp(MARCH)
+    finally:
+        reopened.close()
+
+
+def test_tail_compacts_at_the_limit(csv_path, monkeypatch):
+    monkeypatch.setattr(id_index, "_TAIL_LIMIT", 3)
+    index = KnownIdIndex(csv_path)
+    try:
+        for resume_id in ("c", "a"):
+            _append(index, resume_id)
+        generation = index.generation
+        assert index.base_count == 0
+
+        _append(index, "b")
+        assert index.generation == generation + 1
+        assert index.base_count == 3 and index._tail == {}
+        assert list(index) == ["a", "b", "c"]
+        # Ids of different length widen the fixed-width records.
+        _append(index, "longer-id")
+        index.compact()
+        assert index.width == len("longer-id")
+        assert all(resume_id in index for resume_id in ("a", "b", "c", "longer-id"))
+    finally:
+        index.close()
+
+
+def test_discard_writes_a_tombstone(csv_path):
+    index = KnownIdIndex(csv_path)
+    for resume_id in ("a", "b"):
+        _append(index, resume_id)
+    index.compact()
+    _append(index, "c")
+
+    index.discard("a")
+    index.discard("c")
+    index.discard("missing")
+    assert sorted(index) == ["b"] and len(index) == 1
+    assert index.updated("a") is None
+    index._close_files()
+
+    # The tombstones are replayed from the tail ...
+    reopened = KnownIdIndex(csv_path)
+    assert sorted(reopened) == ["b"] and len(reopened) == 1
+    # ... and the ids are left out of the base on the next merge.
+    reopened.close()
+    compacted = KnownIdIndex(csv_path)
+    try:
+        assert compacted.base_count == 1 and sorted(compacted) == ["b"]
+        # A discarded id can come back with a new row.
+        _append(compacted, "a")
+        assert "a" in compacted and len(compacted) == 2
+    finally:
+        compacted.close()
+
+
+def test_rebuilds_when_the_csv_changed_behind_it(csv_path):
+    index = KnownIdIndex(csv_path)
+    _append(index, "a")
+    index.close()
+
+    # Another writer appended without updating the index.
+    sink = CsvSink(csv_path)
+    sink.write({"resume_id": "z", "updated_at": MARCH})
+    sink.close()
+
+    rebuilt = KnownIdIndex(csv_path)
+    try:
+        assert sorted(rebuilt) == ["a", "z"]
+        assert rebuilt.rows == 2
+        assert rebuilt.updated("z") == updated_stamp(MARCH)
+    finally:
+        rebuilt.close()
+
+
+def test_read_only_never_touches_the_sidecars(csv_path):
+    sink = CsvSink(csv_path)
+    sink.write({"resume_id": "a"})
+    sink.close()
+
+    index = KnownIdIndex(csv_path, read_only=True)
+    try:
+        assert "a" in index
+        index.add("b")
+        assert "b" in index
+    finally:
+        index.close()
+    assert not index.index_path.exists() and not index.tail_path.exists()
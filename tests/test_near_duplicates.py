@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import pytest
+
+from actions.resumes_actions.near_duplicates import (
+    NUM_PERM,
+    NearDuplicateIndex,
+    backfill,
+    band_buckets,
+    open_near_duplicates,
+    shingles,
+    signature_of,
+    similarity,
+)
+from actions.resumes_actions.storage import CsvStorage
+from configs.config import config
+
+EXPERIENCE = (
+    "Опыт работы 7 лет 4 месяца. ООО Ромашка, инженер по эксплуатации. "
+    "Поддерживала кластеры Kubernetes, настраивала мониторинг Prometheus и Grafana, "
+    "писала пайплайны сборки в GitLab и автоматизировала выкладку сервисов через Ansible."
+)
+ABOUT = "Люблю автоматизацию, пишу на Python и Go, быстро разбираюсь в чужом коде."
+OTHER = (
+    "Опыт работы 2 года. Магазин электроники, продавец-консультант. Консультировала "
+    "покупателей, принимала товар, вела кассу и выкладку витрин, обучала новых сотрудников."
+)
+
+
+def _resume(resume_id, work_experience, self_description=""):
+    return {
+        "resume_id": resume_id,
+        "url": f"https://hh.ru/resume/{resume_id}",
+        "full_name": f"Соискатель {resume_id}",
+        "work_experience": work_experience,
+        "self_description": self_description,
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = NearDuplicateIndex(tmp_path / "near.sqlite", threshold=0.8)
+    yield index
+    index.close()
+
+
+def test_signature_ignores_numbers_and_case():
+    original = signature_of(_resume("a", EXPERIENCE, ABOUT))
+    updated = signature_of(_resume("b", EXPERIENCE.upper().replace("7 лет 4", "8 лет 1"), ABOUT))
+
+    assert original.shape == (NUM_PERM,)
+    assert similarity(original, updated) == 1.0
+    assert band_buckets(original) == band_buckets(updated)
+    assert similarity(original, signature_of(_resume("c", OTHER))) < 0.2
+
+
+def test_short_text_has_no_signature():
+    record = _resume("a", "Опыт работы 1 год", "Python")
+
+    assert len(shingles(record)) < 8
+    assert signature_of(record) is None
+
+
+def test_copies_form_one_cluster(index):
+    assert index.add_resume(_resume("b2", EXPERIENCE, ABOUT)) == []
+    assert index.add_resume(_resume("z9", OTHER)) == []
+
+    matches = index.add_resume(_resume("a1", EXPERIENCE.replace("7 лет 4", "8 лет"), ABOUT))
+    index.flush()
+
+    assert [other_id for other_id, _ in matches] == ["b2"]
+    assert index.similar("b2") == [("a1", 1.0)]
+    assert index.clusters() == [
+        {
+            "cluster": "a1",
+            "size": 2,
+            "resumes": [
+                {"resume_id": "a1", "url": "https://hh.ru/resume/a1", "title": "Соискатель a1"},
+                {"resume_id": "b2", "url": "https://hh.ru/resume/b2", "title": "Соискатель b2"},
+            ],
+        }
+    ]
+    assert index.stats() == {"resumes": 3, "pairs": 1, "clusters": 1}
+
+
+def test_updated_resume_keeps_its_cluster(index):
+    index.add_resume(_resume("a1", EXPERIENCE, ABOUT))
+    index.add_resume(_resume("b2", EXPERIENCE, ABOUT))
+    index.add_resume(_resume("c3", EXPERIENCE, ABOUT))
+
+    # b2 is rewritten: it matches nothing now, but stays in the cluster it was merged into.
+    assert index.add_resume(_resume("b2", OTHER)) == []
+    index.flush()
+
+    assert {cluster["cluster"]: cluster["size"] for cluster in index.clusters()} == {"a1": 3}
+    assert index.similar("a1") == [("c3", 1.0)]
+
+
+def test_backfill_from_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "normalize", False)
+    output = tmp_path / "resumes.csv"
+    storage = CsvStorage(str(output))
+    for resume_id in ("a1", "b2"):
+        storage.add_to_general(_resume(resume_id, EXPERIENCE, ABOUT), set())
+    storage.close()
+
+    index = NearDuplicateIndex(tmp_path / "near.sqlite")
+    try:
+        assert backfill(index, str(output)) == 2
+        assert index.similar("a1") == [("b2", 1.0)]
+        assert backfill(index, str(tmp_path / "missing.csv")) == 0
+    finally:
+        index.close()
+
+
+def test_opened_only_when_enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "near_duplicates_path", str(tmp_path / "near.sqlite"))
+    monkeypatch.setattr(config, "near_duplicates", False)
+
+    assert open_near_duplicates() is None
+
+    monkeypatch.setattr(config, "near_duplicates", True)
+    index = open_near_duplicates()
+    try:
+        assert isinstance(index, NearDuplicateIndex)
+    finally:
+        index.close()
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from actions.resumes_actions import storage as storage_module
+from actions.resumes_actions.background_writer import BackgroundWriter
+from actions.resumes_actions.dataframe import read_dataframe
+from actions.resumes_actions.storage import CsvStorage
+from configs.config import config
+from helpers.normalize import (
+    NORMALIZED_COLUMNS,
+    experience_months,
+    normalize_record,
+    parse_age,
+    parse_salary,
+    updated_at_iso,
+)
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ("250 000 ₽ на руки", (250000, "RUB", "month")),
+        ("1 500 бел. руб.", (1500, "BYN", "month")),
+        ("3000 $", (3000, "USD", "month")),
+        ("800 € в час", (800, "EUR", "hour")),
+        ("120 000", (120000, "RUB", "month")),
+        ("з/п не указана", (None, "", "")),
+        ("", (None, "", "")),
+    ],
+)
+def test_parse_salary(text, expected):
+    assert parse_salary(text) == expected
+
+
+def test_parse_age():
+    assert parse_age("32 года") == 32
+    assert parse_age("41 год") == 41
+    assert parse_age("") is None
+
+
+def test_experience_reads_only_the_header():
+    text = "Опыт работы 7 лет 4 месяца\nООО «Ромашка»\nОпыт работы 2 года"
+
+    assert experience_months(text) == 7 * 12 + 4
+    assert experience_months("Опыт работы 1 год") == 12
+    assert experience_months("Опыт работы 11 месяцев") == 11
+    assert experience_months("Без опыта") is None
+
+
+def test_updated_at_iso():
+    assert updated_at_iso("Резюме обновлено 5 марта 2025 в 14:20") == "2025-03-05T14:20:00"
+    assert updated_at_iso("обновлено недавно") == ""
+    assert updated_at_iso("") == ""
+
+
+def test_normalize_record_adds_columns_once():
+    record = {
+        "resume_id": "a1",
+        "salary": "250 000 ₽ на руки",
+        "age": "32 года",
+        "work_experience": "Опыт работы 7 лет 4 месяца",
+        "updated_at": "Резюме обновлено 5 марта 2025 в 14:20",
+    }
+
+    normalized = normalize_record(record)
+
+    assert "salary_amount" not in record
+    assert {column: normalized[column] for column in NORMALIZED_COLUMNS} == {
+        "salary_amount": 250000,
+        "salary_currency": "RUB",
+        "salary_period": "month",
+        "age_years": 32,
+        "experience_months": 88,
+        "updated_at_iso": "2025-03-05T14:20:00",
+    }
+    # A record normalized by a worker keeps its values.
+    assert normalize_record({**normalized, "salary": "1 $"}) == {**normalized, "salary": "1 $"}
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_storage_normalizes_only_when_enabled(tmp_path, monkeypatch, enabled):
+    monkeypatch.setattr(config, "normalize", enabled)
+    path = tmp_path / "resumes.csv"
+    storage = CsvStorage(str(path))
+
+    storage.add_to_general({"resume_id": "a1", "salary": "100 000 ₽"}, set())
+    storage.close()
+
+    assert ("salary_amount" in read_dataframe(path).columns) is enabled
+
+
+def test_normalization_runs_off_the_crawl_thread(tmp_path, monkeypatch):
+    for name, value in {
+        "output_backend": "csv",
+        "output_path": str(tmp_path / "resumes.csv"),
+        "normalize": True,
+        "background_writer": False,
+        "skill_index": False,
+        "near_duplicates": False,
+    }.items():
+        monkeypatch.setattr(config, name, value)
+    monkeypatch.setattr(storage_module, "_storage", None)
+    threads = []
+
+    def recording(record):
+        threads.append(threading.current_thread())
+        return normalize_record(record)
+
+    monkeypatch.setattr(storage_module, "normalize_record", recording)
+
+    storage = storage_module.get_storage()
+    try:
+        assert isinstance(storage, BackgroundWriter)
+        storage.add_to_general({"resume_id": "a1", "salary": "100 000 ₽"}, storage.general_ids())
+        storage.flush()
+    finally:
+        storage_module.close_storage()
+
+    assert threads and threading.current_thread() not in threads
+    assert read_dataframe(tmp_path / "resumes.csv")["salary_amount"].tolist() == [100000]
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import multiprocessing
+
+import pytest
+
+from helpers import pacer as pacer_module
+from helpers.pacer import AdaptivePacer
+
+
+class FakeTime:
+    """Stands in for the ``time`` module: the clock moves only when told to."""
+
+    def __init__(self) -> None:
+        self.now = 100.0
+        self.slept = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeTime()
+    monkeypatch.setattr(pacer_module, "time", fake)
+    # The pause is the upper bound, so the tests can check it exactly.
+    monkeypatch.setattr(pacer_module.random, "uniform", lambda low, high: high)
+    return fake
+
+
+def _pacer(**options) -> AdaptivePacer:
+    options = {"rate": 1.0, "min_rate": 0.1, "max_rate": 2.0, "burst": 2, "step": 0.5, **options}
+    return AdaptivePacer(increase_every=3, backoff=10, max_backoff=25, **options)
+
+
+def test_burst_then_steady_rate(clock):
+    pacer = _pacer()
+
+    assert [pacer.reserve() for _ in range(4)] == [0.0, 0.0, 1.0, 2.0]
+
+    clock.now += 10
+    assert pacer.ready_in() == 0.0
+    assert pacer.acquire() == 0.0
+
+
+def test_additive_increase_up_to_max_rate(clock):
+    pacer = _pacer()
+
+    for _ in range(2):
+        pacer.success()
+    assert pacer.rate == 1.0
+
+    pacer.success()
+    assert pacer.rate == 1.5
+
+    for _ in range(6):
+        pacer.success()
+    assert pacer.rate == 2.0
+
+
+def test_timeout_cuts_rate_without_pause(clock):
+    pacer = _pacer()
+
+    assert pacer.penalize("timeout") == 0.0
+    assert pacer.rate == pytest.approx(0.75)
+    assert pacer.paused_for == 0.0
+
+
+def test_throttle_halves_rate_and_backs_off(clock):
+    pacer = _pacer()
+
+    assert pacer.penalize("throttle") == 10
+    assert pacer.rate == 0.5
+    assert pacer.paused_for == 10
+    assert pacer.penalize("captcha") == 20
+    assert pacer.penalize("captcha") == 25
+    assert pacer.rate == 0.125
+    assert pacer.penalize("captcha") == 25
+    assert pacer.rate == 0.1
+
+    # A healthy streak forgives the strikes.
+    for _ in range(3):
+        pacer.success()
+    assert pacer.penalize("throttle") == 10
+
+
+def test_pause_holds_queued_requests(clock):
+    pacer = _pacer()
+    pacer.penalize("captcha")
+
+    assert pacer.reserve() == 10
+    assert pacer.acquire() == 10
+    assert clock.slept == [10]
+
+
+def test_zero_rate_only_pauses(clock):
+    pacer = AdaptivePacer(rate=0, backoff=10)
+
+    assert [pacer.reserve() for _ in range(5)] == [0.0] * 5
+    pacer.penalize("captcha")
+    assert pacer.rate == 0.0
+    assert pacer.reserve() == 10
+
+
+def test_observe_signals(clock):
+    pacer = _pacer()
+
+    assert pacer.observe_url("https://hh.ru/resume/1") is None
+    assert pacer.observe_url("https://hh.ru/resume/1", timed_out=True) == "timeout"
+    assert pacer.observe_url("https://hh.ru/account/login?backurl=/") == "throttle"
+    assert pacer.observe_url("https://hh.ru/account/captcha") == "captcha"
+    assert pacer.observe_status(429) == "throttle"
+    assert pacer.observe_status(200, "https://hh.ru/resume/1") is None
+
+
+def _penalize_in_child(state) -> None:
+    child = AdaptivePacer(rate=1.0, backoff=10)
+    child.attach(state)
+    child.penalize("captcha")
+
+
+def test_shared_state_spans_processes():
+    context = multiprocessing.get_context("spawn")
+    pacer = AdaptivePacer(rate=1.0, min_rate=0.1, backoff=10)
+    state = pacer.share(context)
+
+    process = context.Process(target=_penalize_in_child, args=(state,))
+    process.start()
+    process.join(timeout=60)
+
+    assert process.exitcode == 0
+    assert pacer.rate == 0.5
+    assert pacer._strikes == 1
+    assert pacer._tokens <= 0.0
+
+
+def test_http_settings_are_separate(monkeypatch):
+    monkeypatch.setenv("PACER_RATE", "0.5")
+    monkeypatch.delenv("HTTP_PACER_RATE", raising=False)
+    monkeypatch.setenv("HTTP_PACER_BURST", "5")
+
+    http = pacer_module._build_pacer("HTTP_PACER_", rate="4", max_rate="16", burst="8")
+
+    assert (http.rate, http.max_rate, http.burst) == (4.0, 16.0, 5.0)
+    assert pacer_module._build_pacer().rate == 0.5
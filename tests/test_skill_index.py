@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from actions.resumes_actions.skill_index import (
+    SkillIndex,
+    normalize_skill,
+    open_skill_index,
+    rebuild,
+    record_skills,
+    skill_tokens,
+)
+from actions.resumes_actions.storage import CsvStorage
+from configs.config import config
+
+
+def _resume(resume_id, skills, **fields):
+    return {
+        "resume_id": resume_id,
+        "url": f"https://hh.ru/resume/{resume_id}",
+        "key_skills_raw": json.dumps(skills, ensure_ascii=False),
+        **fields,
+    }
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SkillIndex(tmp_path / "skills.sqlite", batch_size=2)
+    index.add_resume(
+        _resume(
+            "a1",
+            ["Python 3", "Docker", "K8s"],
+            salary="250 000 ₽",
+            location="Тюмень",
+            work_experience="Опыт работы 5 лет",
+            updated_at="Резюме обновлено 5 марта 2025 в 14:20",
+        )
+    )
+    index.add_resume(
+        _resume(
+            "b2",
+            ["Python", "Kafka"],
+            salary="150 000 ₽",
+            location="Москва",
+            work_experience="Опыт работы 1 год",
+            updated_at="Резюме обновлено 1 января 2025 в 09:00",
+        )
+    )
+    index.add_resume(_resume("c3", ["React.js"], skill_keywords="JS, Ёлка"))
+    index.add_membership("DevOps инженер", "a1")
+    index.flush()
+    yield index
+    index.close()
+
+
+def _ids(rows):
+    return [row["resume_id"] for row in rows]
+
+
+def test_normalize_skill():
+    assert normalize_skill("  «Ёмкость  Данных» ") == "емкость данных"
+    assert normalize_skill("K8s") == "kubernetes"
+    assert skill_tokens("Python 3") == ("python", "python 3")
+    assert skill_tokens("") == ()
+
+
+def test_record_skills_prefers_raw_list():
+    record = {"key_skills_raw": '["A", "B"]', "key_skills": "C", "skill_keywords": "D, E"}
+
+    assert record_skills(record) == ["A", "B", "D", "E"]
+    assert record_skills({"key_skills": "A; B"}) == ["A", "B"]
+
+
+def test_all_and_any(index):
+    assert _ids(index.search(all_skills=["python"])) == ["a1", "b2"]
+    assert _ids(index.search(all_skills=["python", "kubernetes"])) == ["a1"]
+    assert _ids(index.search(any_skills=["kafka", "docker"])) == ["a1", "b2"]
+    assert _ids(index.search(all_skills=["python"], any_skills=["kafka"])) == ["b2"]
+    assert _ids(index.search(any_skills=["javascript", "react", "елка"])) == ["c3"]
+    with pytest.raises(ValueError):
+        index.search(all_skills=[" "])
+
+
+def test_filters(index):
+    assert _ids(index.search(all_skills=["python"], min_salary=200000)) == ["a1"]
+    assert _ids(index.search(all_skills=["python"], max_salary=200000, currency="rub")) == ["b2"]
+    assert _ids(index.search(all_skills=["python"], min_experience=24)) == ["a1"]
+    assert _ids(index.search(all_skills=["python"], location="москва")) == ["b2"]
+    assert _ids(index.search(all_skills=["python"], query="DevOps инженер")) == ["a1"]
+    assert _ids(index.search(all_skills=["python"], limit=1)) == ["a1"]
+
+
+def test_new_version_replaces_postings(index):
+    index.add_resume(_resume("b2", ["Go"]))
+    index.flush()
+
+    assert _ids(index.search(all_skills=["kafka"])) == []
+    assert _ids(index.search(all_skills=["golang"])) == ["b2"]
+    assert index.stats()["resumes"] == 3
+
+
+def test_rebuild_from_csv(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "normalize", False)
+    output = tmp_path / "resumes.csv"
+    storage = CsvStorage(str(output))
+    record = _resume("a1", ["Python"])
+    storage.add_to_general(record, set())
+    storage.add_to_query(record, "devops", set())
+    storage.close()
+
+    index = SkillIndex(tmp_path / "skills.sqlite")
+    try:
+        assert rebuild(index, str(output)) == 1
+        assert _ids(index.search(all_skills=["python"], query="devops")) == ["a1"]
+    finally:
+        index.close()
+
+
+def test_opened_only_when_enabled(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "skill_index_path", str(tmp_path / "skills.sqlite"))
+    monkeypatch.setattr(config, "skill_index", False)
+
+    assert open_skill_index() is None
+
+    monkeypatch.setattr(config, "skill_index", True)
+    index = open_skill_index()
+    try:
+        assert isinstance(index, SkillIndex)
+    finally:
+        index.close()
@@ -0,0 +1,142 @@
+"""Behaviour both storage backends must share."""
+from __future__ import annotations
+
+import calendar
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from actions.resumes_actions import sqlite_storage
+from actions.resumes_actions.sqlite_storage import SqliteStorage
+from actions.resumes_actions.storage import CsvStorage
+from configs.config import config
+from helpers import ru_dates
+
+
+@pytest.fixture(autouse=True)
+def plain_records(monkeypatch):
+    monkeypatch.setattr(config, "normalize", False)
+
+
+@pytest.fixture(params=["csv", "sqlite"])
+def storage(request, tmp_path):
+    if request.param == "csv":
+        storage = CsvStorage(str(tmp_path / "resumes.csv"))
+    else:
+        storage = SqliteStorage(str(tmp_path / "resumes.sqlite"), batch_size=3)
+    yield storage
+    storage.close()
+
+
+def test_deduplicates_and_replaces(storage):
+    general = storage.general_ids()
+    per_query = storage.query_ids("devops")
+
+    assert storage.add_to_general({"resume_id": "a", "url": "u/a"}, general)
+    assert not storage.add_to_general({"resume_id": "a", "url": "u/a"}, general)
+    assert storage.add_to_general({"resume_id": "a", "url": "u/a2"}, general, replace=True)
+    assert storage.add_to_query({"resume_id": "a"}, "devops", per_query)
+    assert not storage.add_to_query({"resume_id": "a"}, "devops", per_query)
+
+    storage.flush()
+    assert "a" in general and "a" in per_query
+    assert storage.count("devops") == 1
+
+
+def test_rejects_records_without_id(storage):
+    general = storage.general_ids()
+    per_query = storage.query_ids("devops")
+
+    assert not storage.add_to_general({"resume_id": " ", "url": "u"}, general)
+    assert not storage.add_to_query({"url": "u"}, "devops", per_query)
+
+    storage.flush()
+    assert len(general) == 0
+    assert storage.count("devops") == 0
+
+
+def test_pending_ids_are_known_without_memory(tmp_path):
+    storage = SqliteStorage(str(tmp_path / "resumes.sqlite"), batch_size=100)
+    try:
+        general = storage.general_ids()
+        storage.add_to_general({"resume_id": "a"}, general)
+        storage.add_to_query({"resume_id": "a"}, "devops", storage.query_ids("devops"))
+
+        # Still in the write batch: found there, not copied into the set.
+        assert "a" in general and general._local == set()
+        assert "a" in storage.query_ids("devops")
+        assert "a" not in storage.query_ids("qa")
+    finally:
+        storage.close()
+
+
+def test_reserved_ids_are_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(sqlite_storage, "_LOCAL_LIMIT", 4)
+    path = str(tmp_path / "resumes.sqlite")
+    parent = SqliteStorage(path, batch_size=1)
+    worker = SqliteStorage(path)
+    try:
+        reserved = worker.general_ids(read_only=True)
+        parent_ids = parent.general_ids()
+        for number in range(3):
+            reserved.add(f"id{number}")
+            parent.add_to_general({"resume_id": f"id{number}"}, parent_ids)
+        assert len(reserved._local) == 3
+
+        # The parent committed the first three: reaching the limit drops them.
+        reserved.add("id3")
+        assert reserved._local == {"id3"}
+        assert all(f"id{number}" in reserved for number in range(4))
+        # Ids already in the database are not reserved again.
+        reserved.add("id0")
+        assert reserved._local == {"id3"}
+    finally:
+        worker.close()
+        parent.close()
+
+
+class _Clock(datetime):
+    today = datetime(2025, 3, 5, 12, 0)
+
+    @classmethod
+    def now(cls, tz=None):
+        return cls.today
+
+
+def test_relative_update_date_is_fixed_at_write_time(storage, monkeypatch):
+    monkeypatch.setattr(ru_dates, "datetime", _Clock)
+    monkeypatch.setattr(_Clock, "today", datetime(2025, 3, 5, 12, 0))
+    record = {"resume_id": "a", "updated_at": "Резюме обновлено вчера в 10:00"}
+    storage.add_to_general(record, storage.general_ids())
+    storage.add_to_query(record, "devops", storage.query_ids("devops"))
+    storage.flush()
+    written = ru_dates.updated_stamp(record["updated_at"])
+
+    # A day later "вчера" means another date; the stored stamp must not follow it.
+    monkeypatch.setattr(_Clock, "today", datetime(2025, 3, 6, 12, 0))
+
+    assert written == calendar.timegm(datetime(2025, 3, 4, 10, 0).timetuple())
+    assert storage.stored_updated("devops", "a") == written
+
+
+def test_sqlite_fills_update_stamps_of_an_old_database(tmp_path):
+    path = tmp_path / "resumes.sqlite"
+    connection = sqlite3.connect(str(path))
+    connection.execute(
+        "CREATE TABLE resumes (resume_id TEXT PRIMARY KEY, url TEXT NOT NULL DEFAULT '', "
+        "updated_at TEXT NOT NULL DEFAULT '', saved_at TEXT NOT NULL, data TEXT NOT NULL)"
+    )
+    connection.execute(
+        "INSERT INTO resumes VALUES ('a', '', 'Резюме обновлено 5 марта 2025 в 14:20', '', '{}')"
+    )
+    connection.commit()
+    connection.close()
+
+    storage = SqliteStorage(str(path))
+    try:
+        assert storage.stored_updated("devops", "a") == ru_dates.updated_stamp(
+            "Резюме обновлено 5 марта 2025 в 14:20"
+        )
+    finally:
+        storage.close()
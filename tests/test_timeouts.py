@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from helpers import timeouts
+from helpers.metrics import Metrics
+from helpers.timeouts import Deadline, LatencyTracker
+from pages import base_page
+from pages.base_page import BasePage
+from pages.resumes import detail_page
+from pages.resumes.detail_page import ResumeDetailPage
+
+
+@pytest.fixture
+def tracker(monkeypatch):
+    tracker = LatencyTracker(min_samples=3)
+    monkeypatch.setattr(base_page, "latency_tracker", tracker)
+    monkeypatch.setattr(detail_page, "latency_tracker", tracker)
+    return tracker
+
+
+def test_fallback_until_enough_samples():
+    tracker = LatencyTracker(min_samples=3)
+    tracker.record("field", 0.2)
+    tracker.record("field", 0.4)
+
+    assert tracker.timeout_for("field", fallback=2.0) == 2.0
+    tracker.record("field", 0.1)
+    assert tracker.timeout_for("field", fallback=2.0) == pytest.approx(0.4 * timeouts._MARGIN)
+    # Never longer than the caller's own limit.
+    tracker.record("slow", 5.0)
+    tracker.record("slow", 5.0)
+    tracker.record("slow", 5.0)
+    assert tracker.timeout_for("slow", fallback=2.0) == 2.0
+
+
+def test_mostly_absent_fields_stop_waiting():
+    tracker = LatencyTracker(min_samples=20)
+    for _ in range(19):
+        tracker.record_miss("metro")
+    tracker.record("metro", 0.3)
+
+    assert tracker.timeout_for("metro", fallback=2.0) == 0.0
+    # A field that shows up late often enough keeps its wait.
+    for _ in range(18):
+        tracker.record_miss("salary")
+    for _ in range(2):
+        tracker.record("salary", 0.5)
+    assert tracker.timeout_for("salary", fallback=2.0) == pytest.approx(0.5 * timeouts._MARGIN)
+
+
+def test_page_records_misses_only_with_budget_left(tracker):
+    page = BasePage(driver=None)
+    locator = ("xpath", "//span")
+
+    # Before the root wait nothing is sampled.
+    page._record_miss(locator)
+    assert tracker.p95(locator) is None
+
+    page._ready_at, page._deadline = time.monotonic(), Deadline(5)
+    for _ in range(3):
+        page._record_miss(locator)
+    assert tracker.timeout_for(locator, fallback=2.0) == 0.0
+
+    other = ("xpath", "//p")
+    page._deadline = Deadline(0)
+    for _ in range(3):
+        page._record_miss(other)
+    assert tracker.p95(other) is None
+
+
+def test_page_samples_each_lookup_from_its_own_start(tracker, monkeypatch):
+    page = BasePage(driver=None)
+    locator = ("xpath", "//ul")
+    monkeypatch.setattr(base_page, "find_all", lambda *args, **kwargs: [object()])
+
+    # Earlier fields of a sequential read took ten seconds after the root appeared.
+    page._ready_at, page._deadline = time.monotonic() - 10, Deadline(30)
+    for _ in range(3):
+        assert page.get_optional_elements(locator)
+
+    assert tracker.p95(locator) < 1
+
+
+def test_script_delays_and_misses(tracker):
+    page = ResumeDetailPage(driver=None)
+    delays = {"full_name": 0, "salary": 400}
+
+    for _ in range(3):
+        page._record_delays(delays, deadline_hit=False)
+
+    assert tracker.timeout_for(page.FULL_NAME, fallback=2.0) == 0.0
+    assert tracker.timeout_for(page.SALARY, fallback=2.0) == pytest.approx(0.4 * timeouts._MARGIN)
+    assert tracker.timeout_for(page.TRAVEL_TIME, fallback=2.0) == 0.0
+
+    # No root (``null``) or an exhausted deadline: absent fields are not sampled.
+    page._record_delays(None, deadline_hit=False)
+    page._record_delays({}, deadline_hit=True)
+    assert len(tracker._samples[page.TRAVEL_TIME]) == 3
+
+
+class ScriptDriver:
+    """Answers the in-page collection script with a canned result."""
+
+    current_url = "https://hh.ru/resume/abc123"
+
+    def __init__(self, result):
+        self.result = result
+
+    def execute_async_script(self, script, *args):
+        return dict(self.result)
+
+
+def test_script_reports_field_timings(tracker, monkeypatch):
+    recorder = Metrics()
+    monkeypatch.setattr(detail_page, "metrics", recorder)
+    driver = ScriptDriver(
+        {
+            "full_name": "Иван",
+            "url": ScriptDriver.current_url,
+            "delays": {"full_name": 0},
+            "deadlineHit": False,
+            "readyWait": 1500,
+            "timings": {"full_name": 0, "salary": 400},
+        }
+    )
+
+    record = ResumeDetailPage(driver).collect_script()
+
+    stages = {row["stage"]: row for row in recorder.snapshot()["stages"]}
+    assert record["full_name"] == "Иван"
+    assert stages["resume_ready"]["sum"] == 1.5
+    assert stages["field.full_name"]["count"] == 1
+    assert stages["field.salary"]["sum"] == 0.4